@@ -1,17 +1,27 @@
 # app/agents/athena_state.py
+import atexit
 import json
 import os
-import time
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, Any, List, Optional
-
-# if you use redis, uncomment
-# import redis
-# r = redis.Redis(host='localhost', port=6379, db=0, decode_responses=True)
+from typing import Dict, Any, Callable, List, Optional, Set
+from app.config import config
+from app.memory.redis_pool import get_redis
+from app.utils.lexicon import lexicon_engine
+from app.utils.logger import logger
+from app.utils.ring_buffer import spill_path
 
 STATE_FILE = os.path.join(os.path.dirname(__file__), "athena_state.json")
 MAX_EVENTS = 200
 
+# user cues that trigger insult/praise events in on_user_turn
+ATHENA_CUES_LEXICON = "athena_cues"
+lexicon_engine.register(ATHENA_CUES_LEXICON, {
+    "insult": ["i hate you", "hate you", "you suck", "die"],
+    "praise": ["thank you", "love you", "i love you", "you are kind"]
+})
+
 def clamp(x, a=-1.0, b=1.0):
     return max(a, min(b, float(x)))
 
@@ -34,7 +44,9 @@ def default_state() -> Dict[str, Any]:
         # derived / meta
         "mood_label": "neutral",   # optional human-friendly label
         # history of events that changed state (bounded)
-        "events": []  # each event: {"ts":..., "type": "...", "source":"user|internal", "delta": {...}, "note": "..."}
+        "events": [],  # each event: {"ts":..., "type": "...", "source":"user|internal", "delta": {...}, "note": "..."}
+        # events ever pushed (tells the store which events are not persisted yet)
+        "events_total": 0
     }
 
 # -------------------------
@@ -54,8 +66,14 @@ def load_state(file_path: Optional[str] = None) -> Dict[str, Any]:
 def save_state(state: Dict[str, Any], file_path: Optional[str] = None):
     file_path = file_path or STATE_FILE
     state["updated_at"] = now_iso()
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(state, f, indent=2, ensure_ascii=False)
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # write a temp file and swap it in, so a crash never leaves a truncated state
+    tmp_path = f"{file_path}.tmp.{os.getpid()}.{threading.get_ident()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp_path, file_path)
 
 # -------------------------
 # Compute derived values
@@ -170,8 +188,9 @@ def push_event(state: Dict[str, Any], evt: Dict[str, Any]):
     lst: List[Dict[str, Any]] = state.setdefault("events", [])
     lst.append(evt)
     if len(lst) > MAX_EVENTS:
-        # keep most recent
-        state["events"] = lst[-MAX_EVENTS:]
+        # keep most recent (trimmed in place, no copy of the list)
+        del lst[:len(lst) - MAX_EVENTS]
+    state["events_total"] = state.get("events_total", len(lst) - 1) + 1
 
 # -------------------------
 # decay function (call periodically)
@@ -194,30 +213,393 @@ def decay_toward_neutral(state: Dict[str, Any], decay_rate: float = 0.02):
 # -------------------------
 # Example small wrapper to update Athena from a user turn
 # -------------------------
-def on_user_turn(state: Dict[str, Any], user_text: str, emotion_analysis: Dict[str, Any]):
+def on_user_turn(
+    state: Dict[str, Any],
+    user_text: str,
+    emotion_analysis: Dict[str, Any],
+    user_id: Optional[str] = None,
+    persist: bool = True
+):
     """
     Typical use: call analyze_emotion_text(user_text) -> emotion_analysis then:
-        state = on_user_turn(state, user_text, emotion_analysis)
+        state = on_user_turn(state, user_text, emotion_analysis, user_id)
+
+    The state is not written here: it is marked dirty in athena_state_store,
+    which persists it on its next debounced flush.
     """
     # 1) apply the emotion analysis
     apply_emotion_analysis(state, emotion_analysis, source="user", note=user_text)
 
     # 2) small event heuristics (if user insulted)
-    txt = (user_text or "").lower()
-    if any(k in txt for k in ["i hate you", "hate you", "you suck", "die"]):
+    hits = lexicon_engine.scan(user_text or "")
+    if hits.any(ATHENA_CUES_LEXICON, "insult"):
         apply_event(state, {"type": "insult", "impact": -0.9, "source": "user", "note": user_text})
-    elif any(k in txt for k in ["thank you", "love you", "i love you", "you are kind"]):
+    elif hits.any(ATHENA_CUES_LEXICON, "praise"):
         apply_event(state, {"type": "praise", "impact": 0.6, "source": "user", "note": user_text})
 
     # 3) decay a bit after processing turn
     decay_toward_neutral(state, decay_rate=0.02)
 
-    # 4) persist/update storage
-    save_state(state)
-    # optionally push to redis: r.hset(f"athena:state", mapping=state) but convert nested to json strings
+    # 4) schedule persistence (debounced)
+    if persist:
+        athena_state_store.mark_dirty(user_id, state)
 
     return state
 
+# -------------------------
+# Per-user store with debounced persistence
+# -------------------------
+DEFAULT_USER = "default"
+_SCALAR_FIELDS = ("updated_at", "pain", "happiness", "mood_label", "events_total")
+_JSON_FIELDS = ("vad", "emotions")
+
+
+def _fingerprint(state: Dict[str, Any]) -> str:
+    """Serialized persisted content, excluding the timestamp and the events (tracked by events_total)."""
+    return json.dumps(
+        [state.get(name) for name in _JSON_FIELDS + _SCALAR_FIELDS[1:]],
+        sort_keys=True, ensure_ascii=False, default=str
+    )
+
+
+class _Entry:
+    __slots__ = ("state", "fingerprint", "persisted_events")
+
+    def __init__(self, state: Dict[str, Any]):
+        self.state = state
+        self.fingerprint = _fingerprint(state)
+        self.persisted_events = state.get("events_total", len(state.get("events", [])))
+
+
+class _Write:
+    """A user's state as of the flush, written outside the store lock."""
+    __slots__ = ("user_id", "entry", "state", "fingerprint", "events_total", "new_events", "replace_events")
+
+    def __init__(self, user_id: str, entry: _Entry, state: Dict[str, Any], fingerprint: str,
+                 events_total: int, new_events: List[Dict[str, Any]], replace_events: bool):
+        self.user_id = user_id
+        self.entry = entry
+        self.state = state
+        self.fingerprint = fingerprint
+        self.events_total = events_total
+        self.new_events = new_events
+        self.replace_events = replace_events
+
+
+def _copy_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy safe to serialize while the original keeps changing (events are never mutated once pushed)."""
+    copy = dict(state)
+    for name in _JSON_FIELDS + ("events",):
+        value = state.get(name)
+        if isinstance(value, (dict, list)):
+            copy[name] = type(value)(value)
+    return copy
+
+
+class AthenaStateStore:
+    """
+    Athena's emotional state per user, kept in memory.
+
+    Updates only mark a user dirty; a timer flushes all dirty users once per
+    ATHENA_STATE_FLUSH_SECONDS, and users whose state did not change are not
+    written. In Redis a user's scalars live in the hash <prefix>:<user> and
+    the events in the list <prefix>:<user>:events (only new events are
+    appended, capped to MAX_EVENTS), both expiring after ttl_days. With
+    ATHENA_STATE_BACKEND=file the state is written atomically to a JSON file.
+
+    When a Redis write fails the state goes to the file instead and the user
+    stays dirty, so the next flush writes everything Redis missed. On load the
+    newer of the Redis and file copies (by updated_at) wins.
+    """
+
+    def __init__(
+        self,
+        flush_seconds: Optional[float] = None,
+        backend: Optional[str] = None,
+        capacity: Optional[int] = None,
+        redis_getter: Callable[[], Any] = get_redis,
+        prefix: str = "athena_state",
+        state_dir: Optional[str] = None,
+        ttl_days: Optional[int] = None
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            flush_seconds: Debounce delay of writes (default config.ATHENA_STATE_FLUSH_SECONDS)
+            backend: "redis" or "file" (default config.ATHENA_STATE_BACKEND)
+            capacity: Max users held in memory (default config.ATHENA_STATE_CAPACITY)
+            redis_getter: Returns the sync Redis client
+            prefix: Redis key prefix
+            state_dir: Directory of per-user fallback files (default: next to STATE_FILE)
+            ttl_days: TTL of the Redis keys (default config.REDIS_EXPIRATION_DAYS)
+        """
+        self.flush_seconds = config.ATHENA_STATE_FLUSH_SECONDS if flush_seconds is None else flush_seconds
+        self.backend = backend or config.ATHENA_STATE_BACKEND
+        self.capacity = max(1, capacity or config.ATHENA_STATE_CAPACITY)
+        self.redis_getter = redis_getter
+        self.prefix = prefix
+        self.state_dir = state_dir or os.path.dirname(STATE_FILE)
+        self.ttl_seconds = (ttl_days or config.REDIS_EXPIRATION_DAYS) * 24 * 3600
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._dirty: Set[str] = set()
+        self._flushing: Set[str] = set()   # being written by flush(); not evicted
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()   # one flush at a time (timer vs close)
+        self._timer: Optional[threading.Timer] = None
+        self.writes = 0
+        self.skipped = 0
+        self.file_fallbacks = 0
+
+    def _key(self, user_id: str) -> str:
+        return f"{self.prefix}:{user_id}"
+
+    def _file_path(self, user_id: str) -> str:
+        if user_id == DEFAULT_USER:
+            return STATE_FILE
+        return spill_path(self.state_dir, user_id, "athena_state", ext="json")
+
+    # -------------------------
+    # Loading
+    # -------------------------
+    def _load_redis(self, user_id: str) -> Optional[Dict[str, Any]]:
+        client = self.redis_getter()
+        fields = client.hgetall(self._key(user_id))
+        if not fields:
+            return None
+        state = default_state()
+        for name in _JSON_FIELDS:
+            if name in fields:
+                state[name] = json.loads(fields[name])
+        for name in ("pain", "happiness"):
+            if name in fields:
+                state[name] = float(fields[name])
+        state["updated_at"] = fields.get("updated_at", state["updated_at"])
+        state["mood_label"] = fields.get("mood_label", state["mood_label"])
+        state["events"] = [json.loads(e) for e in client.lrange(f"{self._key(user_id)}:events", 0, -1)]
+        state["events_total"] = int(fields.get("events_total", len(state["events"])))
+        return state
+
+    def _load(self, user_id: str) -> _Entry:
+        redis_state = None
+        if self.backend == "redis":
+            try:
+                redis_state = self._load_redis(user_id)
+            except Exception as e:
+                logger.warning(f"Could not load Athena state of {user_id} from Redis: {e}")
+        file_state = None
+        if os.path.exists(self._file_path(user_id)):
+            file_state = load_state(self._file_path(user_id))
+            file_state.setdefault("events_total", len(file_state.get("events", [])))
+
+        if redis_state is not None and (
+            file_state is None or str(file_state.get("updated_at", "")) <= redis_state["updated_at"]
+        ):
+            return _Entry(redis_state)
+        entry = _Entry(file_state if file_state is not None else default_state())
+        if file_state is not None and self.backend == "redis":
+            # newer than Redis (written while it was down): write it there in full
+            entry.fingerprint = None
+            entry.persisted_events = 0
+        return entry
+
+    def get(self, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Athena's state for a user, loaded on first use.
+
+        Mutate it only through on_user_turn() (or under lock()) while the
+        store may be flushing in the background.
+        """
+        user_id = user_id or DEFAULT_USER
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                entry = self._entries[user_id] = self._load(user_id)
+                if entry.fingerprint is None:
+                    self._dirty.add(user_id)
+                    self._schedule()
+                self._evict()
+            self._entries.move_to_end(user_id)
+            return entry.state
+
+    def _evict(self):
+        """Drop least recently used clean users beyond capacity."""
+        excess = len(self._entries) - self.capacity
+        if excess <= 0:
+            return
+        busy = self._dirty | self._flushing
+        for user_id in [u for u in self._entries if u not in busy][:excess]:
+            del self._entries[user_id]
+
+    def lock(self) -> threading.RLock:
+        """Lock serializing state updates with background flushes."""
+        return self._lock
+
+    # -------------------------
+    # Updates
+    # -------------------------
+    def on_user_turn(self, user_id: Optional[str], user_text: str, emotion_analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply a user turn to the user's state and schedule its write."""
+        with self._lock:
+            state = self.get(user_id)
+            on_user_turn(state, user_text, emotion_analysis, persist=False)
+            self.mark_dirty(user_id)
+            return state
+
+    def mark_dirty(self, user_id: Optional[str] = None, state: Optional[Dict[str, Any]] = None):
+        """
+        Schedule a write of the user's state.
+
+        Args:
+            user_id: User identifier (default user when None)
+            state: State object to adopt for the user (e.g. one from load_state())
+        """
+        user_id = user_id or DEFAULT_USER
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                entry = self._entries[user_id] = _Entry(state) if state is not None else self._load(user_id)
+                adopted = state is not None
+            else:
+                adopted = state is not None and state is not entry.state
+                if adopted:
+                    entry.state = state
+            if adopted:
+                # never written by this store: write it in full
+                entry.fingerprint = None
+                entry.persisted_events = 0
+            self._entries.move_to_end(user_id)
+            self._dirty.add(user_id)
+            self._schedule()
+
+    def _schedule(self):
+        """Start the flush timer unless one is pending (call under the lock)."""
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_seconds, self._flush_scheduled)
+            self._timer.daemon = True
+            self._timer.start()
+
+    # -------------------------
+    # Persistence
+    # -------------------------
+    def _flush_scheduled(self):
+        with self._lock:
+            self._timer = None
+        self.flush()
+
+    def _prepare(self, user_id: str, entry: _Entry) -> Optional[_Write]:
+        """Snapshot what to write for one user (under the lock); None if unchanged."""
+        state = entry.state
+        fingerprint = _fingerprint(state)
+        events = state.get("events", [])
+        events_total = state.get("events_total", len(events))
+        pending = events_total - entry.persisted_events
+        if fingerprint == entry.fingerprint and pending == 0:
+            self.skipped += 1
+            return None
+
+        state["updated_at"] = now_iso()
+        # more new events than are kept (or a reset state): rewrite the whole list
+        replace_events = pending < 0 or pending >= len(events)
+        new_events = list(events) if replace_events else events[len(events) - pending:]
+        return _Write(user_id, entry, _copy_state(state), fingerprint, events_total, new_events, replace_events)
+
+    def _write_redis(self, user_id: str, state: Dict[str, Any], new_events: List[Dict[str, Any]], replace_events: bool):
+        key = self._key(user_id)
+        events_key = f"{key}:events"
+        mapping = {name: json.dumps(state.get(name, {}), ensure_ascii=False) for name in _JSON_FIELDS}
+        mapping.update({name: str(state.get(name, "")) for name in _SCALAR_FIELDS})
+        pipe = self.redis_getter().pipeline(transaction=True)
+        pipe.hset(key, mapping=mapping)
+        pipe.expire(key, self.ttl_seconds)
+        if replace_events:
+            pipe.delete(events_key)
+        if new_events:
+            pipe.rpush(events_key, *[json.dumps(e, ensure_ascii=False, default=str) for e in new_events])
+            pipe.ltrim(events_key, -MAX_EVENTS, -1)
+            pipe.expire(events_key, self.ttl_seconds)
+        pipe.execute()
+
+    def _write(self, write: _Write) -> bool:
+        """Write one snapshot (no lock held); True if it reached the configured backend."""
+        if self.backend == "redis":
+            try:
+                self._write_redis(write.user_id, write.state, write.new_events, write.replace_events)
+                return True
+            except Exception as e:
+                logger.warning(f"Could not write Athena state of {write.user_id} to Redis, using file: {e}")
+                self.file_fallbacks += 1
+        try:
+            save_state(write.state, self._file_path(write.user_id))
+        except Exception as e:
+            logger.error(f"Failed to persist Athena state of {write.user_id}: {e}")
+            return False
+        return self.backend != "redis"
+
+    def flush(self) -> int:
+        """
+        Write every dirty user whose state changed.
+
+        The states are snapshotted under the lock and written outside it, so
+        updates do not wait for Redis or the disk. Users whose write did not
+        reach the backend stay dirty and are retried on the next flush.
+
+        Returns:
+            Number of users written
+        """
+        with self._flush_lock:
+            with self._lock:
+                dirty, self._dirty = self._dirty, set()
+                writes = []
+                for user_id in dirty:
+                    entry = self._entries.get(user_id)
+                    if entry is None:
+                        continue
+                    write = self._prepare(user_id, entry)
+                    if write is not None:
+                        writes.append(write)
+                        self._flushing.add(user_id)
+
+            written = 0
+            for write in writes:
+                ok = self._write(write)
+                with self._lock:
+                    self._flushing.discard(write.user_id)
+                    if ok:
+                        write.entry.fingerprint = write.fingerprint
+                        write.entry.persisted_events = write.events_total
+                        self.writes += 1
+                        written += 1
+                    else:
+                        self._dirty.add(write.user_id)
+                        self._schedule()
+
+            with self._lock:
+                self._evict()
+        return written
+
+    def close(self):
+        """Cancel the pending timer and flush (call on shutdown)."""
+        with self._lock:
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+        self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "users": len(self._entries),
+            "dirty": len(self._dirty),
+            "writes": self.writes,
+            "skipped": self.skipped,
+            "file_fallbacks": self.file_fallbacks
+        }
+
+
+# Process-wide store
+athena_state_store = AthenaStateStore()
+atexit.register(athena_state_store.close)
+
 # -------------------------
 # Small example usage
 # -------------------------
@@ -233,3 +615,4 @@ if __name__ == "__main__":
     }
     s = on_user_turn(s, "I hate you Athena", fake_analysis)
     print("after:", s["vad"], s["pain"], s["mood_label"])
+    athena_state_store.flush()
@@ -1,6 +1,8 @@
-from app.llmconnector import connector
+from app.llmconnector import async_connector, stream_connector
+from app.config import config
+from app.utils.logger import logger
 import re
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Awaitable, Optional
 
 def safe_str(x):
     return "" if x is None else str(x)
@@ -102,10 +104,104 @@ def normalize_user_summary(user_summary: Dict[str, Any]) -> Dict[str, Any]:
 
     return norm
 
-def generate_final_response(user_summary: Dict[str, Any],
-                            athena_profile: Dict[str, Any]) -> str:
+class FinalAnswerStreamFilter:
+    """
+    Incrementally extracts the text inside <final_answer>...</final_answer>
+    from a token stream, skipping any <think>...</think> block.
+    Tag fragments split across tokens are held back until they resolve.
+    """
+    OPEN = "<final_answer>"
+    CLOSE = "</final_answer>"
+    THINK_OPEN = "<think>"
+    THINK_CLOSE = "</think>"
+
+    def __init__(self):
+        self._buffer = ""
+        self._state = "outside"  # outside | think | inside | done
+        self._emitted = False
+
+    def feed(self, chunk: str) -> str:
+        """Consume a token and return the answer text that is now safe to emit."""
+        if self._state == "done" or not chunk:
+            return ""
+        self._buffer += chunk
+        out = []
+
+        while True:
+            lower = self._buffer.lower()
+            if self._state == "outside":
+                think_idx = lower.find(self.THINK_OPEN)
+                open_idx = lower.find(self.OPEN)
+                if think_idx != -1 and (open_idx == -1 or think_idx < open_idx):
+                    self._buffer = self._buffer[think_idx + len(self.THINK_OPEN):]
+                    self._state = "think"
+                elif open_idx != -1:
+                    self._buffer = self._buffer[open_idx + len(self.OPEN):]
+                    self._state = "inside"
+                else:
+                    self._buffer = self._buffer[-(len(self.OPEN) - 1):]
+                    break
+            elif self._state == "think":
+                idx = lower.find(self.THINK_CLOSE)
+                if idx == -1:
+                    self._buffer = self._buffer[-(len(self.THINK_CLOSE) - 1):]
+                    break
+                self._buffer = self._buffer[idx + len(self.THINK_CLOSE):]
+                self._state = "outside"
+            else:
+                idx = lower.find(self.CLOSE)
+                if idx != -1:
+                    out.append(self._buffer[:idx])
+                    self._buffer = ""
+                    self._state = "done"
+                    break
+                safe = len(self._buffer) - (len(self.CLOSE) - 1)
+                if safe > 0:
+                    out.append(self._buffer[:safe])
+                    self._buffer = self._buffer[safe:]
+                break
+
+        text = "".join(out)
+        if not self._emitted:
+            text = text.lstrip()
+            self._emitted = bool(text)
+        return text
+
+
+async def _stream_final_response(prompt: str, on_delta: Callable[[str], Awaitable[None]]) -> str:
+    """
+    Stream the LLM reply, forwarding answer text to on_delta, and return the full raw output.
+    If the stream breaks after answer text was forwarded, that partial answer is
+    returned instead, so the final reply matches what the client already shows.
+    """
+    answer_filter = FinalAnswerStreamFilter()
+    tokens = []
+    streamed = []
+    try:
+        async for token in stream_connector(prompt, caller="final_response"):
+            tokens.append(token)
+            delta = answer_filter.feed(token)
+            if delta:
+                streamed.append(delta)
+                try:
+                    await on_delta(delta)
+                except Exception as e:
+                    logger.warning(f"Response delta callback failed: {e}")
+    except Exception as e:
+        if not streamed:
+            raise
+        logger.error(f"LLM stream failed after partial answer, keeping it: {e}")
+        return f"<final_answer>{''.join(streamed)}</final_answer>"
+    return "".join(tokens)
+
+
+async def generate_final_response(user_summary: Dict[str, Any],
+                            athena_profile: Dict[str, Any],
+                            on_delta: Optional[Callable[[str], Awaitable[None]]] = None) -> str:
     """
     Generates a textual empathetic response for Athena.
+    If on_delta is given (and LLM_STREAM_RESPONSES is enabled), the reply is
+    streamed and answer text is forwarded to on_delta as it is generated.
     Returns: final response string wrapped in <final_answer> tags.
     """
     norm = normalize_user_summary(user_summary)
@@ -144,16 +240,19 @@ AI Response:
 """
 
     try:
-        response = connector(prompt)
-        try:
-            result = response.json()
-            raw_output = result.get("response") or result.get("text") or result.get("output") or ""
-            if not raw_output:
-                raw_output = result.get("content", "") or ""
-        except Exception:
-            raw_output = str(response)
+        if on_delta is not None and config.LLM_STREAM_RESPONSES:
+            raw_output = await _stream_final_response(prompt, on_delta)
+        else:
+            response = await async_connector(prompt, caller="final_response")
+            try:
+                result = response.json()
+                raw_output = result.get("response") or result.get("text") or result.get("output") or ""
+                if not raw_output:
+                    raw_output = result.get("content", "") or ""
+            except Exception:
+                raw_output = str(response)
     except Exception as e:
-        print(f"⚠️ LLM connector call failed: {e}")
+        logger.error(f"LLM connector call failed: {e}")
         raw_output = "<final_answer>Sorry, I could not respond 😔</final_answer>"
 
     raw_output = safe_str(raw_output).strip()
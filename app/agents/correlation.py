@@ -17,6 +17,7 @@ except Exception:
 # - get_recent_emotions from emotion_redis (reads Redis list user:{user_id}:emotions)
 from app.emotions.mbti import detect_mbti_for_user
 from app.emotions.emotion_redis import get_recent_emotions
+from app.emotions.analysis_context import AnalysisContext
 
 # ---------- Utilities ----------
 def jaccard_similarity(a: List[str], b: List[str]) -> float:
@@ -85,10 +86,12 @@ def correlate_user_with_athena(
     athena_ego: Dict[str, Any],
     user_mbti_result: Optional[Dict[str, Any]] = None,
     recent_texts: Optional[List[str]] = None,
-    weights: Optional[Dict[str, float]] = None
+    weights: Optional[Dict[str, float]] = None,
+    ctx: Optional[AnalysisContext] = None
 ) -> Dict[str, Any]:
     """
     Compute compatibility between user and Athena.
+    Pass a request context (ctx) to reuse MBTI and history already read in this request.
     Returns:
       {
         overall_score: 0..1,
@@ -103,12 +106,12 @@ def correlate_user_with_athena(
 
     # 1) user MBTI (from Redis) if not passed in
     if user_mbti_result is None:
-        user_mbti_result = detect_mbti_for_user(user_id, days=5)
+        user_mbti_result = detect_mbti_for_user(user_id, days=5, ctx=ctx)
     user_axis = user_mbti_result.get("axis_scores", {})
 
     # 2) recent_texts: from Redis if not given
     if recent_texts is None:
-        recent_msgs = get_recent_emotions(user_id, n=8)  # most recent 8
+        recent_msgs = get_recent_emotions(user_id, n=8, ctx=ctx)  # most recent 8
         recent_texts = [m.get("text","") for m in recent_msgs]
 
     # 3) Athena MBTI axis build (from ego.personality_type if available)
@@ -144,7 +147,7 @@ def correlate_user_with_athena(
     values_sim = value_interest_similarity(recent_texts, athena_ego.get("values", []), athena_ego.get("interests", []))
 
     # 7) Sentiment alignment: get latest valence from Redis if available
-    latest = get_recent_emotions(user_id, n=1)
+    latest = get_recent_emotions(user_id, n=1, ctx=ctx)
     user_valence = 0.0
     if latest:
         user_valence = latest[0].get("emotion", {}).get("vad", {}).get("valence", 0.0)
@@ -2,10 +2,12 @@
 Ego defense mechanisms - psychological defense mechanisms for ego protection.
 Novel contribution: Computational implementation of defense mechanisms.
 """
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 from app.agents.ego_structure import EgoDimensions
+from app.config import config
 from app.utils.logger import logger
+from app.utils.ring_buffer import RingBuffer, spill_path
 
 
 class EgoDefenseMechanisms:
@@ -18,15 +20,23 @@ class EgoDefenseMechanisms:
     - Primitive: Denial, projection (unhealthy, ego strength < 0.4)
     """
     
-    def __init__(self, ego_dimensions: EgoDimensions):
+    def __init__(self, ego_dimensions: EgoDimensions, history_id: Optional[str] = None):
         """
         Initialize defense mechanisms.
         
         Args:
             ego_dimensions: EgoDimensions instance
+            history_id: Owner of the history (e.g. user id), names its spill file
         """
         self.ego_dimensions = ego_dimensions
-        self.defense_activation_history: List[Dict] = []
+        # Bounded history; older entries spill to EGO_HISTORY_SPILL_DIR if set
+        self.defense_activation_history = RingBuffer(
+            config.EGO_DEFENSE_HISTORY_SIZE,
+            spill_path(config.EGO_HISTORY_SPILL_DIR, history_id, "defenses")
+        )
+        # All-time usage counters, so stats survive eviction and read in O(1)
+        self.defense_counts: Dict[str, int] = {}
+        self.total_reduction = 0.0
         logger.debug("EgoDefenseMechanisms initialized")
     
     def apply_defense(
@@ -80,6 +90,7 @@ class EgoDefenseMechanisms:
             "pain_reduction": pain_reduction,
             "ego_strength": ego_strength
         })
+        self._count_defense(defense_type["name"], pain_reduction)
         
         logger.info(
             f"Defense applied: {defense_type['name']} "
@@ -96,6 +107,10 @@ class EgoDefenseMechanisms:
             "ego_strength": ego_strength
         }
     
+    def _count_defense(self, defense_type: str, pain_reduction: float):
+        self.defense_counts[defense_type] = self.defense_counts.get(defense_type, 0) + 1
+        self.total_reduction += pain_reduction
+    
     def _mature_defense(self, threat: float, dimension: str) -> Dict:
         """
         Mature defenses: humor, sublimation, anticipation.
@@ -175,6 +190,46 @@ class EgoDefenseMechanisms:
         defense_idx = hash(dimension) % len(defenses)
         return defenses[defense_idx]
     
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert defense state to dictionary for serialization.
+        
+        Returns:
+            Dictionary representation (without the EgoDimensions)
+        """
+        return {
+            "defense_activation_history": self.defense_activation_history.to_list(),
+            "defense_total": self.defense_activation_history.total,
+            "defense_counts": dict(self.defense_counts),
+            "total_reduction": self.total_reduction
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], ego_dimensions: EgoDimensions,
+                  history_id: Optional[str] = None) -> 'EgoDefenseMechanisms':
+        """
+        Create EgoDefenseMechanisms from dictionary.
+        
+        Args:
+            data: Dictionary from to_dict
+            ego_dimensions: EgoDimensions instance
+            history_id: Owner of the history (names its spill file)
+            
+        Returns:
+            EgoDefenseMechanisms instance
+        """
+        instance = cls(ego_dimensions, history_id=history_id)
+        for entry in data.get("defense_activation_history", []):
+            instance.defense_activation_history.append(entry)
+            instance._count_defense(entry["defense_type"], entry["pain_reduction"])
+        if "defense_counts" in data:
+            instance.defense_counts = dict(data["defense_counts"])
+            instance.total_reduction = data.get("total_reduction", 0.0)
+        instance.defense_activation_history.total = max(
+            instance.defense_activation_history.total, data.get("defense_total", 0)
+        )
+        return instance
+    
     def get_defense_stats(self) -> Dict[str, Any]:
         """
         Get statistics about defense mechanism usage.
@@ -182,26 +237,10 @@ class EgoDefenseMechanisms:
         Returns:
             Dictionary with defense statistics
         """
-        if not self.defense_activation_history:
-            return {
-                "total_defenses": 0,
-                "by_type": {},
-                "average_reduction": 0.0
-            }
-        
-        by_type = {}
-        total_reduction = 0.0
-        
-        for entry in self.defense_activation_history:
-            defense_type = entry["defense_type"]
-            if defense_type not in by_type:
-                by_type[defense_type] = 0
-            by_type[defense_type] += 1
-            total_reduction += entry["pain_reduction"]
-        
+        total = sum(self.defense_counts.values())
         return {
-            "total_defenses": len(self.defense_activation_history),
-            "by_type": by_type,
-            "average_reduction": total_reduction / len(self.defense_activation_history) if self.defense_activation_history else 0.0
+            "total_defenses": total,
+            "by_type": dict(self.defense_counts),
+            "average_reduction": self.total_reduction / total if total else 0.0
         }
 
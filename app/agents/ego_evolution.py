@@ -2,11 +2,19 @@
 Ego evolution tracking system - monitors how ego changes over time.
 """
 from typing import Dict, List, Optional
+from collections import deque
 from datetime import datetime
 import json
 from app.agents.ego_structure import EgoDimensions
+from app.agents.ego_timeseries import SnapshotSeries
 from app.config import config
 from app.utils.logger import logger
+from app.utils.ring_buffer import RingBuffer, spill_path
+from app.utils.running_stats import WindowedStats
+
+
+# Interactions considered when deriving ego strength from impact volatility
+VOLATILITY_WINDOW = 10
 
 
 class EgoEvolution:
@@ -15,18 +23,35 @@ class EgoEvolution:
     Provides consistency metrics and evolution trends.
     """
     
-    def __init__(self, ego_dimensions: EgoDimensions):
+    def __init__(self, ego_dimensions: EgoDimensions, history_id: Optional[str] = None):
         """
         Initialize ego evolution tracker.
         
         Args:
             ego_dimensions: EgoDimensions instance to track
+            history_id: Owner of the histories (e.g. user id), names their spill files
         """
         self.ego_dimensions = ego_dimensions
-        self.interaction_history: List[Dict] = []
-        self.ego_snapshot_history: List[Dict] = []
+        self.history_id = history_id
+        # Bounded histories; older entries spill to EGO_HISTORY_SPILL_DIR if set
+        self.interaction_history = RingBuffer(
+            config.EGO_INTERACTION_HISTORY_SIZE,
+            spill_path(config.EGO_HISTORY_SPILL_DIR, history_id, "interactions")
+        )
+        self.ego_snapshot_history = RingBuffer(
+            config.EGO_SNAPSHOT_HISTORY_SIZE,
+            spill_path(config.EGO_HISTORY_SPILL_DIR, history_id, "snapshots")
+        )
+        # Full snapshot time series on disk (None when EGO_SERIES_DIR is unset)
+        self.snapshot_series = SnapshotSeries.for_owner(history_id)
         self.learning_rate = config.EGO_LEARNING_RATE
         
+        # Running statistics, updated on append so metric reads are O(1)
+        self._strength_stats = WindowedStats()
+        self._recent_impacts: deque = deque()
+        self._abs_impact_sums: Dict[str, float] = {}
+        self._abs_impact_counts: Dict[str, int] = {}
+        
         logger.debug("EgoEvolution initialized")
     
     def update_ego_from_interaction(
@@ -46,31 +71,16 @@ class EgoEvolution:
         lr = learning_rate or self.learning_rate
         
         # Store interaction
-        self.interaction_history.append({
+        self._record_interaction({
             "timestamp": datetime.now().isoformat(),
             "input": user_input,
             "impacts": impact_scores.copy()
         })
         
-        # Update dimensions based on cumulative impact
-        for dimension, impact in impact_scores.items():
-            if dimension in self.ego_dimensions.dimensions:
-                # Get current value
-                dim_dict = self.ego_dimensions.dimensions[dimension]
-                
-                # Update each sub-dimension proportionally
-                for sub_dim in dim_dict:
-                    current_val = dim_dict[sub_dim]
-                    
-                    # If positive impact, increase confidence
-                    if impact > 0.1:
-                        new_val = current_val + (impact * lr)
-                        dim_dict[sub_dim] = min(1.0, new_val)
-                    
-                    # If negative impact, decrease confidence
-                    elif impact < -0.1:
-                        new_val = current_val + (impact * lr)
-                        dim_dict[sub_dim] = max(0.0, new_val)
+        # Update dimensions based on cumulative impact: every sub-dimension of
+        # an impacted dimension moves by impact * lr (positive impact increases
+        # confidence, negative decreases it; |impact| <= 0.1 is ignored)
+        self.ego_dimensions.apply_impacts(impact_scores, lr, threshold=0.1)
         
         # Update ego strength based on consistency
         self._update_ego_strength()
@@ -80,22 +90,41 @@ class EgoEvolution:
         
         logger.debug(f"Updated ego from interaction (learning_rate={lr})")
     
+    def _record_interaction(self, entry: Dict):
+        """Append an interaction and slide the volatility window sums."""
+        self.interaction_history.append(entry)
+        
+        if len(self._recent_impacts) == VOLATILITY_WINDOW:
+            for dim, impact in self._recent_impacts.popleft().items():
+                self._abs_impact_sums[dim] -= abs(impact)
+                self._abs_impact_counts[dim] -= 1
+        impacts = entry.get("impacts", {})
+        self._recent_impacts.append(impacts)
+        for dim, impact in impacts.items():
+            self._abs_impact_sums[dim] = self._abs_impact_sums.get(dim, 0.0) + abs(impact)
+            self._abs_impact_counts[dim] = self._abs_impact_counts.get(dim, 0) + 1
+    
+    def _record_snapshot(self, snapshot: Dict):
+        """Append a snapshot and keep the strength statistics in step with the window."""
+        evicted = self.ego_snapshot_history.append(snapshot)
+        if evicted is not None:
+            self._strength_stats.remove(evicted["ego_strength"])
+        self._strength_stats.add(snapshot["ego_strength"])
+    
     def _update_ego_strength(self):
         """
         Ego strength increases with consistency, decreases with volatility.
         """
-        if len(self.interaction_history) < 5:
+        if len(self._recent_impacts) < 5:
             return
         
-        # Calculate volatility (how much impacts vary)
-        recent_impacts = [h["impacts"] for h in self.interaction_history[-10:]]
-        
-        # Average absolute impact per dimension
+        # Calculate volatility (how much impacts vary): average absolute
+        # impact per dimension over the last VOLATILITY_WINDOW interactions
         avg_abs_impacts = {}
-        for dim in recent_impacts[0].keys():
-            abs_vals = [abs(imp.get(dim, 0)) for imp in recent_impacts if dim in imp]
-            if abs_vals:
-                avg_abs_impacts[dim] = sum(abs_vals) / len(abs_vals)
+        for dim in self._recent_impacts[0].keys():
+            count = self._abs_impact_counts.get(dim, 0)
+            if count:
+                avg_abs_impacts[dim] = max(0.0, self._abs_impact_sums[dim]) / count
             else:
                 avg_abs_impacts[dim] = 0.0
         
@@ -115,16 +144,14 @@ class EgoEvolution:
         """Save ego state for analysis."""
         snapshot = {
             "timestamp": datetime.now().isoformat(),
-            "dimensions": {k: dict(v) for k, v in self.ego_dimensions.dimensions.items()},
+            "dimensions": self.ego_dimensions.dimensions_dict(),
             "ego_strength": self.ego_dimensions.ego_strength,
             "ego_fragility": self.ego_dimensions.ego_fragility,
-            "interaction_count": len(self.interaction_history)
+            "interaction_count": self.interaction_history.total
         }
-        self.ego_snapshot_history.append(snapshot)
-        
-        # Keep only last 100 snapshots
-        if len(self.ego_snapshot_history) > 100:
-            self.ego_snapshot_history = self.ego_snapshot_history[-100:]
+        self._record_snapshot(snapshot)
+        if self.snapshot_series is not None:
+            self.snapshot_series.append(self.ego_dimensions, snapshot["interaction_count"])
     
     def get_ego_consistency_score(self) -> float:
         """
@@ -134,16 +161,11 @@ class EgoEvolution:
         Returns:
             Consistency score (0-1)
         """
-        if len(self.ego_snapshot_history) < 2:
-            return 1.0
-        
-        # Calculate variance in ego strength over time
-        strengths = [s["ego_strength"] for s in self.ego_snapshot_history]
-        if len(strengths) < 2:
+        if self._strength_stats.count < 2:
             return 1.0
         
-        mean_strength = sum(strengths) / len(strengths)
-        variance = sum((s - mean_strength) ** 2 for s in strengths) / len(strengths)
+        # Variance in ego strength over the snapshot window (running)
+        variance = self._strength_stats.variance
         
         # Lower variance = higher consistency
         # Scale variance (max variance for 0-1 range is 0.25, so multiply by 4)
@@ -163,17 +185,59 @@ class EgoEvolution:
         if len(self.ego_snapshot_history) < 5:
             return "insufficient_data"
         
-        recent = self.ego_snapshot_history[-5:]
-        strengths = [s["ego_strength"] for s in recent]
+        first = self.ego_snapshot_history[-5]["ego_strength"]
+        last = self.ego_snapshot_history[-1]["ego_strength"]
         
         # Simple linear trend
-        if strengths[-1] > strengths[0] + 0.1:
+        if last > first + 0.1:
             return "strengthening"
-        elif strengths[-1] < strengths[0] - 0.1:
+        elif last < first - 0.1:
             return "weakening"
         else:
             return "stable"
     
+    def to_dict(self) -> Dict:
+        """
+        Convert evolution state to dictionary for serialization.
+        
+        Returns:
+            Dictionary representation (without the tracked EgoDimensions)
+        """
+        return {
+            "interaction_history": self.interaction_history.to_list(),
+            "interaction_total": self.interaction_history.total,
+            "ego_snapshot_history": self.ego_snapshot_history.to_list(),
+            "snapshot_total": self.ego_snapshot_history.total,
+            "learning_rate": self.learning_rate
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict, ego_dimensions: EgoDimensions, history_id: Optional[str] = None) -> 'EgoEvolution':
+        """
+        Create EgoEvolution from dictionary.
+        
+        Args:
+            data: Dictionary from to_dict
+            ego_dimensions: EgoDimensions instance to track
+            history_id: Owner of the histories (names their spill files)
+            
+        Returns:
+            EgoEvolution instance
+        """
+        instance = cls(ego_dimensions, history_id=history_id)
+        for entry in data.get("interaction_history", []):
+            instance._record_interaction(entry)
+        for entry in data.get("ego_snapshot_history", []):
+            instance._record_snapshot(entry)
+        instance.interaction_history.total = max(
+            instance.interaction_history.total, data.get("interaction_total", 0)
+        )
+        instance.ego_snapshot_history.total = max(
+            instance.ego_snapshot_history.total, data.get("snapshot_total", 0)
+        )
+        instance.learning_rate = data.get("learning_rate", instance.learning_rate)
+        return instance
+    
     def get_history_summary(self) -> Dict:
         """
         Get summary of interaction history.
@@ -182,7 +246,7 @@ class EgoEvolution:
             Dictionary with history statistics
         """
         return {
-            "total_interactions": len(self.interaction_history),
+            "total_interactions": self.interaction_history.total,
             "snapshots_count": len(self.ego_snapshot_history),
             "consistency_score": self.get_ego_consistency_score(),
             "evolution_trend": self.get_evolution_trend(),
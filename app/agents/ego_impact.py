@@ -1,10 +1,13 @@
 """
 Ego impact calculator - determines which ego dimensions are affected by user input.
 """
-import re
 from typing import Dict, List, Tuple
 from app.agents.ego_structure import EgoDimensions
 from app.utils.logger import logger
+from app.utils.lexicon import lexicon_engine
+
+# Lexicon name on the shared engine; tags are "<dimension>:<polarity>"
+EGO_IMPACT_LEXICON = "ego_impact"
 
 
 class EgoImpactCalculator:
@@ -85,14 +88,8 @@ class EgoImpactCalculator:
     }
     
     def __init__(self):
-        """Initialize with compiled regex patterns for efficiency."""
-        self.compiled_patterns = {}
-        for dimension, keywords in self.DIMENSION_KEYWORDS.items():
-            self.compiled_patterns[dimension] = {
-                "positive": [re.compile(pat, re.IGNORECASE) for pat in keywords["positive"]],
-                "negative": [re.compile(pat, re.IGNORECASE) for pat in keywords["negative"]]
-            }
-        logger.debug("EgoImpactCalculator initialized with compiled patterns")
+        """Initialize; patterns are matched through the shared lexicon engine."""
+        logger.debug("EgoImpactCalculator initialized with shared lexicon engine")
     
     def calculate_dimension_impact(
         self, 
@@ -110,18 +107,14 @@ class EgoImpactCalculator:
             Dictionary mapping dimension names to impact scores (-1 to +1)
         """
         if not user_input or not isinstance(user_input, str):
-            return {dim: 0.0 for dim in ego_dimensions.dimensions.keys()}
+            return {dim: 0.0 for dim in ego_dimensions.dimensions}
         
-        input_lower = user_input.lower()
+        hits = lexicon_engine.scan(user_input)
         impacts = {}
         
-        for dimension, patterns in self.compiled_patterns.items():
-            positive_matches = sum(
-                1 for pattern in patterns["positive"] if pattern.search(input_lower)
-            )
-            negative_matches = sum(
-                1 for pattern in patterns["negative"] if pattern.search(input_lower)
-            )
+        for dimension in self.DIMENSION_KEYWORDS:
+            positive_matches = hits.count(EGO_IMPACT_LEXICON, f"{dimension}:positive")
+            negative_matches = hits.count(EGO_IMPACT_LEXICON, f"{dimension}:negative")
             
             # Calculate raw impact
             if positive_matches > 0 and negative_matches == 0:
@@ -159,19 +152,8 @@ class EgoImpactCalculator:
         Returns:
             Aggregate pain score (-1 to +1)
         """
-        total_impact = 0.0
-        total_weight = 0.0
-        
-        for dimension, impact in dimension_impacts.items():
-            weight = ego_dimensions.vulnerability_weights.get(dimension, 0.1)
-            total_impact += impact * weight
-            total_weight += weight
-        
-        # Normalize
-        if total_weight > 0:
-            aggregate = total_impact / total_weight
-        else:
-            aggregate = 0.0
+        # Vulnerability-weighted mean of the impacts
+        aggregate = ego_dimensions.weighted_impact(dimension_impacts)
         
         # Apply ego strength (stronger ego = less affected)
         # Strong ego reduces impact by up to 30%
@@ -207,3 +189,13 @@ class EgoImpactCalculator:
         
         return most_affected
 
+
+lexicon_engine.register(
+    EGO_IMPACT_LEXICON,
+    {
+        f"{dimension}:{polarity}": patterns
+        for dimension, keywords in EgoImpactCalculator.DIMENSION_KEYWORDS.items()
+        for polarity, patterns in keywords.items()
+    },
+    regex=True
+)
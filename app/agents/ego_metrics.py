@@ -49,7 +49,7 @@ class EgoMetrics:
             "vulnerability_profile": self.ego_dimensions.vulnerability_weights.copy(),
             "evolution_trend": self.ego_evolution.get_evolution_trend(),
             "defense_mechanism_usage": self._get_defense_stats(),
-            "interaction_count": len(self.ego_evolution.interaction_history),
+            "interaction_count": self.ego_evolution.interaction_history.total,
             "snapshot_count": len(self.ego_evolution.ego_snapshot_history),
             "dimension_values": self._get_dimension_values()
         }
@@ -62,13 +62,8 @@ class EgoMetrics:
         Returns:
             Dictionary mapping dimension names to health scores
         """
-        health_scores = {}
-        for dimension, sub_dims in self.ego_dimensions.dimensions.items():
-            # Average of sub-dimension values
-            avg_value = sum(sub_dims.values()) / len(sub_dims)
-            health_scores[dimension] = avg_value
-        
-        return health_scores
+        # Average of sub-dimension values
+        return self.ego_dimensions.dimension_health()
     
     def _get_dimension_values(self) -> Dict[str, Dict[str, float]]:
         """
@@ -77,10 +72,7 @@ class EgoMetrics:
         Returns:
             Nested dictionary of dimension -> sub_dimension -> value
         """
-        return {
-            dim: dict(sub_dims) 
-            for dim, sub_dims in self.ego_dimensions.dimensions.items()
-        }
+        return self.ego_dimensions.dimensions_dict()
     
     def _get_defense_stats(self) -> Dict[str, Any]:
         """
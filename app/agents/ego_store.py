@@ -0,0 +1,215 @@
+"""
+Per-user ego state store.
+
+Each user gets their own EnhancedEgoSystem, so one user's interactions never
+move another user's ego. Hot instances live in an in-process LRU; the
+serialized state (EnhancedEgoSystem.to_dict) is persisted to Redis when an
+instance is evicted, on flush (shutdown) and, with EGO_STORE_WRITE_THROUGH,
+after every interaction.
+
+The in-process copies are private to one process: when several workers
+serve the same users, enable EGO_STORE_WRITE_THROUGH so every session
+reloads the state from Redis and writes it back when done.
+"""
+import asyncio
+import json
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+from app.agents.enhanced_ego_system import EnhancedEgoSystem
+from app.memory.redis_pool import get_async_redis
+from app.config import config
+from app.utils.logger import logger
+
+
+class _Entry:
+    __slots__ = ("system", "dirty")
+    
+    def __init__(self, system: EnhancedEgoSystem, dirty: bool = False):
+        self.system = system
+        self.dirty = dirty
+
+
+class EgoStateStore:
+    """
+    Keyed store of EnhancedEgoSystem instances.
+    
+    Use session() to work on a user's ego: it serializes access per user
+    (requests of different users never wait on each other) and marks the
+    state dirty for write-back.
+    """
+    
+    def __init__(
+        self,
+        capacity: Optional[int] = None,
+        ttl_days: Optional[int] = None,
+        write_through: Optional[bool] = None,
+        redis_getter: Callable[[], Any] = get_async_redis,
+        prefix: str = "ego_state"
+    ):
+        """
+        Initialize the store.
+        
+        Args:
+            capacity: Max in-process instances (default config.EGO_STORE_CAPACITY)
+            ttl_days: TTL of persisted state (default config.EGO_STORE_TTL_DAYS)
+            write_through: Reload before and persist after every session
+                (default config.EGO_STORE_WRITE_THROUGH)
+            redis_getter: Returns the redis.asyncio client
+            prefix: Redis key prefix
+        """
+        self.capacity = max(1, capacity or config.EGO_STORE_CAPACITY)
+        self.ttl_seconds = (ttl_days or config.EGO_STORE_TTL_DAYS) * 24 * 3600
+        self.write_through = config.EGO_STORE_WRITE_THROUGH if write_through is None else write_through
+        self.redis_getter = redis_getter
+        self.prefix = prefix
+        
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # Per-user lock and the number of coroutines holding or waiting for it;
+        # removed when that drops to zero, so users in _locks are never evicted
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._lock_users: Dict[str, int] = {}
+        
+        self.hits = 0
+        self.loads = 0
+        self.creates = 0
+        self.evictions = 0
+        self.writes = 0
+    
+    def _key(self, user_id: str) -> str:
+        return f"{self.prefix}:{user_id}"
+    
+    @asynccontextmanager
+    async def _locked(self, user_id: str) -> AsyncIterator[None]:
+        lock = self._locks.get(user_id)
+        if lock is None:
+            lock = self._locks[user_id] = asyncio.Lock()
+        self._lock_users[user_id] = self._lock_users.get(user_id, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            users = self._lock_users[user_id] - 1
+            if users:
+                self._lock_users[user_id] = users
+            else:
+                del self._lock_users[user_id]
+                del self._locks[user_id]
+    
+    @asynccontextmanager
+    async def session(self, user_id: str) -> AsyncIterator[EnhancedEgoSystem]:
+        """
+        Exclusive access to a user's ego system.
+        
+        Usage:
+            async with ego_store.session(user_id) as ego_system:
+                result = await ego_system.process_user_input(text)
+        """
+        async with self._locked(user_id):
+            if self.write_through:
+                # Another worker may have changed the state since it was cached
+                entry = self._entries.get(user_id)
+                if entry is not None and not entry.dirty:
+                    del self._entries[user_id]
+            entry = await self._get_entry(user_id)
+            try:
+                yield entry.system
+            finally:
+                entry.dirty = True
+                if self.write_through:
+                    await self._persist(user_id, entry)
+        await self._evict()
+    
+    async def get(self, user_id: str) -> EnhancedEgoSystem:
+        """
+        Read-only access to a user's ego system (no lock, not marked dirty).
+        """
+        entry = await self._get_entry(user_id)
+        await self._evict()
+        return entry.system
+    
+    async def _get_entry(self, user_id: str) -> _Entry:
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry
+        
+        system = None
+        try:
+            raw = await self.redis_getter().get(self._key(user_id))
+            if raw:
+                system = EnhancedEgoSystem.from_dict(json.loads(raw), history_id=user_id)
+                self.loads += 1
+        except Exception as e:
+            logger.warning(f"Could not load ego state for {user_id}: {e}")
+        
+        if system is None:
+            system = EnhancedEgoSystem(history_id=user_id)
+            self.creates += 1
+        
+        # Another coroutine may have loaded it while we awaited Redis
+        entry = self._entries.get(user_id)
+        if entry is None:
+            entry = self._entries[user_id] = _Entry(system)
+        self._entries.move_to_end(user_id)
+        return entry
+    
+    async def _persist(self, user_id: str, entry: _Entry) -> bool:
+        try:
+            await self.redis_getter().set(
+                self._key(user_id),
+                json.dumps(entry.system.to_dict()),
+                ex=self.ttl_seconds
+            )
+            entry.dirty = False
+            self.writes += 1
+            return True
+        except Exception as e:
+            logger.error(f"Could not persist ego state for {user_id}: {e}")
+            return False
+    
+    async def _evict(self):
+        """
+        Drop least recently used instances over capacity, writing back dirty ones.
+        
+        The victim stays cached and locked until its write-back succeeded, so a
+        concurrent session waits for it instead of loading the stale copy from
+        Redis. A failed write-back keeps the entry (still dirty) and stops eviction.
+        """
+        while len(self._entries) > self.capacity:
+            victim = next((user_id for user_id in self._entries if user_id not in self._locks), None)
+            if victim is None:
+                return
+            async with self._locked(victim):
+                entry = self._entries.get(victim)
+                if entry is None:
+                    continue
+                if entry.dirty and not await self._persist(victim, entry):
+                    return
+                del self._entries[victim]
+                self.evictions += 1
+    
+    async def reset(self, user_id: str, new_strength: Optional[float] = None):
+        """Reset a user's ego to its initial state."""
+        async with self.session(user_id) as system:
+            system.reset_ego(new_strength=new_strength)
+    
+    async def flush(self):
+        """Write back every dirty instance (call on shutdown)."""
+        for user_id, entry in list(self._entries.items()):
+            if entry.dirty:
+                await self._persist(user_id, entry)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "capacity": self.capacity,
+            "dirty": sum(1 for e in self._entries.values() if e.dirty),
+            "hits": self.hits,
+            "loads": self.loads,
+            "creates": self.creates,
+            "evictions": self.evictions,
+            "writes": self.writes,
+            "write_through": self.write_through
+        }
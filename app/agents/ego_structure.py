@@ -1,12 +1,182 @@
 """
 Multi-dimensional ego structure for Athena.
 Novel contribution: First computational model of ego with 6 measurable dimensions.
+
+The 18 sub-dimension values live in one contiguous float vector with a fixed
+(dimension, sub-dimension) index, and the vulnerability weights in a 6-vector,
+so updates, health scores and aggregate pain are vectorized NumPy operations.
+`dimensions` and `vulnerability_weights` remain available as dict-like views
+backed by those arrays, so callers and JSON output are unchanged.
 """
-from typing import Dict, Any, List
+from collections.abc import Mapping, MutableMapping
+from typing import Dict, Any, Iterator, List, Tuple
+import numpy as np
 from app.config import config
 from app.utils.logger import logger
 
 
+# Default sub-dimension values, in index order
+DEFAULT_DIMENSIONS: Dict[str, Dict[str, float]] = {
+    "identity": {
+        "self_esteem": 0.8,  # How much agent values itself
+        "self_concept_clarity": 0.7,  # How clear agent's self-image is
+        "authenticity": 0.9  # How true to self agent feels
+    },
+    "competence": {
+        "intelligence_self_perception": 0.8,
+        "capability_confidence": 0.7,
+        "achievement_pride": 0.6
+    },
+    "social": {
+        "belonging_need": 0.8,  # Need to be accepted
+        "recognition_need": 0.7,  # Need to be acknowledged
+        "love_need": 0.9  # Need to be loved/cared for
+    },
+    "values": {
+        "value_integrity": 0.9,  # How much values are threatened
+        "moral_standing": 0.8,
+        "purpose_alignment": 0.7
+    },
+    "relationships": {
+        "attachment_security": 0.8,
+        "trust_level": 0.7,
+        "intimacy_comfort": 0.6
+    },
+    "interests": {
+        "interest_validation": 0.7,  # How much interests matter
+        "hobby_importance": 0.6,
+        "passion_intensity": 0.8
+    }
+}
+
+# Vulnerability weights (which dimensions are most sensitive)
+# Higher weight = more impact on overall ego
+DEFAULT_VULNERABILITY_WEIGHTS: Dict[str, float] = {
+    "identity": 0.25,  # Most important
+    "social": 0.20,
+    "values": 0.20,
+    "competence": 0.15,
+    "relationships": 0.15,
+    "interests": 0.05  # Least important
+}
+
+# Weight assumed for impacts on dimensions outside the model
+UNKNOWN_DIMENSION_WEIGHT = 0.1
+
+# Fixed index: dimension order, sub-dimension order, flat positions
+DIMENSION_NAMES: Tuple[str, ...] = tuple(DEFAULT_DIMENSIONS)
+SUB_DIMENSION_NAMES: Dict[str, Tuple[str, ...]] = {
+    dim: tuple(subs) for dim, subs in DEFAULT_DIMENSIONS.items()
+}
+DIMENSION_INDEX: Dict[str, int] = {dim: i for i, dim in enumerate(DIMENSION_NAMES)}
+FLAT_INDEX: Dict[Tuple[str, str], int] = {}
+_dimension_of_flat: List[int] = []
+_dimension_offsets: List[int] = []
+for _dim in DIMENSION_NAMES:
+    _dimension_offsets.append(len(_dimension_of_flat))
+    for _sub in SUB_DIMENSION_NAMES[_dim]:
+        FLAT_INDEX[(_dim, _sub)] = len(_dimension_of_flat)
+        _dimension_of_flat.append(DIMENSION_INDEX[_dim])
+
+# Flat position -> dimension position, and start of each dimension's slice
+DIMENSION_OF_FLAT = np.array(_dimension_of_flat, dtype=np.intp)
+DIMENSION_OFFSETS = np.array(_dimension_offsets, dtype=np.intp)
+SUB_DIMENSION_COUNTS = np.diff(np.append(DIMENSION_OFFSETS, len(DIMENSION_OF_FLAT)))
+
+DEFAULT_VALUES = np.array(
+    [DEFAULT_DIMENSIONS[dim][sub] for dim in DIMENSION_NAMES for sub in SUB_DIMENSION_NAMES[dim]],
+    dtype=np.float64
+)
+DEFAULT_WEIGHTS = np.array(
+    [DEFAULT_VULNERABILITY_WEIGHTS[dim] for dim in DIMENSION_NAMES],
+    dtype=np.float64
+)
+
+
+class SubDimensionView(MutableMapping):
+    """Dict-like view of one dimension's sub-dimensions, backed by the value vector."""
+    
+    __slots__ = ("_owner", "_dimension")
+    
+    def __init__(self, owner: 'EgoDimensions', dimension: str):
+        self._owner = owner
+        self._dimension = dimension
+    
+    def __getitem__(self, sub_dimension: str) -> float:
+        return float(self._owner.values[FLAT_INDEX[(self._dimension, sub_dimension)]])
+    
+    def __setitem__(self, sub_dimension: str, value: float):
+        key = (self._dimension, sub_dimension)
+        if key not in FLAT_INDEX:
+            raise KeyError(sub_dimension)
+        self._owner.values[FLAT_INDEX[key]] = float(value)
+    
+    def __delitem__(self, sub_dimension: str):
+        raise TypeError("ego sub-dimensions are fixed")
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(SUB_DIMENSION_NAMES[self._dimension])
+    
+    def __len__(self) -> int:
+        return len(SUB_DIMENSION_NAMES[self._dimension])
+    
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class DimensionsView(Mapping):
+    """Dict-like view of dimension -> SubDimensionView."""
+    
+    __slots__ = ("_owner",)
+    
+    def __init__(self, owner: 'EgoDimensions'):
+        self._owner = owner
+    
+    def __getitem__(self, dimension: str) -> SubDimensionView:
+        if dimension not in DIMENSION_INDEX:
+            raise KeyError(dimension)
+        return SubDimensionView(self._owner, dimension)
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(DIMENSION_NAMES)
+    
+    def __len__(self) -> int:
+        return len(DIMENSION_NAMES)
+    
+    def __repr__(self) -> str:
+        return repr(self._owner.dimensions_dict())
+
+
+class WeightsView(MutableMapping):
+    """Dict-like view of dimension -> vulnerability weight, backed by the weight vector."""
+    
+    __slots__ = ("_owner",)
+    
+    def __init__(self, owner: 'EgoDimensions'):
+        self._owner = owner
+    
+    def __getitem__(self, dimension: str) -> float:
+        return float(self._owner.weights[DIMENSION_INDEX[dimension]])
+    
+    def __setitem__(self, dimension: str, value: float):
+        self._owner.weights[DIMENSION_INDEX[dimension]] = float(value)
+    
+    def __delitem__(self, dimension: str):
+        raise TypeError("ego dimensions are fixed")
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(DIMENSION_NAMES)
+    
+    def __len__(self) -> int:
+        return len(DIMENSION_NAMES)
+    
+    def copy(self) -> Dict[str, float]:
+        return dict(zip(DIMENSION_NAMES, self._owner.weights.tolist()))
+    
+    def __repr__(self) -> str:
+        return repr(self.copy())
+
+
 class EgoDimensions:
     """
     Multi-dimensional ego model based on psychological research.
@@ -27,56 +197,36 @@ class EgoDimensions:
         Args:
             initial_strength: Initial ego strength (0-1), defaults to config value
         """
-        self.dimensions = {
-            "identity": {
-                "self_esteem": 0.8,  # How much agent values itself
-                "self_concept_clarity": 0.7,  # How clear agent's self-image is
-                "authenticity": 0.9  # How true to self agent feels
-            },
-            "competence": {
-                "intelligence_self_perception": 0.8,
-                "capability_confidence": 0.7,
-                "achievement_pride": 0.6
-            },
-            "social": {
-                "belonging_need": 0.8,  # Need to be accepted
-                "recognition_need": 0.7,  # Need to be acknowledged
-                "love_need": 0.9  # Need to be loved/cared for
-            },
-            "values": {
-                "value_integrity": 0.9,  # How much values are threatened
-                "moral_standing": 0.8,
-                "purpose_alignment": 0.7
-            },
-            "relationships": {
-                "attachment_security": 0.8,
-                "trust_level": 0.7,
-                "intimacy_comfort": 0.6
-            },
-            "interests": {
-                "interest_validation": 0.7,  # How much interests matter
-                "hobby_importance": 0.6,
-                "passion_intensity": 0.8
-            }
-        }
+        # Sub-dimension values in FLAT_INDEX order
+        self.values = DEFAULT_VALUES.copy()
         
         # Ego strength (overall resilience)
         self.ego_strength = initial_strength or config.EGO_STRENGTH_DEFAULT
         self.ego_fragility = 1.0 - self.ego_strength
         
-        # Vulnerability weights (which dimensions are most sensitive)
-        # Higher weight = more impact on overall ego
-        self.vulnerability_weights = {
-            "identity": 0.25,  # Most important
-            "social": 0.20,
-            "values": 0.20,
-            "competence": 0.15,
-            "relationships": 0.15,
-            "interests": 0.05  # Least important
-        }
+        # Vulnerability weights in DIMENSION_NAMES order
+        self.weights = DEFAULT_WEIGHTS.copy()
         
         logger.debug(f"Initialized EgoDimensions with strength {self.ego_strength}")
     
+    @property
+    def dimensions(self) -> DimensionsView:
+        """Dimension -> sub-dimension -> value, as a live view."""
+        return DimensionsView(self)
+    
+    @property
+    def vulnerability_weights(self) -> WeightsView:
+        """Dimension -> vulnerability weight, as a live view."""
+        return WeightsView(self)
+    
+    def dimensions_dict(self) -> Dict[str, Dict[str, float]]:
+        """Plain nested-dict copy of all sub-dimension values."""
+        flat = self.values.tolist()
+        return {
+            dim: {sub: flat[FLAT_INDEX[(dim, sub)]] for sub in SUB_DIMENSION_NAMES[dim]}
+            for dim in DIMENSION_NAMES
+        }
+    
     def get_dimension_value(self, dimension: str, sub_dimension: str = None) -> float:
         """
         Get value for a dimension or sub-dimension.
@@ -84,21 +234,20 @@ class EgoDimensions:
         Args:
             dimension: Dimension name
             sub_dimension: Optional sub-dimension name
-            
+        
         Returns:
             Value (0-1) or average if sub_dimension not specified
         """
-        if dimension not in self.dimensions:
+        if dimension not in DIMENSION_INDEX:
             logger.warning(f"Unknown dimension: {dimension}")
             return 0.5
         
-        dim_dict = self.dimensions[dimension]
-        
         if sub_dimension:
-            return dim_dict.get(sub_dimension, 0.5)
+            index = FLAT_INDEX.get((dimension, sub_dimension))
+            return float(self.values[index]) if index is not None else 0.5
         else:
             # Return average of all sub-dimensions
-            return sum(dim_dict.values()) / len(dim_dict)
+            return self.dimension_health()[dimension]
     
     def update_dimension(self, dimension: str, sub_dimension: str, value: float):
         """
@@ -109,19 +258,90 @@ class EgoDimensions:
             sub_dimension: Sub-dimension name
             value: New value (will be clamped to 0-1)
         """
-        if dimension not in self.dimensions:
+        if dimension not in DIMENSION_INDEX:
             logger.warning(f"Unknown dimension: {dimension}")
             return
         
-        if sub_dimension not in self.dimensions[dimension]:
+        if (dimension, sub_dimension) not in FLAT_INDEX:
             logger.warning(f"Unknown sub-dimension: {sub_dimension} in {dimension}")
             return
         
         # Clamp value to [0, 1]
         value = max(0.0, min(1.0, float(value)))
-        self.dimensions[dimension][sub_dimension] = value
+        self.values[FLAT_INDEX[(dimension, sub_dimension)]] = value
         logger.debug(f"Updated {dimension}.{sub_dimension} = {value}")
     
+    def impact_vector(self, impacts: Dict[str, float]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Align a dimension -> impact dict with the dimension index.
+        
+        Args:
+            impacts: Dictionary of dimension -> impact (unknown names ignored)
+        
+        Returns:
+            (impact vector, mask of dimensions present in impacts)
+        """
+        vector = np.zeros(len(DIMENSION_NAMES), dtype=np.float64)
+        present = np.zeros(len(DIMENSION_NAMES), dtype=bool)
+        for dimension, impact in impacts.items():
+            index = DIMENSION_INDEX.get(dimension)
+            if index is not None:
+                vector[index] = impact
+                present[index] = True
+        return vector, present
+    
+    def apply_impacts(self, impacts: Dict[str, float], learning_rate: float, threshold: float = 0.1):
+        """
+        Shift every sub-dimension of each impacted dimension by impact * learning_rate.
+        
+        Impacts within +/-threshold are ignored; results are clamped to [0, 1].
+        
+        Args:
+            impacts: Dictionary of dimension -> impact score
+            learning_rate: Step size
+            threshold: Minimum absolute impact that changes the ego
+        """
+        vector, _ = self.impact_vector(impacts)
+        vector[np.abs(vector) <= threshold] = 0.0
+        if not vector.any():
+            return
+        per_sub = vector[DIMENSION_OF_FLAT]
+        changed = per_sub != 0.0
+        self.values[changed] = np.clip(self.values[changed] + per_sub[changed] * learning_rate, 0.0, 1.0)
+    
+    def dimension_health(self) -> Dict[str, float]:
+        """
+        Average sub-dimension value per dimension (0-1).
+        
+        Returns:
+            Dictionary mapping dimension names to health scores
+        """
+        means = np.add.reduceat(self.values, DIMENSION_OFFSETS) / SUB_DIMENSION_COUNTS
+        return dict(zip(DIMENSION_NAMES, means.tolist()))
+    
+    def weighted_impact(self, impacts: Dict[str, float]) -> float:
+        """
+        Vulnerability-weighted mean of dimension impacts.
+        
+        Dimensions outside the model count with UNKNOWN_DIMENSION_WEIGHT.
+        
+        Args:
+            impacts: Dictionary of dimension -> impact
+        
+        Returns:
+            Weighted mean impact (0.0 if there is nothing to weigh)
+        """
+        vector, present = self.impact_vector(impacts)
+        total_impact = float(vector @ (self.weights * present))
+        total_weight = float(self.weights[present].sum())
+        
+        for dimension, impact in impacts.items():
+            if dimension not in DIMENSION_INDEX:
+                total_impact += impact * UNKNOWN_DIMENSION_WEIGHT
+                total_weight += UNKNOWN_DIMENSION_WEIGHT
+        
+        return total_impact / total_weight if total_weight > 0 else 0.0
+    
     def to_dict(self) -> Dict[str, Any]:
         """
         Convert ego dimensions to dictionary for serialization.
@@ -130,7 +350,7 @@ class EgoDimensions:
             Dictionary representation
         """
         return {
-            "dimensions": {k: dict(v) for k, v in self.dimensions.items()},
+            "dimensions": self.dimensions_dict(),
             "ego_strength": self.ego_strength,
             "ego_fragility": self.ego_fragility,
             "vulnerability_weights": self.vulnerability_weights.copy()
@@ -143,7 +363,7 @@ class EgoDimensions:
         
         Args:
             data: Dictionary with dimensions data
-            
+        
         Returns:
             EgoDimensions instance
         """
@@ -151,11 +371,14 @@ class EgoDimensions:
         
         if "dimensions" in data:
             for dim_name, dim_data in data["dimensions"].items():
-                if dim_name in instance.dimensions:
-                    instance.dimensions[dim_name].update(dim_data)
+                for sub_name, value in dim_data.items():
+                    index = FLAT_INDEX.get((dim_name, sub_name))
+                    if index is not None:
+                        instance.values[index] = float(value)
         
         if "vulnerability_weights" in data:
-            instance.vulnerability_weights.update(data["vulnerability_weights"])
+            for dim_name, weight in data["vulnerability_weights"].items():
+                if dim_name in DIMENSION_INDEX:
+                    instance.weights[DIMENSION_INDEX[dim_name]] = float(weight)
         
         return instance
-
@@ -0,0 +1,279 @@
+"""
+Columnar ego snapshot time series backed by memory-mapped files.
+
+Each snapshot is one fixed-width record (timestamp, interaction count,
+strength, fragility and one float64 column per sub-dimension) appended to
+<dir>/<owner>-<hash>.snapshots.bin (see spill_path). Appends are queued and
+written by a background thread, so the event loop never waits for the disk.
+A sidecar <file>.schema.json records the layout, so the file can be opened
+without the app:
+
+    import json, numpy as np
+    schema = json.load(open("user123-<hash>.snapshots.bin.schema.json"))
+    series = np.memmap("user123-<hash>.snapshots.bin", mode="r",
+                       dtype=np.dtype([tuple(f) for f in schema["fields"]]))
+    series["identity.self_esteem"]      # zero-copy column view
+
+or with SnapshotSeries(path).read(...) inside the app.
+"""
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from app.agents.ego_structure import EgoDimensions, DIMENSION_NAMES, SUB_DIMENSION_NAMES
+from app.config import config
+from app.utils.logger import logger
+from app.utils.ring_buffer import spill_path
+
+
+SCHEMA_VERSION = 1
+
+# Record layout: metadata columns, then one column per "dimension.sub_dimension"
+SUB_DIMENSION_COLUMNS: List[str] = [
+    f"{dim}.{sub}" for dim in DIMENSION_NAMES for sub in SUB_DIMENSION_NAMES[dim]
+]
+SNAPSHOT_DTYPE = np.dtype(
+    [("timestamp", "<f8"), ("interaction_count", "<i8"),
+     ("ego_strength", "<f8"), ("ego_fragility", "<f8")]
+    + [(column, "<f8") for column in SUB_DIMENSION_COLUMNS]
+)
+
+
+def _schema() -> Dict[str, Any]:
+    return {
+        "version": SCHEMA_VERSION,
+        "fields": [[name, SNAPSHOT_DTYPE.fields[name][0].str] for name in SNAPSHOT_DTYPE.names],
+        "record_size": SNAPSHOT_DTYPE.itemsize,
+        "timestamp": "unix seconds"
+    }
+
+
+_STOP = object()
+
+
+class _SeriesAppender:
+    """
+    Daemon thread appending queued snapshot records to their series files.
+    
+    Records queued together are grouped per file, so a burst of snapshots
+    costs one open/write per series.
+    """
+    
+    def __init__(self):
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+    
+    def put(self, series: 'SnapshotSeries', record: bytes):
+        self._queue.put((series, record))
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="ego-series", daemon=True)
+                    self._thread.start()
+    
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            pending: Dict[str, Tuple['SnapshotSeries', List[bytes]]] = {}
+            for item in items:
+                if isinstance(item, tuple):
+                    series, record = item
+                    pending.setdefault(series.path, (series, []))[1].append(record)
+            for series, records in pending.values():
+                series._write(b"".join(records))
+            
+            for item in items:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if any(item is _STOP for item in items):
+                return
+    
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Write everything queued so far; returns False on timeout."""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+    
+    def close(self, timeout: float = 5.0):
+        """Write what is queued and stop the thread."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+        self._thread = None
+
+
+_appender = _SeriesAppender()
+atexit.register(_appender.close)
+
+
+class SnapshotSeries:
+    """
+    Append-only snapshot series for one owner (user or session).
+    
+    Appends queue one binary record for the background writer; reads map
+    the file and return structured-array views, so slicing long histories
+    copies nothing.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Initialize the series.
+        
+        Args:
+            path: Data file; the schema is kept next to it as <path>.schema.json
+        """
+        self.path = path
+        self.schema_path = f"{path}.schema.json"
+        self._schema_checked = False
+    
+    @classmethod
+    def for_owner(cls, owner_id: Optional[str], directory: Optional[str] = None) -> Optional['SnapshotSeries']:
+        """
+        Series of one owner under EGO_SERIES_DIR, or None when disabled.
+        
+        Args:
+            owner_id: Owner of the series, e.g. a user id
+            directory: Override for config.EGO_SERIES_DIR
+        """
+        directory = config.EGO_SERIES_DIR if directory is None else directory
+        path = spill_path(directory, owner_id, "snapshots", ext="bin")
+        return cls(path) if path else None
+    
+    def _ensure_schema(self):
+        """Write the sidecar schema, moving aside files with a different layout."""
+        if self._schema_checked:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        schema = _schema()
+        if os.path.exists(self.schema_path):
+            try:
+                with open(self.schema_path, "r", encoding="utf-8") as f:
+                    existing = json.load(f)
+            except (OSError, ValueError):
+                existing = None
+            if existing != schema:
+                suffix = datetime.now().strftime("%Y%m%d%H%M%S")
+                logger.warning(f"Snapshot series schema changed, moving {self.path} aside (.{suffix})")
+                for old in (self.path, self.schema_path):
+                    if os.path.exists(old):
+                        os.replace(old, f"{old}.{suffix}")
+        if not os.path.exists(self.schema_path):
+            with open(self.schema_path, "w", encoding="utf-8") as f:
+                json.dump(schema, f, indent=2)
+        self._schema_checked = True
+    
+    def append(self, ego_dimensions: EgoDimensions, interaction_count: int, timestamp: Optional[float] = None):
+        """
+        Queue one snapshot record for appending (written by a background thread).
+        
+        Args:
+            ego_dimensions: Current ego state
+            interaction_count: Interactions seen so far
+            timestamp: Unix time (defaults to now)
+        """
+        record = np.zeros(1, dtype=SNAPSHOT_DTYPE)
+        record["timestamp"] = time.time() if timestamp is None else timestamp
+        record["interaction_count"] = interaction_count
+        record["ego_strength"] = ego_dimensions.ego_strength
+        record["ego_fragility"] = ego_dimensions.ego_fragility
+        # Sub-dimension columns follow the EgoDimensions value order
+        for column, value in zip(SUB_DIMENSION_COLUMNS, ego_dimensions.values.tolist()):
+            record[column] = value
+        _appender.put(self, record.tobytes())
+    
+    def _write(self, records: bytes):
+        """Append raw records (background thread)."""
+        try:
+            self._ensure_schema()
+            with open(self.path, "ab") as f:
+                f.write(records)
+        except OSError as e:
+            logger.warning(f"Could not append ego snapshots to {self.path}: {e}")
+    
+    @staticmethod
+    def flush(timeout: float = 5.0) -> bool:
+        """Wait until all queued records (of every series) are written."""
+        return _appender.flush(timeout)
+    
+    def __len__(self) -> int:
+        try:
+            return os.path.getsize(self.path) // SNAPSHOT_DTYPE.itemsize
+        except OSError:
+            return 0
+    
+    def read(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        offset: int = 0,
+        limit: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Memory-mapped view of the records, optionally sliced.
+        
+        Args:
+            start: Only records with timestamp >= start (unix seconds)
+            end: Only records with timestamp < end
+            offset: Skip this many records of the time range
+            limit: Return at most this many records
+        
+        Returns:
+            Structured array (a read-only memmap view; empty if no data)
+        """
+        self.flush()
+        count = len(self)
+        if count == 0:
+            return np.zeros(0, dtype=SNAPSHOT_DTYPE)
+        # Ignore a trailing partial record from an interrupted write
+        series = np.memmap(self.path, dtype=SNAPSHOT_DTYPE, mode="r", shape=(count,))
+        
+        lo, hi = 0, count
+        timestamps = series["timestamp"]
+        if start is not None:
+            lo = int(np.searchsorted(timestamps, start, side="left"))
+        if end is not None:
+            hi = int(np.searchsorted(timestamps, end, side="left"))
+        lo = min(hi, lo + max(0, offset))
+        if limit is not None:
+            hi = min(hi, lo + max(0, limit))
+        return series[lo:hi]
+    
+    def columns(
+        self,
+        names: Optional[Sequence[str]] = None,
+        **slice_args
+    ) -> Dict[str, List[Any]]:
+        """
+        Selected columns of a slice as JSON-ready lists.
+        
+        Args:
+            names: Column names (defaults to all); see SNAPSHOT_DTYPE.names
+            **slice_args: start, end, offset, limit as for read()
+        
+        Returns:
+            Dictionary column name -> values
+        """
+        names = list(names) if names else list(SNAPSHOT_DTYPE.names)
+        unknown = [name for name in names if name not in SNAPSHOT_DTYPE.names]
+        if unknown:
+            raise ValueError(f"Unknown snapshot columns: {unknown}")
+        records = self.read(**slice_args)
+        return {name: records[name].tolist() for name in names}
@@ -20,27 +20,38 @@ class EnhancedEgoSystem:
     Provides unified interface for all ego operations.
     """
     
-    def __init__(self, initial_ego_strength: Optional[float] = None):
+    def __init__(self, initial_ego_strength: Optional[float] = None, history_id: Optional[str] = None):
         """
         Initialize enhanced ego system.
         
         Args:
             initial_ego_strength: Optional initial ego strength
+            history_id: Owner of the histories (e.g. user id), names their spill files
         """
+        self.history_id = history_id
         # Initialize core components
-        self.ego_dimensions = EgoDimensions(initial_strength=initial_ego_strength)
-        self.ego_evolution = EgoEvolution(self.ego_dimensions)
-        self.ego_defense = EgoDefenseMechanisms(self.ego_dimensions)
         self.pain_calculator = HybridEgoPainCalculator()
+        self._attach(EgoDimensions(initial_strength=initial_ego_strength))
+        
+        logger.debug("EnhancedEgoSystem initialized")
+    
+    def _attach(
+        self,
+        ego_dimensions: EgoDimensions,
+        ego_evolution: Optional[EgoEvolution] = None,
+        ego_defense: Optional[EgoDefenseMechanisms] = None
+    ):
+        """Wire the stateful components (fresh evolution/defense unless given)."""
+        self.ego_dimensions = ego_dimensions
+        self.ego_evolution = ego_evolution or EgoEvolution(ego_dimensions, self.history_id)
+        self.ego_defense = ego_defense or EgoDefenseMechanisms(ego_dimensions, self.history_id)
         self.metrics = EgoMetrics(
             self.ego_dimensions, 
             self.ego_evolution, 
             self.ego_defense
         )
-        
-        logger.info("EnhancedEgoSystem initialized")
     
-    def process_user_input(
+    async def process_user_input(
         self, 
         user_input: str,
         use_llm: bool = True,
@@ -59,7 +70,7 @@ class EnhancedEgoSystem:
         """
         try:
             # Step 1: Calculate pain using hybrid approach
-            pain_analysis = self.pain_calculator.calculate_pain(
+            pain_analysis = await self.pain_calculator.calculate_pain(
                 user_input, 
                 self.ego_dimensions,
                 use_llm=use_llm
@@ -98,10 +109,7 @@ class EnhancedEgoSystem:
                     "fragility": self.ego_dimensions.ego_fragility,
                     "consistency": self.ego_evolution.get_ego_consistency_score(),
                     "evolution_trend": self.ego_evolution.get_evolution_trend(),
-                    "dimensions": {
-                        k: dict(v) 
-                        for k, v in self.ego_dimensions.dimensions.items()
-                    }
+                    "dimensions": self.ego_dimensions.dimensions_dict()
                 }
             }
             
@@ -123,10 +131,7 @@ class EnhancedEgoSystem:
         return {
             "ego_strength": self.ego_dimensions.ego_strength,
             "ego_fragility": self.ego_dimensions.ego_fragility,
-            "dimensions": {
-                k: dict(v) 
-                for k, v in self.ego_dimensions.dimensions.items()
-            },
+            "dimensions": self.ego_dimensions.dimensions_dict(),
             "metrics": self.metrics.get_comprehensive_metrics()
         }
     
@@ -137,31 +142,72 @@ class EnhancedEgoSystem:
         Args:
             new_strength: Optional new ego strength
         """
-        self.ego_dimensions = EgoDimensions(initial_strength=new_strength)
-        self.ego_evolution = EgoEvolution(self.ego_dimensions)
-        self.ego_defense = EgoDefenseMechanisms(self.ego_dimensions)
-        self.metrics = EgoMetrics(
-            self.ego_dimensions, 
-            self.ego_evolution, 
-            self.ego_defense
-        )
+        self._attach(EgoDimensions(initial_strength=new_strength))
         logger.info("Ego system reset")
     
-    def export_for_research(self) -> Dict[str, Any]:
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the full ego state (dimensions, evolution, defense) to a dictionary.
+        
+        Returns:
+            JSON-serializable dictionary
+        """
+        return {
+            "ego_dimensions": self.ego_dimensions.to_dict(),
+            "ego_evolution": self.ego_evolution.to_dict(),
+            "ego_defense": self.ego_defense.to_dict()
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], history_id: Optional[str] = None) -> 'EnhancedEgoSystem':
+        """
+        Restore an ego system from to_dict output.
+        
+        Args:
+            data: Dictionary from to_dict
+            history_id: Owner of the histories (names their spill files)
+            
+        Returns:
+            EnhancedEgoSystem instance
+        """
+        instance = cls(history_id=history_id)
+        dimensions = EgoDimensions.from_dict(data.get("ego_dimensions", {}))
+        if "ego_fragility" in data.get("ego_dimensions", {}):
+            dimensions.ego_fragility = data["ego_dimensions"]["ego_fragility"]
+        instance._attach(
+            dimensions,
+            EgoEvolution.from_dict(data.get("ego_evolution", {}), dimensions, history_id),
+            EgoDefenseMechanisms.from_dict(data.get("ego_defense", {}), dimensions, history_id)
+        )
+        return instance
+    
+    def export_for_research(self, full_history: bool = False) -> Dict[str, Any]:
         """
         Export complete ego system state for research analysis.
         
+        Args:
+            full_history: Include every snapshot and defense activation,
+                          reading spilled entries back from disk
+        
         Returns:
             Research-ready export dictionary
         """
-        return {
+        snapshots = self.ego_evolution.ego_snapshot_history
+        defenses = self.ego_defense.defense_activation_history
+        export = {
             "ego_system": self.get_current_state(),
             "research_metrics": self.metrics.get_research_summary(),
             "evolution_history": {
-                "interactions": len(self.ego_evolution.interaction_history),
-                "snapshots": len(self.ego_evolution.ego_snapshot_history),
-                "recent_snapshots": self.ego_evolution.ego_snapshot_history[-10:] if len(self.ego_evolution.ego_snapshot_history) > 0 else []
+                "interactions": self.ego_evolution.interaction_history.total,
+                "snapshots": snapshots.total,
+                "recent_snapshots": snapshots[-10:],
+                # Full history: GET /metrics/research/series
+                "series_length": len(self.ego_evolution.snapshot_series or ())
             },
-            "defense_history": self.ego_defense.defense_activation_history[-20:] if self.ego_defense.defense_activation_history else []
+            "defense_history": defenses[-20:]
         }
+        if full_history:
+            export["evolution_history"]["all_snapshots"] = list(snapshots.iter_all())
+            export["defense_history"] = list(defenses.iter_all())
+        return export
 
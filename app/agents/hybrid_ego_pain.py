@@ -36,7 +36,7 @@ class HybridEgoPainCalculator:
         
         logger.debug(f"HybridEgoPainCalculator initialized (rule: {self.rule_weight}, llm: {self.llm_weight})")
     
-    def calculate_pain(
+    async def calculate_pain(
         self, 
         user_input: str, 
         ego_dimensions: EgoDimensions,
@@ -68,7 +68,7 @@ class HybridEgoPainCalculator:
             try:
                 # Convert ego dimensions to dict for LLM
                 ego_dict = ego_dimensions.to_dict()
-                llm_result = wedana_classifier(user_input, ego_dict)
+                llm_result = await wedana_classifier(user_input, ego_dict)
                 llm_pain = float(llm_result.get("final_answer", 0.0))
                 
                 # Validate LLM result
@@ -4,7 +4,8 @@ Workflow orchestration has been moved to app/api/workflow.py
 """
 import os
 import json
-from typing import Dict, Any, Tuple
+import threading
+from typing import Dict, Any, Optional, Tuple
 from app.config import config
 from app.utils.logger import logger
 from app.utils.error_handler import handle_error
@@ -16,10 +17,28 @@ from app.utils.error_handler import handle_error
 current_dir = os.path.dirname(__file__)
 profile_path = os.path.join(current_dir, "athena_profile.json")
 
+# Parsed profiles by path, with the file version (mtime, size) they were read at
+_profile_cache: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+_profile_lock = threading.Lock()
+
+
+def _resolve_profile_path(file_path: Optional[str]) -> str:
+    if file_path is None:
+        file_path = config.ATHENA_PROFILE_PATH if hasattr(config, 'ATHENA_PROFILE_PATH') else profile_path
+    return os.path.abspath(file_path)
+
+
+def _file_version(file_path: str) -> Tuple[int, int]:
+    stat = os.stat(file_path)
+    return stat.st_mtime_ns, stat.st_size
+
 
 def load_athena_profile(file_path: str = None) -> Dict[str, Any]:
     """
-    Load Athena's profile from JSON file.
+    Load Athena's profile, parsing the JSON file only when it changed.
+    
+    The returned dict is shared with later callers: treat it as read-only
+    and change the profile through update_athena_mbti.
     
     Args:
         file_path: Optional path to profile file
@@ -27,12 +46,21 @@ def load_athena_profile(file_path: str = None) -> Dict[str, Any]:
     Returns:
         Athena profile dictionary
     """
-    if file_path is None:
-        file_path = config.ATHENA_PROFILE_PATH if hasattr(config, 'ATHENA_PROFILE_PATH') else profile_path
+    file_path = _resolve_profile_path(file_path)
     
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            profile = json.load(f)
+        version = _file_version(file_path)
+        cached = _profile_cache.get(file_path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        with _profile_lock:
+            cached = _profile_cache.get(file_path)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            with open(file_path, "r", encoding="utf-8") as f:
+                profile = json.load(f)
+            _profile_cache[file_path] = (version, profile)
         logger.debug(f"Loaded Athena profile from {file_path}")
         return profile
     except FileNotFoundError:
@@ -58,24 +86,38 @@ def get_athena_mbti(profile: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
     return mbti_type, mbti_info
 
 
-def update_athena_mbti(file_path: str, new_mbti_dict: Dict[str, Any]) -> Dict[str, Any]:
+def update_athena_mbti(file_path: Optional[str], new_mbti_dict: Dict[str, Any]) -> Dict[str, Any]:
     """
     Update Athena's MBTI personality in profile.
     
+    Writes through to the file (temp file + rename, so readers never see a
+    partial profile) only when the personality actually changes.
+    
     Args:
-        file_path: Path to profile file
+        file_path: Path to profile file (None for config.ATHENA_PROFILE_PATH)
         new_mbti_dict: New MBTI dictionary to set
         
     Returns:
         Updated MBTI dictionary
     """
+    file_path = _resolve_profile_path(file_path)
     try:
         profile = load_athena_profile(file_path)
-        profile["mbti"] = new_mbti_dict
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(profile, f, indent=2, ensure_ascii=False)
+        if profile.get("mbti") == new_mbti_dict:
+            logger.debug("Athena MBTI personality unchanged, profile not rewritten")
+            return profile["mbti"]
+        
+        with _profile_lock:
+            # Copy: the cached profile may still be in use by other requests
+            updated = dict(profile)
+            updated["mbti"] = new_mbti_dict
+            tmp_path = f"{file_path}.tmp.{os.getpid()}.{threading.get_ident()}"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(updated, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, file_path)
+            _profile_cache[file_path] = (_file_version(file_path), updated)
         logger.info("Updated Athena MBTI personality")
-        return profile["mbti"]
+        return updated["mbti"]
     except Exception as e:
         logger.error(f"Failed to update Athena MBTI: {e}")
         handle_error(e, {"function": "update_athena_mbti", "file_path": file_path})
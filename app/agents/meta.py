@@ -33,7 +33,7 @@ AI:
 
     # Call the connector function to get the response
     # Send request to LLM
-    response = connector(prompt)
+    response = connector(prompt, caller="meta")
 
     # Parse and extract classification
     result = response.json()
@@ -44,10 +44,11 @@ def pick_new_personality_by_user_mbti(user_mbti, personalities_list):
     if isinstance(personalities_list, dict):
         personalities_list = [personalities_list]
     
+    by_mbti = {}
     for p in personalities_list:
-        if isinstance(p, dict) and p.get("mbti") == suggested_mbti:
-            return p
-    return None  # fallback if not found
+        if isinstance(p, dict) and p.get("mbti"):
+            by_mbti.setdefault(p["mbti"], p)
+    return by_mbti.get(suggested_mbti)  # None if not found
 
 import json
 
@@ -76,7 +77,8 @@ def get_athena_mbti(profile):
     return mbti_type, mbti_info
 
 # Example usage
-athena_profile = load_athena_profile()
-athena_mbti_type, athena_mbti_info = get_athena_mbti(athena_profile)
-print("Athena MBTI:", athena_mbti_type)
-print("Full MBTI info:", athena_mbti_info)
+if __name__ == "__main__":
+    athena_profile = load_athena_profile()
+    athena_mbti_type, athena_mbti_info = get_athena_mbti(athena_profile)
+    print("Athena MBTI:", athena_mbti_type)
+    print("Full MBTI info:", athena_mbti_info)
@@ -1,13 +1,14 @@
-from app.llmconnector import connector
+from app.llmconnector import async_connector
 import re
 import json
 import matplotlib.pyplot as plt
 import numpy as np
 from datetime import datetime
 from app.emotions.nuregex import extract_final_answer_deepseek
+from app.utils.jsonl_log import get_log_writer, read_log
 
 
-def wedana_classifier(user_input,ego):
+async def wedana_classifier(user_input,ego):
     # Prepare the prompt with the user input and other details
     prompt = f"""
 You are Athena, a human-like agent with your own ego and personality.  
@@ -52,7 +53,7 @@ AI:
 """
 
        # Call the connector function to get the response
-    response = connector(prompt)
+    response = await async_connector(prompt, caller="wedana")
     result = response.json()
     print(result)
    
@@ -107,21 +108,9 @@ def update_pain_history(user_query: str, pain_status: float):
         "timestamp": datetime.now().isoformat()
     }
 
-    # Load existing log (if file exists), otherwise create new list
+    # Queue for the append-only background writer (no read/rewrite per turn)
     try:
-        if os.path.exists(log_file):
-            with open(log_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        else:
-            data = []
-
-        # Append new record
-        data.append(entry)
-
-        # Write back to file
-        with open(log_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4)
-        
+        get_log_writer(log_file).write(entry)
         logger.debug(f"Updated pain history: {validated_pain}")
     except Exception as e:
         logger.error(f"Failed to update pain history: {e}")
@@ -139,8 +128,7 @@ LOG_FILE = "pain_log.json"
 def plot_pain_history_fixed(log_file=LOG_FILE, save_png=False, png_path="pain_plot.png"):
     # --- Load file safely ---
     try:
-        with open(log_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = read_log(log_file)
     except FileNotFoundError:
         print("No pain log file found:", log_file)
         return
@@ -1,11 +1,19 @@
 """
 FastAPI application main file.
 """
+import asyncio
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import config
 from app.utils.logger import logger
-from app.api.routes import chat, metrics, ego
+from app.api.routes import chat, metrics, ego, charts
+from app.api.workflow import orchestrator
+from app.llmconnector import close_async_client
+from app.api.readiness import readiness
+from app.memory.redis_pool import close_pools
+from app.utils.jsonl_log import close_log_writers
+from app.agents.athena_state import athena_state_store
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -27,6 +35,7 @@ app.add_middleware(
 app.include_router(chat.router, prefix="/api/v1", tags=["chat"])
 app.include_router(metrics.router, prefix="/api/v1", tags=["metrics"])
 app.include_router(ego.router, prefix="/api/v1", tags=["ego"])
+app.include_router(charts.router, prefix="/api/v1", tags=["charts"])
 
 
 @app.on_event("startup")
@@ -34,12 +43,19 @@ async def startup_event():
     """Initialize on startup."""
     logger.info("Athena API starting up...")
     logger.info(f"API running on {config.API_HOST}:{config.API_PORT}")
+    readiness.start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown."""
     logger.info("Athena API shutting down...")
+    await readiness.stop()
+    await orchestrator.ego_store.flush()
+    await asyncio.to_thread(athena_state_store.close)
+    await close_async_client()
+    await close_pools()
+    close_log_writers()
 
 
 @app.get("/")
@@ -57,3 +73,11 @@ async def health():
     """Health check endpoint."""
     return {"status": "healthy"}
 
+
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 200 once the classifier, Redis and LLM are warm, 503 before."""
+    status = readiness.status()
+    if not readiness.ready:
+        return JSONResponse(status_code=503, content=status)
+    return status
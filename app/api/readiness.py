@@ -0,0 +1,101 @@
+"""
+Startup warmup and readiness tracking.
+
+/health only reports that the process is alive. /ready reports whether the
+emotion classifier, Redis and the LLM backend have been warmed up, so that
+load balancers do not route traffic to a cold worker.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+from app.config import config
+from app.utils.logger import logger
+
+
+class ReadinessState:
+    """Tracks warmup of the components a worker needs before serving traffic."""
+    
+    def __init__(self, checks: Dict[str, Callable[[], Awaitable[Any]]]):
+        """
+        Initialize readiness state.
+        
+        Args:
+            checks: Component name -> async warmup/check function (raises on failure)
+        """
+        self.checks = checks
+        self.components: Dict[str, bool] = {name: False for name in checks}
+        self.errors: Dict[str, str] = {}
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def ready(self) -> bool:
+        return all(self.components.values())
+    
+    async def warmup(self, retry_seconds: Optional[float] = None):
+        """
+        Run every check until all components are ready.
+        
+        Failed components are retried every retry_seconds, so a worker started
+        before Redis or Ollama becomes ready once they come up.
+        """
+        retry_seconds = retry_seconds if retry_seconds is not None else config.READINESS_RETRY_SECONDS
+        while not self.ready:
+            pending = [name for name, ok in self.components.items() if not ok]
+            results = await asyncio.gather(
+                *(self.checks[name]() for name in pending),
+                return_exceptions=True
+            )
+            for name, result in zip(pending, results):
+                if isinstance(result, Exception):
+                    self.errors[name] = str(result)
+                    logger.warning(f"Warmup of {name} failed: {result}")
+                else:
+                    self.components[name] = True
+                    self.errors.pop(name, None)
+                    logger.info(f"{name} ready")
+            if not self.ready:
+                await asyncio.sleep(retry_seconds)
+        logger.info("All components warm, worker is ready")
+    
+    def start(self):
+        """Start warmup in the background so /health answers immediately."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.warmup())
+    
+    async def stop(self):
+        """Cancel a warmup still in progress."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+    
+    def status(self) -> Dict[str, Any]:
+        return {
+            "status": "ready" if self.ready else "warming_up",
+            "components": dict(self.components),
+            "errors": dict(self.errors)
+        }
+
+
+async def _warm_classifier():
+    from app.emotions.emotion_redis import warmup_emotion_model
+    # Model load and first inference are CPU-bound; keep the event loop free
+    return await asyncio.get_running_loop().run_in_executor(None, warmup_emotion_model)
+
+
+async def _warm_redis():
+    from app.memory.redis_pool import check_redis
+    return await check_redis()
+
+
+async def _warm_llm():
+    from app.llmconnector import check_llm
+    return await check_llm()
+
+
+readiness = ReadinessState({
+    "classifier": _warm_classifier,
+    "redis": _warm_redis,
+    "llm": _warm_llm
+})
@@ -0,0 +1,35 @@
+"""
+Chart API routes.
+"""
+from fastapi import APIRouter, HTTPException, Request, Response
+from app.emotions.charts import chart_service, ChartDataUnavailable
+from app.utils.logger import logger
+from app.utils.error_handler import handle_error
+
+router = APIRouter()
+
+
+@router.get("/charts/{chart}.png")
+async def get_chart(request: Request, chart: str, user_id: str = None, source: str = "user"):
+    """
+    Render a chart as PNG (cached until its data changes).
+    
+    Charts: pain_history (source=user|athena), empathy_gauge,
+    empathy_breakdown, mbti_radar (the last three need user_id).
+    """
+    try:
+        image, version = await chart_service.render(chart, user_id=user_id, source=source)
+        etag = f'"{chart}-{version}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+        return Response(content=image, media_type="image/png", headers=headers)
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ChartDataUnavailable as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Chart error: {e}")
+        error_info = handle_error(e, {"endpoint": f"/charts/{chart}.png", "user_id": user_id})
+        raise HTTPException(status_code=500, detail=error_info)
@@ -1,27 +1,36 @@
 """
 Chat API routes.
 """
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException
+import time
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException, Response
 from app.api.schemas import UserInputRequest, InteractionResponse, ErrorResponse
 from app.api.workflow import orchestrator
 from app.api.websocket import manager, websocket_endpoint
 from app.utils.logger import logger
 from app.utils.error_handler import handle_error
+from app.utils.perf_metrics import server_timing, format_server_timing
 
 router = APIRouter()
 
 
 @router.post("/chat", response_model=InteractionResponse)
-async def process_chat(request: UserInputRequest):
+async def process_chat(request: UserInputRequest, response: Response):
     """
     Process user chat input and return response.
+    
+    The Server-Timing header reports each workflow step, the summed LLM and
+    Redis time and the total (milliseconds).
     """
     try:
-        result = await orchestrator.process_user_interaction(
-            user_id=request.user_id,
-            session_id=request.session_id,
-            user_input=request.text
-        )
+        started = time.perf_counter()
+        with server_timing() as timings:
+            result = await orchestrator.process_user_interaction(
+                user_id=request.user_id,
+                session_id=request.session_id,
+                user_input=request.text
+            )
+        timings["total"] = time.perf_counter() - started
+        response.headers["Server-Timing"] = format_server_timing(timings)
         
         return InteractionResponse(**result)
         
@@ -11,14 +11,15 @@ router = APIRouter()
 
 
 @router.get("/ego/state", response_model=EgoStateResponse)
-async def get_ego_state():
+async def get_ego_state(user_id: str):
     """
-    Get current ego state.
+    Get current ego state of a user.
     """
     try:
-        ego_state = orchestrator.ego_system.get_current_state()
-        metrics = orchestrator.ego_system.metrics.get_comprehensive_metrics()
-        defense_stats = orchestrator.ego_system.ego_defense.get_defense_stats()
+        ego_system = await orchestrator.ego_store.get(user_id)
+        ego_state = ego_system.get_current_state()
+        metrics = ego_system.metrics.get_comprehensive_metrics()
+        defense_stats = ego_system.ego_defense.get_defense_stats()
         
         return EgoStateResponse(
             ego_strength=ego_state["ego_strength"],
@@ -31,21 +32,21 @@ async def get_ego_state():
         
     except Exception as e:
         logger.error(f"Ego state error: {e}")
-        error_info = handle_error(e, {"endpoint": "/ego/state"})
+        error_info = handle_error(e, {"endpoint": "/ego/state", "user_id": user_id})
         raise HTTPException(status_code=500, detail=error_info)
 
 
 @router.post("/ego/reset")
-async def reset_ego(initial_strength: float = None):
+async def reset_ego(user_id: str, initial_strength: float = None):
     """
-    Reset ego system to initial state.
+    Reset a user's ego system to initial state.
     """
     try:
-        orchestrator.ego_system.reset_ego(new_strength=initial_strength)
+        await orchestrator.ego_store.reset(user_id, new_strength=initial_strength)
         return {"status": "reset", "message": "Ego system reset successfully"}
         
     except Exception as e:
         logger.error(f"Ego reset error: {e}")
-        error_info = handle_error(e, {"endpoint": "/ego/reset"})
+        error_info = handle_error(e, {"endpoint": "/ego/reset", "user_id": user_id})
         raise HTTPException(status_code=500, detail=error_info)
 
@@ -1,7 +1,9 @@
 """
 Metrics API routes.
 """
+import asyncio
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
 from app.api.schemas import MetricsResponse, ErrorResponse
 from app.api.workflow import orchestrator
 from app.utils.logger import logger
@@ -11,17 +13,17 @@ router = APIRouter()
 
 
 @router.get("/metrics", response_model=MetricsResponse)
-async def get_metrics():
+async def get_metrics(user_id: str):
     """
-    Get current system metrics.
+    Get current ego metrics of a user.
     """
     try:
-        ego_state = orchestrator.ego_system.get_current_state()
-        metrics = orchestrator.ego_system.metrics.get_comprehensive_metrics()
+        ego_system = await orchestrator.ego_store.get(user_id)
+        metrics = ego_system.metrics.get_comprehensive_metrics()
         
         return MetricsResponse(
             ego_metrics=metrics,
-            interaction_count=len(orchestrator.ego_system.ego_evolution.interaction_history),
+            interaction_count=ego_system.ego_evolution.interaction_history.total,
             session_duration=None
         )
         
@@ -32,15 +34,108 @@ async def get_metrics():
 
 
 @router.get("/metrics/research")
-async def get_research_metrics():
+async def get_research_metrics(user_id: str, full_history: bool = False):
     """
-    Get research-ready metrics export.
+    Get research-ready metrics export of a user's ego.
+    
+    full_history=true also returns every snapshot and defense activation,
+    including entries spilled to disk.
     """
     try:
-        return orchestrator.ego_system.export_for_research()
+        ego_system = await orchestrator.ego_store.get(user_id)
+        return ego_system.export_for_research(full_history=full_history)
         
     except Exception as e:
         logger.error(f"Research metrics error: {e}")
         error_info = handle_error(e, {"endpoint": "/metrics/research"})
         raise HTTPException(status_code=500, detail=error_info)
 
+
+@router.get("/metrics/research/series")
+async def get_research_series(
+    user_id: str,
+    start: float = None,
+    end: float = None,
+    offset: int = 0,
+    limit: int = 1000,
+    columns: str = None
+):
+    """
+    Slice a user's ego snapshot time series.
+    
+    start/end are unix timestamps; columns is a comma-separated subset of the
+    series columns (e.g. "timestamp,ego_strength,identity.self_esteem").
+    """
+    try:
+        from app.agents.ego_timeseries import SnapshotSeries, SNAPSHOT_DTYPE
+        series = SnapshotSeries.for_owner(user_id)
+        if series is None:
+            raise HTTPException(status_code=404, detail="Snapshot series are disabled (EGO_SERIES_DIR)")
+        names = [c.strip() for c in columns.split(",") if c.strip()] if columns else None
+        unknown = [c for c in names or [] if c not in SNAPSHOT_DTYPE.names]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown columns: {unknown}")
+        
+        data = await asyncio.to_thread(
+            series.columns, names, start=start, end=end, offset=offset, limit=limit
+        )
+        return {
+            "user_id": user_id,
+            "total": len(series),
+            "count": len(next(iter(data.values()), [])),
+            "columns": data
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Research series error: {e}")
+        error_info = handle_error(e, {"endpoint": "/metrics/research/series"})
+        raise HTTPException(status_code=500, detail=error_info)
+
+
+@router.get("/metrics/inference")
+async def get_inference_metrics():
+    """
+    Get emotion classifier statistics (batching, cache and keyword lexicons).
+    """
+    try:
+        from app.emotions.emotion_redis import emotion_batcher, emotion_cache
+        from app.utils.lexicon import lexicon_engine
+        from app.emotions.charts import chart_service
+        return {
+            "batcher": emotion_batcher.stats(),
+            "cache": emotion_cache.stats(),
+            "lexicon": lexicon_engine.stats(),
+            "ego_store": orchestrator.ego_store.stats(),
+            "charts": chart_service.stats()
+        }
+        
+    except Exception as e:
+        logger.error(f"Inference metrics error: {e}")
+        error_info = handle_error(e, {"endpoint": "/metrics/inference"})
+        raise HTTPException(status_code=500, detail=error_info)
+
+
+@router.get("/metrics/redis")
+async def get_redis_metrics():
+    """
+    Get Redis connection pool utilization.
+    """
+    try:
+        from app.memory.redis_pool import pool_stats
+        return pool_stats()
+        
+    except Exception as e:
+        logger.error(f"Redis metrics error: {e}")
+        error_info = handle_error(e, {"endpoint": "/metrics/redis"})
+        raise HTTPException(status_code=500, detail=error_info)
+
+
+@router.get("/metrics/prometheus", response_class=PlainTextResponse)
+async def get_prometheus_metrics():
+    """
+    Latency histograms (workflow, steps, LLM calls, classifier, Redis) in Prometheus text format.
+    """
+    from app.utils.perf_metrics import render_prometheus, PROMETHEUS_CONTENT_TYPE
+    return PlainTextResponse(render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
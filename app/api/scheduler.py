@@ -0,0 +1,136 @@
+"""
+Dependency-graph scheduler for workflow steps.
+Steps declare the steps they depend on; independent steps run concurrently.
+Each step's run time is observed in the step latency histogram.
+"""
+import asyncio
+from typing import Dict, Any, Callable, Awaitable, List, Optional, Iterable
+from app.utils.logger import logger
+from app.utils.perf_metrics import STEP_DURATION, timed
+
+
+class WorkflowNode:
+    """Single step in a workflow graph."""
+    
+    def __init__(
+        self,
+        step_number: int,
+        name: str,
+        run: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+        depends_on: Iterable[str] = (),
+        processing_message: str = ""
+    ):
+        """
+        Initialize workflow node.
+        
+        Args:
+            step_number: Step number reported in progress updates
+            name: Unique step name
+            run: Coroutine function taking the shared results dict and
+                 returning the data reported when the step completes
+            depends_on: Names of steps that must complete first
+            processing_message: Message reported when the step starts
+        """
+        self.step_number = step_number
+        self.name = name
+        self.run = run
+        self.depends_on = tuple(depends_on)
+        self.processing_message = processing_message
+
+
+class WorkflowGraph:
+    """
+    Executes workflow nodes as a dependency graph.
+    Each node starts as soon as all of its dependencies have completed.
+    """
+    
+    def __init__(self, nodes: List[WorkflowNode]):
+        """
+        Initialize workflow graph.
+        
+        Args:
+            nodes: Workflow nodes
+            
+        Raises:
+            ValueError: If a dependency is unknown or the graph has a cycle
+        """
+        self.nodes = {node.name: node for node in nodes}
+        if len(self.nodes) != len(nodes):
+            raise ValueError("Workflow node names must be unique")
+        
+        for node in nodes:
+            for dep in node.depends_on:
+                if dep not in self.nodes:
+                    raise ValueError(f"Unknown dependency '{dep}' for step '{node.name}'")
+        
+        self._check_acyclic()
+    
+    def _check_acyclic(self):
+        """Raise ValueError if the dependency graph contains a cycle."""
+        remaining = {name: set(node.depends_on) for name, node in self.nodes.items()}
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Workflow graph has a cycle among: {sorted(remaining)}")
+            for name in ready:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+    
+    async def execute(
+        self,
+        on_progress: Optional[Callable[[WorkflowNode, str, Dict[str, Any]], Awaitable[None]]] = None,
+        results: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Run all nodes, respecting dependencies.
+        
+        Args:
+            on_progress: Optional coroutine called with (node, status, data)
+                         when a node starts ("processing") and finishes ("completed")
+            results: Optional dict to collect node outputs into (keyed by node name)
+            
+        Returns:
+            Dictionary mapping node name to the data the node returned
+        """
+        results = {} if results is None else results
+        pending = dict(self.nodes)
+        running: Dict[asyncio.Task, WorkflowNode] = {}
+        
+        async def run_node(node: WorkflowNode) -> Dict[str, Any]:
+            if on_progress:
+                await on_progress(node, "processing", {"message": node.processing_message})
+            with timed(STEP_DURATION, node.name, step=node.name):
+                data = await node.run(results)
+            results[node.name] = data
+            if on_progress:
+                await on_progress(node, "completed", data)
+            return data
+        
+        try:
+            while pending or running:
+                ready = [
+                    node for node in pending.values()
+                    if all(dep in results for dep in node.depends_on)
+                ]
+                for node in sorted(ready, key=lambda n: n.step_number):
+                    del pending[node.name]
+                    running[asyncio.create_task(run_node(node))] = node
+                
+                if not running:
+                    # Cannot happen for a validated acyclic graph
+                    raise RuntimeError(f"Workflow stalled with pending steps: {sorted(pending)}")
+                
+                done, _ = await asyncio.wait(running.keys(), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    node = running.pop(task)
+                    # Re-raise the first failure; remaining tasks are cancelled below
+                    task.result()
+                    logger.debug(f"Workflow step '{node.name}' completed")
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running.keys(), return_exceptions=True)
+        
+        return results
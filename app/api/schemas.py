@@ -41,7 +41,8 @@ class InteractionResponse(BaseModel):
     workflow_steps: List[WorkflowStep]
     metrics: Dict[str, Any]
     ego_state: Dict[str, Any]
-    empathy_metrics: Dict[str, Any]
+    # Reported under metrics["empathy_metrics"]
+    empathy_metrics: Optional[Dict[str, Any]] = None
     timestamp: datetime = Field(default_factory=datetime.now)
 
 
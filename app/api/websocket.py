@@ -1,11 +1,46 @@
 """
 WebSocket server for real-time workflow updates.
+
+Progress is sent as deltas: WorkflowProgressStream batches the step changes
+and reply fragments of one workflow for PROGRESS_COALESCE_MS and sends only
+what changed (a full snapshot to a socket that has not seen the workflow yet).
+Messages are encoded with orjson when it is installed.
 """
-from fastapi import WebSocket, WebSocketDisconnect
-from typing import Dict, List, Callable, Any
+import asyncio
 import json
+from datetime import datetime
+from fastapi import WebSocket, WebSocketDisconnect
+from typing import Dict, List, Callable, Any, Optional
+from app.config import config
 from app.utils.logger import logger
 
+try:
+    import orjson
+except ImportError:  # optional: faster encoding of progress messages
+    orjson = None
+
+
+def _to_jsonable(obj: Any) -> Any:
+    """Fallback encoder for pydantic models, datetimes and NumPy values."""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    if hasattr(obj, "dict"):
+        return obj.dict()
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def encode_message(message: Dict[str, Any]) -> str:
+    """Encode a WebSocket message as JSON text."""
+    if orjson is not None:
+        return orjson.dumps(
+            message, default=_to_jsonable, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        ).decode("utf-8")
+    return json.dumps(message, default=_to_jsonable)
+
 
 class ConnectionManager:
     """Manages WebSocket connections."""
@@ -47,6 +82,10 @@ class ConnectionManager:
         
         logger.info(f"WebSocket disconnected (remaining: {len(self.active_connections)})")
     
+    def has_subscriber(self, workflow_id: str) -> bool:
+        """Whether a WebSocket is listening to this workflow."""
+        return workflow_id in self.workflow_connections
+    
     async def send_personal_message(self, message: Dict[str, Any], websocket: WebSocket):
         """
         Send message to specific WebSocket.
@@ -56,7 +95,7 @@ class ConnectionManager:
             websocket: Target WebSocket
         """
         try:
-            await websocket.send_json(message)
+            await websocket.send_text(encode_message(message))
         except Exception as e:
             logger.error(f"Failed to send WebSocket message: {e}")
     
@@ -82,9 +121,10 @@ class ConnectionManager:
             message: Message dictionary
         """
         disconnected = []
+        text = encode_message(message)
         for connection in self.active_connections:
             try:
-                await connection.send_json(message)
+                await connection.send_text(text)
             except Exception as e:
                 logger.warning(f"Failed to broadcast to connection: {e}")
                 disconnected.append(connection)
@@ -98,6 +138,131 @@ class ConnectionManager:
 manager = ConnectionManager()
 
 
+class WorkflowProgressStream:
+    """
+    Delta progress channel of one workflow.
+    
+    step() and text() only record changes; a flush PROGRESS_COALESCE_MS
+    after the first pending change sends at most one workflow_progress
+    message (the steps that changed, latest status only) and one
+    response_delta message (the reply fragments joined). finish() flushes
+    and sends the final message.
+    
+    While no socket is subscribed nothing is scheduled or encoded; the
+    records are kept so a socket connecting later gets a snapshot.
+    """
+    
+    def __init__(
+        self,
+        workflow_id: str,
+        total_steps: int,
+        connections: Optional[ConnectionManager] = None,
+        window_ms: Optional[float] = None
+    ):
+        """
+        Initialize the stream.
+        
+        Args:
+            workflow_id: Workflow ID
+            total_steps: Number of steps, for progress_percentage
+            connections: Connection manager (defaults to the global one)
+            window_ms: Coalescing window (default config.PROGRESS_COALESCE_MS)
+        """
+        self.workflow_id = workflow_id
+        self.total_steps = total_steps
+        self.connections = connections or manager
+        self.window = (config.PROGRESS_COALESCE_MS if window_ms is None else window_ms) / 1000.0
+        self._steps: Dict[int, Dict[str, Any]] = {}   # latest record per step number
+        self._changed: Dict[int, None] = {}           # step numbers changed since the last flush
+        self._text: List[str] = []                    # whole reply so far
+        self._text_sent = 0                           # fragments of _text already sent
+        self._current_step = 0
+        self._synced: Optional[WebSocket] = None      # socket that has seen everything up to the last flush
+        self._flush_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.messages_sent = 0
+    
+    def step(self, step: Dict[str, Any]):
+        """Record a step change (a dict like WorkflowStep.dict())."""
+        number = step["step_number"]
+        self._steps[number] = step
+        self._changed[number] = None
+        self._current_step = number
+        self._schedule()
+    
+    def text(self, delta: str):
+        """Record a fragment of the reply being generated."""
+        if delta:
+            self._text.append(delta)
+            self._schedule()
+    
+    @property
+    def active(self) -> bool:
+        """Whether a socket is subscribed to the workflow."""
+        return self.connections.has_subscriber(self.workflow_id)
+    
+    def _schedule(self):
+        if self._flush_task is None and self.active:
+            self._flush_task = asyncio.create_task(self._flush_later())
+    
+    async def _flush_later(self):
+        await asyncio.sleep(self.window)
+        self._flush_task = None
+        await self.flush()
+    
+    def _progress_message(self, steps: List[Dict[str, Any]], snapshot: bool) -> Dict[str, Any]:
+        completed = sum(1 for s in self._steps.values() if s["status"] == "completed")
+        return {
+            "type": "workflow_progress",
+            "workflow_id": self.workflow_id,
+            "snapshot": snapshot,
+            "current_step": self._current_step,
+            "total_steps": self.total_steps,
+            "progress_percentage": (completed / self.total_steps) * 100,
+            "steps": steps
+        }
+    
+    async def flush(self):
+        """Send pending changes to the workflow's socket (nothing if none is connected)."""
+        async with self._lock:
+            websocket = self.connections.workflow_connections.get(self.workflow_id)
+            if websocket is None:
+                # Nobody listening: a later subscriber gets a snapshot
+                self._changed.clear()
+                self._synced = None
+                return
+            
+            snapshot = websocket is not self._synced
+            if snapshot:
+                numbers = sorted(self._steps)
+                text = "".join(self._text)
+            else:
+                numbers = sorted(self._changed)
+                text = "".join(self._text[self._text_sent:])
+            self._changed.clear()
+            self._text_sent = len(self._text)
+            self._synced = websocket
+            
+            if numbers or snapshot:
+                await self._send(websocket, self._progress_message([self._steps[n] for n in numbers], snapshot))
+            if text:
+                await self._send(websocket, {"type": "response_delta", "workflow_id": self.workflow_id, "delta": text})
+    
+    async def _send(self, websocket: WebSocket, message: Dict[str, Any]):
+        await self.connections.send_personal_message(message, websocket)
+        self.messages_sent += 1
+    
+    async def finish(self, message: Dict[str, Any]):
+        """Flush pending changes, then send the final message (workflow_complete or workflow_error)."""
+        task, self._flush_task = self._flush_task, None
+        if task is not None:
+            task.cancel()
+        if not self.active:
+            return
+        await self.flush()
+        await self.connections.send_to_workflow(self.workflow_id, message)
+
+
 async def websocket_endpoint(websocket: WebSocket, workflow_id: str = None):
     """
     WebSocket endpoint handler.
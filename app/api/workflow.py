@@ -2,10 +2,13 @@
 Workflow orchestration with step-by-step progress tracking.
 """
 from typing import Dict, Any, Callable, Optional
+import re
+import time
 import uuid
 from datetime import datetime
 from app.api.schemas import WorkflowStep, WorkflowProgress
-from app.api.websocket import manager
+from app.api.websocket import WorkflowProgressStream
+from app.api.scheduler import WorkflowGraph, WorkflowNode
 from app.emotions.emotion_redis import analyze_user
 from app.agents.user_mapper import map_summary_to_fields
 from app.agents.mentor import load_athena_profile, get_athena_mbti, update_athena_mbti
@@ -13,10 +16,14 @@ from app.agents.wedana import wedana_classifier, update_pain_history
 from app.agents.combinator import generate_final_response
 from app.agents.eval import empathy_from_pain
 from app.agents.personality_picker import pick_new_personality_by_user_mbti
-from app.agents.enhanced_ego_system import EnhancedEgoSystem
+from app.agents.ego_store import EgoStateStore
 from app.config import config
 from app.utils.logger import logger
 from app.utils.error_handler import handle_error
+from app.utils.perf_metrics import WORKFLOW_DURATION
+
+
+TOTAL_STEPS = 9
 
 
 class WorkflowOrchestrator:
@@ -24,7 +31,8 @@ class WorkflowOrchestrator:
     
     def __init__(self):
         """Initialize workflow orchestrator."""
-        self.ego_system = EnhancedEgoSystem()
+        # One ego per user; see EgoStateStore
+        self.ego_store = EgoStateStore()
         logger.debug("WorkflowOrchestrator initialized")
     
     async def process_user_interaction(
@@ -38,6 +46,10 @@ class WorkflowOrchestrator:
         """
         Process complete user interaction workflow.
         
+        Steps are executed as a dependency graph (see _build_graph), so
+        independent steps such as ego impact analysis and response
+        generation run concurrently.
+        
         Args:
             user_id: User identifier
             session_id: Session identifier
@@ -51,194 +63,23 @@ class WorkflowOrchestrator:
         if not workflow_id:
             workflow_id = str(uuid.uuid4())
         
-        steps = []
-        total_steps = 9
+        # Latest record per step number (plain dicts; models are only built for progress_callback)
+        steps: Dict[int, Dict[str, Any]] = {}
+        state: Dict[str, Any] = {}
+        started = time.perf_counter()
+        stream = WorkflowProgressStream(workflow_id, TOTAL_STEPS)
         
-        try:
-            # Step 1: Emotion Analysis
-            await self._update_progress(
-                workflow_id, 1, "emotion_analysis", "processing",
-                {"message": "Analyzing user emotions..."},
-                steps, progress_callback
-            )
-            
-            user_analysis = analyze_user(user_id, session_id, user_input)
-            user_pain = float(user_analysis.get("pain_level", 0))
-            
-            await self._update_progress(
-                workflow_id, 1, "emotion_analysis", "completed",
-                {
-                    "emotions": user_analysis.get("emotions", {}),
-                    "pain_level": user_pain,
-                    "vad": user_analysis.get("emotions", {}).get("vad", {})
-                },
-                steps, progress_callback
-            )
-            
-            # Step 2: User Pain Calculation
-            await self._update_progress(
-                workflow_id, 2, "user_pain_calculation", "processing",
-                {"message": "Calculating user pain level..."},
-                steps, progress_callback
-            )
-            
-            await self._update_progress(
-                workflow_id, 2, "user_pain_calculation", "completed",
-                {"pain_level": user_pain},
-                steps, progress_callback
-            )
-            
-            # Step 3: MBTI Detection
-            await self._update_progress(
-                workflow_id, 3, "mbti_detection", "processing",
-                {"message": "Detecting personality type..."},
-                steps, progress_callback
-            )
-            
-            mbti_result = user_analysis.get("mbti", {})
-            
-            await self._update_progress(
-                workflow_id, 3, "mbti_detection", "completed",
-                {"mbti": mbti_result},
-                steps, progress_callback
-            )
-            
-            # Step 4: Ego Impact Analysis
-            await self._update_progress(
-                workflow_id, 4, "ego_impact_analysis", "processing",
-                {"message": "Analyzing ego impact..."},
-                steps, progress_callback
-            )
-            
-            ego_result = self.ego_system.process_user_input(user_input)
-            
-            await self._update_progress(
-                workflow_id, 4, "ego_impact_analysis", "completed",
-                {
-                    "dimension_impacts": ego_result["pain_analysis"]["dimension_impacts"],
-                    "most_affected_dimension": ego_result["pain_analysis"]["most_affected_dimension"]
-                },
-                steps, progress_callback
-            )
-            
-            # Step 5: Athena Pain Calculation
-            await self._update_progress(
-                workflow_id, 5, "athena_pain_calculation", "processing",
-                {"message": "Calculating Athena's emotional response..."},
-                steps, progress_callback
-            )
-            
-            athena_pain = ego_result["final_pain"]
-            
+        async def on_progress(node: WorkflowNode, status: str, data: Dict[str, Any]):
             await self._update_progress(
-                workflow_id, 5, "athena_pain_calculation", "completed",
-                {
-                    "pain_level": athena_pain,
-                    "rule_based": ego_result["pain_analysis"]["rule_based_pain"],
-                    "llm_based": ego_result["pain_analysis"].get("llm_pain"),
-                    "confidence": ego_result["pain_analysis"]["confidence"]
-                },
-                steps, progress_callback
-            )
-            
-            # Step 6: Empathy Metrics
-            await self._update_progress(
-                workflow_id, 6, "empathy_metrics", "processing",
-                {"message": "Calculating empathy metrics..."},
-                steps, progress_callback
-            )
-            
-            user_summary = map_summary_to_fields(user_analysis)
-            empathy_result = empathy_from_pain(athena_pain, user_pain)
-            
-            await self._update_progress(
-                workflow_id, 6, "empathy_metrics", "completed",
-                empathy_result,
-                steps, progress_callback
-            )
-            
-            # Step 7: Response Generation
-            await self._update_progress(
-                workflow_id, 7, "response_generation", "processing",
-                {"message": "Generating empathetic response..."},
-                steps, progress_callback
-            )
-            
-            athena_profile = load_athena_profile()
-            final_response = generate_final_response(
-                user_summary=user_summary,
-                athena_profile=athena_profile
+                workflow_id, node.step_number, node.name, status,
+                data, steps, stream, progress_callback
             )
+        
+        try:
+            graph = self._build_graph(user_id, session_id, user_input, stream, state)
+            await graph.execute(on_progress=on_progress)
             
-            # Extract response text from tags
-            import re
-            response_match = re.search(
-                r"<final_answer>\s*(.*?)\s*</final_answer>",
-                final_response,
-                re.DOTALL | re.IGNORECASE
-            )
-            response_text = response_match.group(1).strip() if response_match else final_response
-            
-            await self._update_progress(
-                workflow_id, 7, "response_generation", "completed",
-                {"response": response_text},
-                steps, progress_callback
-            )
-            
-            # Step 8: Personality Adaptation
-            await self._update_progress(
-                workflow_id, 8, "personality_adaptation", "processing",
-                {"message": "Checking personality compatibility..."},
-                steps, progress_callback
-            )
-            
-            mismatch = 1 - empathy_result["alignment"]
-            personality_changed = False
-            
-            if mismatch >= config.BIG_MISMATCH_THRESHOLD:
-                from app.agents.athena_personality import athena_mbti_personalities
-                athena_mbti_type, athena_mbti_info = get_athena_mbti(athena_profile)
-                user_mbti_type = user_summary.get("personality", {}).get("mbti", "")
-                new_personality = pick_new_personality_by_user_mbti(
-                    user_mbti_type,
-                    athena_mbti_personalities  # Pass the full personalities list
-                )
-                
-                if new_personality:
-                    import os
-                    current_dir = os.path.dirname(os.path.dirname(__file__))
-                    profile_path = os.path.join(current_dir, "agents", "athena_profile.json")
-                    update_athena_mbti(profile_path, new_personality)
-                    personality_changed = True
-            
-            await self._update_progress(
-                workflow_id, 8, "personality_adaptation", "completed",
-                {
-                    "personality_changed": personality_changed,
-                    "mismatch": mismatch,
-                    "threshold": config.BIG_MISMATCH_THRESHOLD
-                },
-                steps, progress_callback
-            )
-            
-            # Step 9: Crisis Check
-            await self._update_progress(
-                workflow_id, 9, "crisis_check", "processing",
-                {"message": "Checking for crisis mode..."},
-                steps, progress_callback
-            )
-            
-            crisis_mode = user_analysis.get("crisis_mode", {})
-            crisis_detected = crisis_mode.get("crisis_mode", False)
-            
-            await self._update_progress(
-                workflow_id, 9, "crisis_check", "completed",
-                {
-                    "crisis_detected": crisis_detected,
-                    "crisis_response": user_analysis.get("crisis_response")
-                },
-                steps, progress_callback
-            )
+            athena_pain = state["athena_pain"]
             
             # Update pain history
             update_pain_history(user_input, athena_pain)
@@ -249,22 +90,22 @@ class WorkflowOrchestrator:
                 "user_id": user_id,
                 "session_id": session_id,
                 "user_input": user_input,
-                "athena_response": response_text,
-                "workflow_steps": steps,
+                "athena_response": state["response_text"],
+                "workflow_steps": [steps[n] for n in sorted(steps)],
                 "metrics": {
-                    "user_pain": user_pain,
+                    "user_pain": state["user_pain"],
                     "athena_pain": athena_pain,
-                    "empathy_metrics": empathy_result,
-                    "ego_metrics": ego_result["ego_metrics"]
+                    "empathy_metrics": state["empathy_result"],
+                    "ego_metrics": state["ego_result"]["ego_metrics"]
                 },
-                "ego_state": ego_result["ego_state"],
-                "crisis_mode": crisis_detected,
+                "ego_state": state["ego_result"]["ego_state"],
+                "crisis_mode": state["crisis_detected"],
                 "timestamp": datetime.now().isoformat()
             }
             
-            # Send completion message
-            await self._send_progress_update(
-                workflow_id,
+            # Send completion message (the only message carrying the full result)
+            await self._finish_stream(
+                stream,
                 {
                     "type": "workflow_complete",
                     "workflow_id": workflow_id,
@@ -272,31 +113,194 @@ class WorkflowOrchestrator:
                 }
             )
             
+            WORKFLOW_DURATION.observe(time.perf_counter() - started, outcome="ok")
             return result
             
         except Exception as e:
+            WORKFLOW_DURATION.observe(time.perf_counter() - started, outcome="error")
             logger.error(f"Workflow error: {e}")
-            error_step = WorkflowStep(
-                step_number=len(steps) + 1,
-                step_name="error",
-                status="error",
-                error=str(e),
-                timestamp=datetime.now()
-            )
-            steps.append(error_step)
+            error_number = max(steps, default=0) + 1
+            steps[error_number] = {
+                "step_number": error_number,
+                "step_name": "error",
+                "status": "error",
+                "error": str(e),
+                "timestamp": datetime.now()
+            }
             
-            await self._send_progress_update(
-                workflow_id,
+            await self._finish_stream(
+                stream,
                 {
                     "type": "workflow_error",
                     "workflow_id": workflow_id,
                     "error": str(e),
-                    "steps": [s.dict() for s in steps]
+                    "steps": [steps[n] for n in sorted(steps)]
                 }
             )
             
             raise
     
+    def _build_graph(
+        self,
+        user_id: str,
+        session_id: str,
+        user_input: str,
+        stream: WorkflowProgressStream,
+        state: Dict[str, Any]
+    ) -> WorkflowGraph:
+        """
+        Declare the workflow steps and their dependencies.
+        
+        Dependency graph:
+            emotion_analysis ──> user_pain_calculation, mbti_detection,
+                                 response_generation, crisis_check
+            ego_impact_analysis ──> athena_pain_calculation
+            emotion_analysis + athena_pain_calculation ──> empathy_metrics
+            empathy_metrics + response_generation ──> personality_adaptation
+        
+        Args:
+            user_id: User identifier
+            session_id: Session identifier
+            user_input: User input text
+            stream: Progress stream of the workflow (for streamed response deltas)
+            state: Dict the steps share intermediate values through
+            
+        Returns:
+            WorkflowGraph ready to execute
+        """
+        # Step 1: Emotion Analysis
+        async def emotion_analysis(results):
+            user_analysis = await analyze_user(user_id, session_id, user_input)
+            state["user_analysis"] = user_analysis
+            state["user_pain"] = float(user_analysis.get("pain_level", 0))
+            state["user_summary"] = map_summary_to_fields(user_analysis)
+            return {
+                "emotions": user_analysis.get("emotions", {}),
+                "pain_level": state["user_pain"],
+                "vad": user_analysis.get("emotions", {}).get("vad", {})
+            }
+        
+        # Step 2: User Pain Calculation
+        async def user_pain_calculation(results):
+            return {"pain_level": state["user_pain"]}
+        
+        # Step 3: MBTI Detection
+        async def mbti_detection(results):
+            return {"mbti": state["user_analysis"].get("mbti", {})}
+        
+        # Step 4: Ego Impact Analysis
+        async def ego_impact_analysis(results):
+            async with self.ego_store.session(user_id) as ego_system:
+                ego_result = await ego_system.process_user_input(user_input)
+            state["ego_result"] = ego_result
+            return {
+                "dimension_impacts": ego_result["pain_analysis"]["dimension_impacts"],
+                "most_affected_dimension": ego_result["pain_analysis"]["most_affected_dimension"]
+            }
+        
+        # Step 5: Athena Pain Calculation
+        async def athena_pain_calculation(results):
+            ego_result = state["ego_result"]
+            state["athena_pain"] = ego_result["final_pain"]
+            return {
+                "pain_level": state["athena_pain"],
+                "rule_based": ego_result["pain_analysis"]["rule_based_pain"],
+                "llm_based": ego_result["pain_analysis"].get("llm_pain"),
+                "confidence": ego_result["pain_analysis"]["confidence"]
+            }
+        
+        # Step 6: Empathy Metrics
+        async def empathy_metrics(results):
+            state["empathy_result"] = empathy_from_pain(state["athena_pain"], state["user_pain"])
+            return state["empathy_result"]
+        
+        # Step 7: Response Generation (needs only the user summary and profile)
+        async def response_generation(results):
+            athena_profile = load_athena_profile()
+            state["athena_profile"] = athena_profile
+            
+            async def send_response_delta(delta: str):
+                stream.text(delta)
+            
+            final_response = await generate_final_response(
+                user_summary=state["user_summary"],
+                athena_profile=athena_profile,
+                on_delta=send_response_delta
+            )
+            
+            # Extract response text from tags
+            response_match = re.search(
+                r"<final_answer>\s*(.*?)\s*</final_answer>",
+                final_response,
+                re.DOTALL | re.IGNORECASE
+            )
+            response_text = response_match.group(1).strip() if response_match else final_response
+            state["response_text"] = response_text
+            return {"response": response_text}
+        
+        # Step 8: Personality Adaptation
+        async def personality_adaptation(results):
+            mismatch = 1 - state["empathy_result"]["alignment"]
+            personality_changed = False
+            
+            if mismatch >= config.BIG_MISMATCH_THRESHOLD:
+                from app.agents.athena_personality import athena_mbti_personalities
+                athena_mbti_type, athena_mbti_info = get_athena_mbti(state["athena_profile"])
+                user_mbti_type = state["user_summary"].get("personality", {}).get("mbti", "")
+                new_personality = pick_new_personality_by_user_mbti(
+                    user_mbti_type,
+                    athena_mbti_personalities  # Pass the full personalities list
+                )
+                
+                # Only rewrite the profile when the personality really changes
+                if new_personality and new_personality != athena_mbti_info:
+                    update_athena_mbti(config.ATHENA_PROFILE_PATH, new_personality)
+                    personality_changed = True
+            
+            return {
+                "personality_changed": personality_changed,
+                "mismatch": mismatch,
+                "threshold": config.BIG_MISMATCH_THRESHOLD
+            }
+        
+        # Step 9: Crisis Check
+        async def crisis_check(results):
+            user_analysis = state["user_analysis"]
+            crisis_mode = user_analysis.get("crisis_mode", {})
+            state["crisis_detected"] = crisis_mode.get("crisis_mode", False)
+            return {
+                "crisis_detected": state["crisis_detected"],
+                "crisis_response": user_analysis.get("crisis_response")
+            }
+        
+        return WorkflowGraph([
+            WorkflowNode(1, "emotion_analysis", emotion_analysis,
+                         processing_message="Analyzing user emotions..."),
+            WorkflowNode(2, "user_pain_calculation", user_pain_calculation,
+                         depends_on=["emotion_analysis"],
+                         processing_message="Calculating user pain level..."),
+            WorkflowNode(3, "mbti_detection", mbti_detection,
+                         depends_on=["emotion_analysis"],
+                         processing_message="Detecting personality type..."),
+            WorkflowNode(4, "ego_impact_analysis", ego_impact_analysis,
+                         processing_message="Analyzing ego impact..."),
+            WorkflowNode(5, "athena_pain_calculation", athena_pain_calculation,
+                         depends_on=["ego_impact_analysis"],
+                         processing_message="Calculating Athena's emotional response..."),
+            WorkflowNode(6, "empathy_metrics", empathy_metrics,
+                         depends_on=["emotion_analysis", "athena_pain_calculation"],
+                         processing_message="Calculating empathy metrics..."),
+            WorkflowNode(7, "response_generation", response_generation,
+                         depends_on=["emotion_analysis"],
+                         processing_message="Generating empathetic response..."),
+            WorkflowNode(8, "personality_adaptation", personality_adaptation,
+                         depends_on=["empathy_metrics", "response_generation"],
+                         processing_message="Checking personality compatibility..."),
+            WorkflowNode(9, "crisis_check", crisis_check,
+                         depends_on=["emotion_analysis"],
+                         processing_message="Checking for crisis mode..."),
+        ])
+    
     async def _update_progress(
         self,
         workflow_id: str,
@@ -304,57 +308,50 @@ class WorkflowOrchestrator:
         step_name: str,
         status: str,
         data: Dict[str, Any],
-        steps: list,
+        steps: Dict[int, Dict[str, Any]],
+        stream: WorkflowProgressStream,
         progress_callback: Optional[Callable] = None
     ):
-        """Update workflow progress."""
-        step = WorkflowStep(
-            step_number=step_number,
-            step_name=step_name,
-            status=status,
-            data=data,
-            timestamp=datetime.now()
-        )
-        
-        # Update or add step
-        existing_idx = next(
-            (i for i, s in enumerate(steps) if s.step_number == step_number),
-            None
-        )
-        if existing_idx is not None:
-            steps[existing_idx] = step
-        else:
-            steps.append(step)
+        """
+        Update workflow progress.
         
-        # Calculate progress
-        progress = WorkflowProgress(
-            workflow_id=workflow_id,
-            current_step=step_number,
-            total_steps=9,
-            steps=steps,
-            progress_percentage=(step_number / 9) * 100
-        )
+        Only a plain step record is kept; the stream sends it if a socket
+        is subscribed, and the pydantic progress models are built only
+        for progress_callback, so workflows nobody observes (the blocking
+        /chat route) pay nothing for progress reporting.
+        """
+        step = {
+            "step_number": step_number,
+            "step_name": step_name,
+            "status": status,
+            "data": data,
+            "timestamp": datetime.now()
+        }
+        steps[step_number] = step
         
-        # Send via WebSocket
-        await self._send_progress_update(
-            workflow_id,
-            {
-                "type": "workflow_progress",
-                "progress": progress.dict()
-            }
-        )
+        # Send only this step via WebSocket (coalesced with other changes)
+        stream.step(step)
         
         # Call custom callback if provided
         if progress_callback:
+            # Calculate progress (steps may complete out of order)
+            completed = sum(1 for s in steps.values() if s["status"] == "completed")
+            progress = WorkflowProgress(
+                workflow_id=workflow_id,
+                current_step=step_number,
+                total_steps=TOTAL_STEPS,
+                steps=[WorkflowStep(**steps[n]) for n in sorted(steps)],
+                progress_percentage=(completed / TOTAL_STEPS) * 100
+            )
             try:
                 progress_callback(progress)
             except Exception as e:
                 logger.warning(f"Progress callback error: {e}")
     
-    async def _send_progress_update(self, workflow_id: str, message: Dict[str, Any]):
-        """Send progress update via WebSocket."""
+    async def _finish_stream(self, stream: WorkflowProgressStream, message: Dict[str, Any]):
+        """Flush pending progress and send the final workflow message via WebSocket."""
         try:
-            await manager.send_to_workflow(workflow_id, message)
+            await stream.finish(message)
         except Exception as e:
             logger.debug(f"Could not send progress update (no active connection): {e}")
 
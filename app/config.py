@@ -16,14 +16,29 @@ class Config:
     REDIS_HOST: str = os.getenv("REDIS_HOST", "localhost")
     REDIS_PORT: int = int(os.getenv("REDIS_PORT", "6379"))
     REDIS_DB: int = int(os.getenv("REDIS_DB", "0"))
+    REDIS_PASSWORD: Optional[str] = os.getenv("REDIS_PASSWORD", None)
+    # Shared connection pools (app.memory.redis_pool); callers wait up to
+    # REDIS_POOL_TIMEOUT seconds for a free connection when the pool is exhausted
+    REDIS_MAX_CONNECTIONS: int = int(os.getenv("REDIS_MAX_CONNECTIONS", "32"))
+    REDIS_POOL_TIMEOUT: float = float(os.getenv("REDIS_POOL_TIMEOUT", "5"))
+    REDIS_SOCKET_TIMEOUT: float = float(os.getenv("REDIS_SOCKET_TIMEOUT", "5"))
     
     # LLM Configuration
     LLM_URL: str = os.getenv("LLM_URL", "http://localhost:11434/api/generate")
     LLM_MODEL: str = os.getenv("LLM_MODEL", "qwen3:8b")
+    LLM_TIMEOUT: float = float(os.getenv("LLM_TIMEOUT", "60"))
+    LLM_CONNECT_TIMEOUT: float = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+    LLM_MAX_CONNECTIONS: int = int(os.getenv("LLM_MAX_CONNECTIONS", "64"))
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "32"))
+    LLM_KEEPALIVE_EXPIRY: float = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "30"))
+    LLM_STREAM_RESPONSES: bool = os.getenv("LLM_STREAM_RESPONSES", "True").lower() == "true"
     
     # File Paths
     PAIN_LOG_FILE: str = os.getenv("PAIN_LOG_FILE", "pain_log.json")
     USER_PAIN_LOG_FILE: str = os.getenv("USER_PAIN_LOG_FILE", "user_pain_log.json")
+    # Pain logs are JSON Lines appended by a background writer
+    PAIN_LOG_FLUSH_BYTES: int = int(os.getenv("PAIN_LOG_FLUSH_BYTES", "65536"))
+    PAIN_LOG_FLUSH_INTERVAL: float = float(os.getenv("PAIN_LOG_FLUSH_INTERVAL", "1.0"))
     ATHENA_PROFILE_PATH: str = os.getenv(
         "ATHENA_PROFILE_PATH", 
         os.path.join(os.path.dirname(__file__), "agents", "athena_profile.json")
@@ -35,12 +50,53 @@ class Config:
         "joeddav/distilbert-base-uncased-go-emotions-student"
     )
     
+    # Emotion inference backend: "torch", "torch_optimized" or "onnx"
+    EMOTION_BACKEND: str = os.getenv("EMOTION_BACKEND", "torch")
+    EMOTION_INTRA_OP_THREADS: int = int(os.getenv("EMOTION_INTRA_OP_THREADS", "0"))
+    EMOTION_ONNX_QUANTIZE: bool = os.getenv("EMOTION_ONNX_QUANTIZE", "False").lower() == "true"
+    EMOTION_ONNX_DIR: str = os.getenv("EMOTION_ONNX_DIR", "models/onnx")
+    
+    # Cross-request micro-batching for the emotion classifier
+    EMOTION_BATCH_MAX_SIZE: int = int(os.getenv("EMOTION_BATCH_MAX_SIZE", "16"))
+    EMOTION_BATCH_MAX_WAIT_MS: float = float(os.getenv("EMOTION_BATCH_MAX_WAIT_MS", "5"))
+    
+    # Emotion analysis cache (in-process LRU + Redis)
+    EMOTION_CACHE_SIZE: int = int(os.getenv("EMOTION_CACHE_SIZE", "2048"))
+    EMOTION_CACHE_TTL_SECONDS: int = int(os.getenv("EMOTION_CACHE_TTL_SECONDS", "86400"))
+    EMOTION_CACHE_REDIS: bool = os.getenv("EMOTION_CACHE_REDIS", "True").lower() == "true"
+    
+    # Cached scan results of the shared keyword/regex lexicon engine
+    LEXICON_CACHE_SIZE: int = int(os.getenv("LEXICON_CACHE_SIZE", "4096"))
+    # Rendered chart PNGs kept in memory (keyed by chart and data version)
+    CHART_CACHE_SIZE: int = int(os.getenv("CHART_CACHE_SIZE", "256"))
+    CHART_DPI: int = int(os.getenv("CHART_DPI", "100"))
+    
     # Crisis Mode
     CRISIS_CONSECUTIVE_COUNT: int = int(os.getenv("CRISIS_CONSECUTIVE_COUNT", "3"))
     
     # Ego System
     EGO_STRENGTH_DEFAULT: float = float(os.getenv("EGO_STRENGTH_DEFAULT", "0.75"))
     EGO_LEARNING_RATE: float = float(os.getenv("EGO_LEARNING_RATE", "0.05"))
+    # Ego history ring buffers; evicted entries are appended to
+    # EGO_HISTORY_SPILL_DIR/<user>-<hash>.<history>.jsonl when a directory is set
+    EGO_INTERACTION_HISTORY_SIZE: int = int(os.getenv("EGO_INTERACTION_HISTORY_SIZE", "500"))
+    EGO_SNAPSHOT_HISTORY_SIZE: int = int(os.getenv("EGO_SNAPSHOT_HISTORY_SIZE", "100"))
+    EGO_DEFENSE_HISTORY_SIZE: int = int(os.getenv("EGO_DEFENSE_HISTORY_SIZE", "500"))
+    EGO_HISTORY_SPILL_DIR: str = os.getenv("EGO_HISTORY_SPILL_DIR", "")
+    # Columnar snapshot series (EGO_SERIES_DIR/<user>-<hash>.snapshots.bin), appended
+    # by a background thread; opt-in, "" disables
+    EGO_SERIES_DIR: str = os.getenv("EGO_SERIES_DIR", "")
+    # Per-user ego state: hot instances kept in-process, the rest in Redis
+    EGO_STORE_CAPACITY: int = int(os.getenv("EGO_STORE_CAPACITY", "1024"))
+    EGO_STORE_TTL_DAYS: int = int(os.getenv("EGO_STORE_TTL_DAYS", "30"))
+    # Reload before and persist after every interaction. Keep this on when several
+    # workers (uvicorn --workers N) serve the same users, or their copies diverge
+    EGO_STORE_WRITE_THROUGH: bool = os.getenv("EGO_STORE_WRITE_THROUGH", "False").lower() == "true"
+    # Athena emotional state per user: "redis" (hash + capped events list) or "file";
+    # writes are debounced and skipped when nothing changed
+    ATHENA_STATE_BACKEND: str = os.getenv("ATHENA_STATE_BACKEND", "redis")
+    ATHENA_STATE_FLUSH_SECONDS: float = float(os.getenv("ATHENA_STATE_FLUSH_SECONDS", "2.0"))
+    ATHENA_STATE_CAPACITY: int = int(os.getenv("ATHENA_STATE_CAPACITY", "1024"))
     
     # Personality Adaptation
     BIG_MISMATCH_THRESHOLD: float = float(os.getenv("BIG_MISMATCH_THRESHOLD", "0.5"))
@@ -53,6 +109,11 @@ class Config:
     API_HOST: str = os.getenv("API_HOST", "0.0.0.0")
     API_PORT: int = int(os.getenv("API_PORT", "8000"))
     API_DEBUG: bool = os.getenv("API_DEBUG", "False").lower() == "true"
+    # WebSocket progress: step changes and reply fragments within this window are sent together
+    PROGRESS_COALESCE_MS: float = float(os.getenv("PROGRESS_COALESCE_MS", "25"))
+    
+    # Startup warmup: seconds between retries of components that are not ready yet
+    READINESS_RETRY_SECONDS: float = float(os.getenv("READINESS_RETRY_SECONDS", "5"))
     
     # Frontend
     FRONTEND_URL: str = os.getenv("FRONTEND_URL", "http://localhost:3000")
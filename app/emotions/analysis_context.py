@@ -0,0 +1,116 @@
+"""
+Request-scoped analysis context.
+Memoizes per-request artifacts (classification, recent history, MBTI result)
+so every consumer within one analyze_user call is served from memory.
+"""
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+
+class AnalysisContext:
+    """
+    Memo of analysis artifacts for a single user turn.
+    
+    Create one per request and pass it as ctx= to emotion_redis, mbti,
+    empathy and correlation helpers. Never share it across requests: it
+    holds a snapshot of the user's history at the time it was read.
+    """
+    
+    def __init__(self, user_id: str, text: str = "", history_depth: int = 10):
+        """
+        Initialize analysis context.
+        
+        Args:
+            user_id: User the request belongs to
+            text: Current user message
+            history_depth: Minimum number of recent entries to read on the
+                           first history access, so later consumers asking
+                           for fewer entries are served from the same read
+        """
+        self.user_id = user_id
+        self.text = text
+        self.history_depth = history_depth
+        self._memo: Dict[Hashable, Any] = {}
+        self._history: Optional[List[Dict[str, Any]]] = None
+        self._history_loaded_depth = 0
+        self.hits = 0
+        self.misses = 0
+    
+    def memoize(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        Return the value cached under key, computing it with factory on first use.
+        
+        Args:
+            key: Cache key, e.g. ("mbti", days)
+            factory: Zero-argument function producing the value
+            
+        Returns:
+            Cached or freshly computed value
+        """
+        if key in self._memo:
+            self.hits += 1
+            return self._memo[key]
+        self.misses += 1
+        value = factory()
+        self._memo[key] = value
+        return value
+    
+    def set(self, key: Hashable, value: Any):
+        """Store an already computed value under key."""
+        self._memo[key] = value
+    
+    def recent_emotions(self, n: int, loader: Callable[[int], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Return the n most recent history entries (most recent first).
+        
+        History is read once, at max(n, history_depth) entries; later calls
+        for the same or fewer entries are sliced from memory.
+        
+        Args:
+            n: Number of entries wanted
+            loader: Function reading the last k entries (most recent first)
+            
+        Returns:
+            New list with up to n entries
+        """
+        if self._history is None or n > self._history_loaded_depth:
+            depth = max(n, self.history_depth)
+            self.misses += 1
+            self.set_recent_emotions(loader(depth), depth)
+        else:
+            self.hits += 1
+        return list(self._history[:n])
+    
+    def cached_recent(self, n: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Return the n most recent entries if the snapshot already holds them.
+        
+        For async callers that read the history themselves instead of
+        passing a sync loader to recent_emotions.
+        
+        Args:
+            n: Number of entries wanted
+            
+        Returns:
+            New list with up to n entries, or None when not loaded deep enough
+        """
+        if self._history is None or n > self._history_loaded_depth:
+            return None
+        self.hits += 1
+        return list(self._history[:n])
+    
+    def set_recent_emotions(self, entries: List[Dict[str, Any]], depth: int):
+        """
+        Seed the history snapshot (most recent first).
+        
+        Args:
+            entries: Recent entries as read from storage
+            depth: Number of entries that were requested
+        """
+        self._history = list(entries)
+        # Fewer entries than requested means we already hold the whole history
+        self._history_loaded_depth = depth if len(entries) >= depth else float("inf")
+    
+    def invalidate_recent(self):
+        """Drop the history snapshot (call after writing to the history)."""
+        self._history = None
+        self._history_loaded_depth = 0
@@ -0,0 +1,163 @@
+"""
+Cross-request micro-batching for model inference.
+Concurrent callers submit single inputs; a background worker groups them
+into batches and runs one batched forward pass per group.
+"""
+import asyncio
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.utils.logger import logger
+
+
+class InferenceBatcher:
+    """
+    Collects concurrent inference requests and runs them as batches.
+    
+    A batch is dispatched when it reaches max_batch_size or when the oldest
+    request in it has waited max_wait_ms, whichever comes first. Inference
+    runs on a dedicated worker thread so the event loop is never blocked.
+    """
+    
+    def __init__(
+        self,
+        predict_batch: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5.0,
+        name: str = "batcher"
+    ):
+        """
+        Initialize the batcher.
+        
+        Args:
+            predict_batch: Function mapping a list of inputs to a list of
+                           outputs of the same length and order
+            max_batch_size: Maximum number of inputs per batch
+            max_wait_ms: Maximum time to wait for a batch to fill (milliseconds)
+            name: Name used in logs and stats
+        """
+        self.predict_batch = predict_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.name = name
+        
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{name}-infer")
+        
+        # Stats
+        self._batch_sizes: Counter = Counter()
+        self._queue_depths: Counter = Counter()
+        self._total_requests = 0
+        self._total_batches = 0
+        self._total_inference_seconds = 0.0
+        self._in_flight = 0
+    
+    def _ensure_worker(self):
+        """Start the worker task on the running loop (restart if the loop changed)."""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+            logger.debug(f"{self.name}: worker started (max_batch_size={self.max_batch_size}, "
+                         f"max_wait_ms={self.max_wait * 1000:.1f})")
+    
+    async def submit(self, item: Any) -> Any:
+        """
+        Submit one input and wait for its output.
+        
+        Args:
+            item: Single model input
+            
+        Returns:
+            Model output for this input
+        """
+        self._ensure_worker()
+        future = self._loop.create_future()
+        self._queue.put_nowait((item, future))
+        self._total_requests += 1
+        return await future
+    
+    async def _collect_batch(self) -> List[Tuple[Any, asyncio.Future]]:
+        """Wait for the first request, then gather more until full or timed out."""
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+        
+        while len(batch) < self.max_batch_size:
+            # Take whatever is already queued without waiting
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+    
+    async def _run(self):
+        """Worker loop: collect a batch, run it off-loop, resolve futures."""
+        while True:
+            batch = await self._collect_batch()
+            # Drop requests whose callers have gone away
+            batch = [(item, fut) for item, fut in batch if not fut.done()]
+            if not batch:
+                continue
+            
+            self._queue_depths[self._queue.qsize()] += 1
+            self._batch_sizes[len(batch)] += 1
+            self._total_batches += 1
+            self._in_flight = len(batch)
+            
+            items = [item for item, _ in batch]
+            started = time.perf_counter()
+            try:
+                outputs = await self._loop.run_in_executor(self._executor, self.predict_batch, items)
+                if len(outputs) != len(items):
+                    raise RuntimeError(
+                        f"{self.name}: predict_batch returned {len(outputs)} outputs for {len(items)} inputs"
+                    )
+            except Exception as e:
+                logger.error(f"{self.name}: batch of {len(items)} failed: {e}")
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+            else:
+                for (_, fut), output in zip(batch, outputs):
+                    if not fut.done():
+                        fut.set_result(output)
+            finally:
+                self._total_inference_seconds += time.perf_counter() - started
+                self._in_flight = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get batching statistics.
+        
+        Returns:
+            Dictionary with current queue depth, totals and histograms of
+            batch sizes and of queue depth observed at dispatch time
+        """
+        return {
+            "name": self.name,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "in_flight": self._in_flight,
+            "total_requests": self._total_requests,
+            "total_batches": self._total_batches,
+            "average_batch_size": (
+                sum(size * count for size, count in self._batch_sizes.items()) / self._total_batches
+                if self._total_batches else 0.0
+            ),
+            "average_batch_seconds": (
+                self._total_inference_seconds / self._total_batches if self._total_batches else 0.0
+            ),
+            "batch_size_histogram": {str(k): v for k, v in sorted(self._batch_sizes.items())},
+            "queue_depth_histogram": {str(k): v for k, v in sorted(self._queue_depths.items())}
+        }
@@ -0,0 +1,303 @@
+"""
+On-demand chart rendering, off the chat request path.
+
+Charts are drawn with matplotlib's headless Agg canvas (no pyplot, no GUI
+state) in a worker thread and cached as PNG bytes keyed by chart and data
+version, so a chart is only re-rendered after new data arrives.
+
+Charts:
+- pain_history:       pain log (source "user" or "athena"), versioned by file size/mtime
+- empathy_gauge:      latest empathy match score of a user
+- empathy_breakdown:  latest cognitive/emotional/motivational breakdown of a user
+- mbti_radar:         latest MBTI axis scores of a user
+
+analyze_user publishes the per-user inputs with chart_service.publish();
+the API serves images from chart_service.render().
+"""
+import asyncio
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from app.config import config
+from app.utils.jsonl_log import get_log_writer, read_log
+from app.utils.logger import logger
+
+
+class ChartDataUnavailable(Exception):
+    """No data has been recorded yet for the requested chart."""
+
+
+# -----------------------------
+# Figure builders (headless)
+# -----------------------------
+def _parse_pain(value: Any) -> float:
+    """Pain value from a log entry, tolerating strings like "0.6" or "60%", clamped to [-1, 1]."""
+    try:
+        if isinstance(value, str):
+            value = value.strip()
+            value = float(value.rstrip("%")) / 100.0 if value.endswith("%") else float(value)
+        else:
+            value = float(value)
+    except (TypeError, ValueError):
+        value = 0.0
+    return max(-1.0, min(1.0, value))
+
+
+def pain_history_figure(entries: list) -> Figure:
+    """Pain level evolution with fixed Y axis (-1 to 1)."""
+    queries = [e.get("user_query") or e.get("query") or f"entry_{i}" for i, e in enumerate(entries)]
+    pains = [round(_parse_pain(e.get("pain_status", e.get("pain_level"))), 2) for e in entries]
+    x = list(range(len(pains)))
+    short_labels = [(q[:25] + "...") if isinstance(q, str) and len(q) > 25 else q for q in queries]
+    
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
+    ax.plot(x, pains, marker="o", linestyle="-", linewidth=2, label="Pain Level")
+    ax.set_ylim(-1.0, 1.0)
+    ax.set_autoscaley_on(False)
+    ax.set_yticks(np.linspace(-1.0, 1.0, 9))
+    # Label every query only while they stay readable
+    if len(x) <= 60:
+        ax.set_xticks(x)
+        ax.set_xticklabels(short_labels, rotation=45, ha="right")
+    ax.axhline(0, color="gray", linestyle="--", linewidth=1)
+    ax.grid(True, axis="y", linestyle="--", alpha=0.4)
+    ax.set_xlabel("User Query (shortened)")
+    ax.set_ylabel("Pain Level (clipped to [-1,1])")
+    ax.set_title("Pain Level Evolution (fixed Y-axis -1 to 1)")
+    ax.legend()
+    fig.tight_layout()
+    return fig
+
+
+def empathy_gauge_figure(empathy_score: float) -> Figure:
+    """Speedometer-style gauge of the empathy match score (0-1)."""
+    empathy_score = max(0.0, min(1.0, float(empathy_score)))
+    fig = Figure(figsize=(6, 4))
+    ax = fig.subplots()
+    ax.axis("off")
+    
+    theta = np.linspace(0, np.pi, 100)
+    ax.plot(np.cos(theta), np.sin(theta), color="lightgray", linewidth=30, solid_capstyle="round")
+    score_theta = np.linspace(0, np.pi * empathy_score, 100)
+    ax.plot(np.cos(score_theta), np.sin(score_theta), color="dodgerblue", linewidth=30, solid_capstyle="round")
+    pointer_theta = np.pi * empathy_score
+    ax.plot([0, 0.9 * np.cos(pointer_theta)], [0, 0.9 * np.sin(pointer_theta)], color="red", linewidth=4)
+    ax.text(0, -0.1, f"Empathy Match: {empathy_score:.2f}", horizontalalignment="center", fontsize=14, fontweight="bold")
+    return fig
+
+
+def empathy_breakdown_figure(breakdown: Dict[str, float]) -> Figure:
+    """Bar chart of the empathy match breakdown (cognitive, emotional, motivational)."""
+    labels = list(breakdown.keys())
+    values = [breakdown[label] for label in labels]
+    fig = Figure(figsize=(8, 5))
+    ax = fig.subplots()
+    bars = ax.bar(labels, values, color=["skyblue", "salmon", "limegreen"][:len(labels)])
+    ax.set_ylim(0, 1.0)
+    ax.set_title("Empathy Match Breakdown")
+    ax.set_ylabel("Matching Score")
+    for bar in bars:
+        yval = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width() / 2.0, yval + 0.02, f"{yval:.2f}", ha="center", va="bottom")
+    return fig
+
+
+def mbti_radar_figure(axis_scores: Dict[str, float], mbti_label: str) -> Figure:
+    """Radar chart of MBTI axis fractions."""
+    labels = ["E", "I", "S", "N", "T", "F", "J", "P"]
+    scores = [axis_scores.get(l, 0.5) for l in labels]
+    angles = [n / float(len(labels)) * 2 * np.pi for n in range(len(labels))]
+    scores += scores[:1]
+    angles += angles[:1]
+    fig = Figure(figsize=(6, 6))
+    ax = fig.add_subplot(111, polar=True)
+    ax.plot(angles, scores, linewidth=2, linestyle="solid", label=mbti_label)
+    ax.fill(angles, scores, alpha=0.25)
+    ax.set_xticks(angles[:-1])
+    ax.set_xticklabels(labels)
+    ax.set_title(f"MBTI Radar: {mbti_label}")
+    ax.legend()
+    return fig
+
+
+def figure_to_png(fig: Figure, dpi: Optional[int] = None) -> bytes:
+    buffer = io.BytesIO()
+    FigureCanvasAgg(fig)
+    fig.savefig(buffer, format="png", dpi=dpi or config.CHART_DPI)
+    return buffer.getvalue()
+
+
+# -----------------------------
+# Render service
+# -----------------------------
+PAIN_LOG_SOURCES = {
+    "user": lambda: config.USER_PAIN_LOG_FILE,
+    "athena": lambda: config.PAIN_LOG_FILE
+}
+
+USER_CHARTS = {"empathy_gauge", "empathy_breakdown", "mbti_radar"}
+CHARTS = {"pain_history"} | USER_CHARTS
+
+
+def _data_version(data: Any) -> str:
+    return hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+class ChartRenderService:
+    """
+    Renders charts on demand and caches the PNGs by (chart, data version).
+    
+    Per-user chart inputs are the latest published values, kept in a bounded
+    in-process map; concurrent requests for the same image share one render.
+    """
+    
+    def __init__(self, cache_size: Optional[int] = None):
+        self.cache_size = cache_size or config.CHART_CACHE_SIZE
+        self._images: "OrderedDict[Tuple, bytes]" = OrderedDict()
+        self._latest: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.renders = 0
+        self.hits = 0
+    
+    def publish(self, user_id: str, empathy_match: Optional[Dict[str, Any]] = None, mbti: Optional[Dict[str, Any]] = None):
+        """
+        Record the latest chart inputs of a user (cheap; no rendering).
+        
+        Args:
+            user_id: User identifier
+            empathy_match: Result of empathy_match()
+            mbti: Result of detect_mbti_for_user()
+        """
+        with self._lock:
+            data = self._latest.setdefault(user_id, {})
+            if empathy_match is not None:
+                data["empathy_match"] = empathy_match
+            if mbti is not None:
+                data["mbti"] = mbti
+            self._latest.move_to_end(user_id)
+            while len(self._latest) > self.cache_size:
+                self._latest.popitem(last=False)
+    
+    def _source(self, chart: str, user_id: Optional[str], source: str) -> Tuple[str, Callable[[], Figure]]:
+        """Data version and figure builder of a chart request."""
+        if chart == "pain_history":
+            if source not in PAIN_LOG_SOURCES:
+                raise ValueError(f"Unknown pain log source: {source}")
+            path = PAIN_LOG_SOURCES[source]()
+            # Include entries still buffered by the background log writer
+            get_log_writer(path).flush()
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                raise ChartDataUnavailable(f"No pain log found: {path}")
+            version = f"{stat.st_size}-{stat.st_mtime_ns}"
+            return version, lambda: pain_history_figure(read_log(path))
+        
+        with self._lock:
+            data = dict(self._latest.get(user_id or "", {}))
+        if chart in ("empathy_gauge", "empathy_breakdown"):
+            match = data.get("empathy_match")
+            if not match:
+                raise ChartDataUnavailable(f"No empathy match recorded for {user_id}")
+            if chart == "empathy_gauge":
+                score = match.get("empathy_match", 0.0)
+                return _data_version(score), lambda: empathy_gauge_figure(score)
+            breakdown = match.get("breakdown") or {}
+            if not breakdown:
+                raise ChartDataUnavailable(f"No empathy breakdown recorded for {user_id}")
+            return _data_version(breakdown), lambda: empathy_breakdown_figure(breakdown)
+        
+        mbti = data.get("mbti")
+        if not mbti or not mbti.get("axis_scores"):
+            raise ChartDataUnavailable(f"No MBTI scores recorded for {user_id}")
+        label, scores = mbti.get("mbti", ""), mbti["axis_scores"]
+        return _data_version([label, scores]), lambda: mbti_radar_figure(scores, label)
+    
+    async def render(self, chart: str, user_id: Optional[str] = None, source: str = "user") -> Tuple[bytes, str]:
+        """
+        PNG of a chart, rendered in a worker thread only when its data changed.
+        
+        Args:
+            chart: One of CHARTS
+            user_id: User (required for per-user charts)
+            source: Pain log for pain_history ("user" or "athena")
+        
+        Returns:
+            (png bytes, data version usable as an ETag)
+        
+        Raises:
+            ValueError: Unknown chart or source
+            ChartDataUnavailable: Nothing recorded yet
+        """
+        if chart not in CHARTS:
+            raise ValueError(f"Unknown chart: {chart}")
+        if chart in USER_CHARTS and not user_id:
+            raise ValueError(f"{chart} requires user_id")
+        
+        version, build = await asyncio.to_thread(self._source, chart, user_id, source)
+        owner = source if chart == "pain_history" else user_id
+        key = (chart, owner, version)
+        
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return image, version
+        
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[key] = future
+            try:
+                image = await asyncio.to_thread(lambda: figure_to_png(build()))
+                self.renders += 1
+                with self._lock:
+                    self._images[key] = image
+                    # Older versions of the same chart are never served again
+                    for stale in [k for k in self._images if k[:2] == key[:2] and k != key]:
+                        del self._images[stale]
+                    while len(self._images) > self.cache_size:
+                        self._images.popitem(last=False)
+                future.set_result(image)
+            except Exception as e:
+                logger.error(f"Chart render failed ({chart}): {e}")
+                future.set_exception(e)
+                # Mark retrieved so an unawaited failure is not reported again
+                future.exception()
+                raise
+            finally:
+                self._inflight.pop(key, None)
+                # Cancelled before finishing: release the requests waiting on it
+                if not future.done():
+                    future.cancel()
+        else:
+            try:
+                image = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The request rendering it was cancelled, not this one
+                return await self.render(chart, user_id, source)
+        return image, version
+    
+    def stats(self) -> Dict[str, int]:
+        return {
+            "cached_images": len(self._images),
+            "users": len(self._latest),
+            "renders": self.renders,
+            "cache_hits": self.hits
+        }
+
+
+# Process-wide render service
+chart_service = ChartRenderService()
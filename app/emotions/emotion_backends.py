@@ -0,0 +1,360 @@
+"""
+Inference backends for the GoEmotions emotion classifier.
+
+Backends (selected with config.EMOTION_BACKEND):
+- "torch":           transformers pipeline, PyTorch eager (reference)
+- "torch_optimized": PyTorch under inference_mode with tuned intra-op threads
+- "onnx":            exported ONNX Runtime graph, optionally int8 dynamic-quantized
+
+Every backend maps a list of texts to one label -> score dict per text,
+using the same activation the transformers pipeline applies.
+
+Parity check against the reference backend:
+    python -m app.emotions.emotion_backends --candidate onnx --reference torch
+"""
+import os
+import argparse
+import json
+import sys
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+import numpy as np
+from app.config import config
+from app.utils.logger import logger
+from app.utils.error_handler import EmotionAnalysisError
+
+
+PARITY_TEXTS = [
+    "I feel great today!",
+    "I hate you Athena",
+    "I want to die",
+    "thanks",
+    "ok",
+    "Maybe we could plan a party with friends this weekend?",
+    "I'm so confused about what to do next with my life.",
+    "You're just a stupid program, you can't help me.",
+    "I love being with dogs and cats.",
+    "Nothing really matters anymore, I'm so tired and alone."
+]
+
+
+def _activation_for(model_config: Any) -> str:
+    """Pick the output activation the transformers pipeline would use."""
+    problem_type = getattr(model_config, "problem_type", None)
+    num_labels = getattr(model_config, "num_labels", 2)
+    if problem_type == "multi_label_classification" or num_labels == 1:
+        return "sigmoid"
+    return "softmax"
+
+
+def _apply_activation(logits: np.ndarray, activation: str) -> np.ndarray:
+    """Apply sigmoid or softmax over the last axis."""
+    logits = logits.astype(np.float64)
+    if activation == "sigmoid":
+        return 1.0 / (1.0 + np.exp(-logits))
+    shifted = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+def _max_length(tokenizer: Any, model_config: Any) -> int:
+    """Token limit inputs are truncated to (same for every backend, so scores agree)."""
+    limits = [
+        getattr(tokenizer, "model_max_length", None),
+        getattr(model_config, "max_position_embeddings", None)
+    ]
+    # Tokenizers without a configured limit report a huge sentinel value
+    limits = [int(limit) for limit in limits if limit and limit < 100_000]
+    return min(limits) if limits else 512
+
+
+def _scores_from_probs(probs: np.ndarray, id2label: Dict[int, str]) -> List[Dict[str, float]]:
+    """Convert a (batch, labels) probability matrix into label -> score dicts."""
+    return [
+        {id2label[i]: float(row[i]) for i in range(row.shape[0])}
+        for row in probs
+    ]
+
+
+class EmotionBackend(ABC):
+    """Base class for emotion classifier backends."""
+    
+    name = "base"
+    
+    @abstractmethod
+    def predict(self, texts: List[str]) -> List[Dict[str, float]]:
+        """
+        Classify a batch of texts.
+        
+        Args:
+            texts: Input texts
+            
+        Returns:
+            One label -> score dict per text, in input order
+        """
+
+
+class TorchPipelineBackend(EmotionBackend):
+    """transformers pipeline in PyTorch eager mode (reference backend)."""
+    
+    name = "torch"
+    
+    def __init__(self, model_name: str):
+        from transformers import pipeline
+        self.pipeline = pipeline("text-classification", model=model_name, top_k=None)
+        self.max_length = _max_length(self.pipeline.tokenizer, self.pipeline.model.config)
+    
+    def predict(self, texts: List[str]) -> List[Dict[str, float]]:
+        # Truncate like the other backends: an over-long text would otherwise
+        # fail the whole micro-batch it was sent with
+        outputs = self.pipeline(
+            texts, top_k=None, batch_size=len(texts), truncation=True, max_length=self.max_length
+        )
+        # A single-item batch may come back unwrapped
+        if len(texts) == 1 and outputs and isinstance(outputs[0], dict):
+            outputs = [outputs]
+        return [
+            {item["label"]: float(item["score"]) for item in out if "label" in item and "score" in item}
+            for out in outputs
+        ]
+
+
+class TorchOptimizedBackend(EmotionBackend):
+    """PyTorch model called directly under inference_mode with tuned intra-op threads."""
+    
+    name = "torch_optimized"
+    
+    def __init__(self, model_name: str, intra_op_threads: int = 0):
+        import torch
+        from transformers import AutoTokenizer, AutoModelForSequenceClassification
+        
+        if intra_op_threads > 0:
+            torch.set_num_threads(intra_op_threads)
+        self.torch = torch
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        self.model.eval()
+        self.id2label = {int(k): v for k, v in self.model.config.id2label.items()}
+        self.activation = _activation_for(self.model.config)
+        self.max_length = _max_length(self.tokenizer, self.model.config)
+        logger.info(f"torch_optimized backend ready (threads={torch.get_num_threads()})")
+    
+    def predict(self, texts: List[str]) -> List[Dict[str, float]]:
+        encoded = self.tokenizer(
+            texts, padding=True, truncation=True, max_length=self.max_length, return_tensors="pt"
+        )
+        with self.torch.inference_mode():
+            logits = self.model(**encoded).logits
+        return _scores_from_probs(_apply_activation(logits.numpy(), self.activation), self.id2label)
+
+
+class OnnxBackend(EmotionBackend):
+    """ONNX Runtime graph exported from the PyTorch model, optionally int8-quantized."""
+    
+    name = "onnx"
+    
+    def __init__(
+        self,
+        model_name: str,
+        export_dir: str,
+        quantize: bool = False,
+        intra_op_threads: int = 0
+    ):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise EmotionAnalysisError(
+                "EMOTION_BACKEND=onnx requires the 'onnxruntime' package (and 'onnx' to export)"
+            ) from e
+        from transformers import AutoTokenizer, AutoConfig
+        
+        # Quantized scores differ slightly, keep them distinguishable (cache keys, parity reports)
+        self.name = backend_name("onnx", quantize)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model_config = AutoConfig.from_pretrained(model_name)
+        self.id2label = {int(k): v for k, v in model_config.id2label.items()}
+        self.activation = _activation_for(model_config)
+        self.max_length = _max_length(self.tokenizer, model_config)
+        
+        model_dir = os.path.join(export_dir, model_name.replace("/", "__"))
+        fp32_path = os.path.join(model_dir, "model.onnx")
+        if not os.path.exists(fp32_path):
+            self._export(model_name, fp32_path)
+        
+        model_path = fp32_path
+        if quantize:
+            model_path = os.path.join(model_dir, "model.int8.onnx")
+            if not os.path.exists(model_path):
+                from onnxruntime.quantization import quantize_dynamic, QuantType
+                logger.info(f"Quantizing {fp32_path} to int8")
+                quantize_dynamic(fp32_path, model_path, weight_type=QuantType.QInt8)
+        
+        options = ort.SessionOptions()
+        if intra_op_threads > 0:
+            options.intra_op_num_threads = intra_op_threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        logger.info(f"onnx backend ready ({os.path.basename(model_path)})")
+    
+    @staticmethod
+    def _export(model_name: str, path: str):
+        """Export the PyTorch model to ONNX with dynamic batch and sequence axes."""
+        import torch
+        from transformers import AutoTokenizer, AutoModelForSequenceClassification
+        
+        logger.info(f"Exporting {model_name} to ONNX at {path}")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        model.eval()
+        sample = tokenizer(["export sample"], return_tensors="pt")
+        input_names = [name for name in ("input_ids", "attention_mask") if name in sample]
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["logits"] = {0: "batch"}
+        with torch.inference_mode():
+            torch.onnx.export(
+                model,
+                tuple(sample[name] for name in input_names),
+                path,
+                input_names=input_names,
+                output_names=["logits"],
+                dynamic_axes=dynamic_axes,
+                opset_version=14
+            )
+    
+    def predict(self, texts: List[str]) -> List[Dict[str, float]]:
+        encoded = self.tokenizer(
+            texts, padding=True, truncation=True, max_length=self.max_length, return_tensors="np"
+        )
+        feeds = {
+            name: value.astype(np.int64)
+            for name, value in encoded.items() if name in self.input_names
+        }
+        logits = self.session.run(["logits"], feeds)[0]
+        return _scores_from_probs(_apply_activation(logits, self.activation), self.id2label)
+
+
+def backend_name(name: Optional[str] = None, quantize: Optional[bool] = None) -> str:
+    """
+    Name of the configured backend without loading it.
+    
+    Quantized ONNX is reported as "onnx-int8".
+    """
+    name = (name or config.EMOTION_BACKEND).lower()
+    if quantize is None:
+        quantize = config.EMOTION_ONNX_QUANTIZE
+    if name == "onnx" and quantize:
+        return "onnx-int8"
+    return name
+
+
+def create_backend(name: Optional[str] = None, model_name: Optional[str] = None) -> EmotionBackend:
+    """
+    Create the emotion backend selected in config.
+    
+    Args:
+        name: Backend name (defaults to config.EMOTION_BACKEND)
+        model_name: Model name (defaults to config.EMOTION_MODEL)
+        
+    Returns:
+        EmotionBackend instance
+    """
+    name = (name or config.EMOTION_BACKEND).lower()
+    model_name = model_name or config.EMOTION_MODEL
+    
+    if name == "torch":
+        return TorchPipelineBackend(model_name)
+    if name == "torch_optimized":
+        return TorchOptimizedBackend(model_name, intra_op_threads=config.EMOTION_INTRA_OP_THREADS)
+    if name == "onnx":
+        return OnnxBackend(
+            model_name,
+            export_dir=config.EMOTION_ONNX_DIR,
+            quantize=config.EMOTION_ONNX_QUANTIZE,
+            intra_op_threads=config.EMOTION_INTRA_OP_THREADS
+        )
+    raise ValueError(f"Unknown emotion backend: {name}")
+
+
+def check_parity(
+    candidate: EmotionBackend,
+    reference: EmotionBackend,
+    texts: Optional[List[str]] = None,
+    score_tolerance: float = 0.02,
+    derived_tolerance: float = 0.05
+) -> Dict[str, Any]:
+    """
+    Compare a candidate backend against the reference backend.
+    
+    Checks the per-label scores and the derived VAD, intensity and pain
+    values (as computed by emotion_redis) for every text.
+    
+    Args:
+        candidate: Backend under test
+        reference: Reference backend (usually "torch")
+        texts: Texts to compare (defaults to PARITY_TEXTS)
+        score_tolerance: Max allowed absolute difference per label score
+        derived_tolerance: Max allowed absolute difference for VAD/intensity/pain
+        
+    Returns:
+        Report dictionary with max differences and an overall "passed" flag
+    """
+    from app.emotions.emotion_redis import emotion_analysis_from_scores, detect_user_pain
+    
+    texts = texts or PARITY_TEXTS
+    cand_scores = candidate.predict(texts)
+    ref_scores = reference.predict(texts)
+    
+    max_score_diff = 0.0
+    max_derived_diff = {"valence": 0.0, "arousal": 0.0, "dominance": 0.0, "intensity": 0.0, "pain": 0.0}
+    failures = []
+    
+    for text, cand, ref in zip(texts, cand_scores, ref_scores):
+        if set(cand) != set(ref):
+            failures.append({"text": text, "reason": "label sets differ"})
+            continue
+        score_diff = max(abs(cand[label] - ref[label]) for label in ref)
+        max_score_diff = max(max_score_diff, score_diff)
+        
+        cand_analysis = emotion_analysis_from_scores(cand)
+        ref_analysis = emotion_analysis_from_scores(ref)
+        derived = {axis: abs(cand_analysis["vad"][axis] - ref_analysis["vad"][axis])
+                   for axis in ("valence", "arousal", "dominance")}
+        derived["intensity"] = abs(cand_analysis["intensity"] - ref_analysis["intensity"])
+        derived["pain"] = abs(detect_user_pain(cand_analysis) - detect_user_pain(ref_analysis))
+        for key, value in derived.items():
+            max_derived_diff[key] = max(max_derived_diff[key], value)
+        
+        if score_diff > score_tolerance or any(v > derived_tolerance for v in derived.values()):
+            failures.append({"text": text, "max_score_diff": score_diff, "derived_diff": derived})
+    
+    return {
+        "candidate": candidate.name,
+        "reference": reference.name,
+        "texts": len(texts),
+        "max_score_diff": max_score_diff,
+        "max_derived_diff": max_derived_diff,
+        "score_tolerance": score_tolerance,
+        "derived_tolerance": derived_tolerance,
+        "failures": failures,
+        "passed": not failures
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check emotion backend parity")
+    parser.add_argument("--candidate", default=config.EMOTION_BACKEND)
+    parser.add_argument("--reference", default="torch")
+    parser.add_argument("--score-tolerance", type=float, default=0.02)
+    parser.add_argument("--derived-tolerance", type=float, default=0.05)
+    args = parser.parse_args()
+    
+    report = check_parity(
+        create_backend(args.candidate),
+        create_backend(args.reference),
+        score_tolerance=args.score_tolerance,
+        derived_tolerance=args.derived_tolerance
+    )
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["passed"] else 1)
@@ -0,0 +1,255 @@
+"""
+Two-tier cache for emotion analysis results.
+Tier 1 is a bounded in-process LRU, tier 2 is Redis with a TTL.
+Entries are keyed by a hash of the model name and the normalized text.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+from app.utils.logger import logger
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text for cache lookup.
+    The emotion model is uncased, so case and whitespace runs do not change its output.
+    """
+    return " ".join(text.lower().split())
+
+
+def copy_analysis(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy an analysis dict so callers cannot mutate cached state."""
+    copied = dict(analysis)
+    for field in ("emotions", "vad"):
+        if isinstance(copied.get(field), dict):
+            copied[field] = dict(copied[field])
+    return copied
+
+
+class EmotionCache:
+    """
+    In-process LRU in front of a Redis tier, with hit/miss counters.
+    
+    The model name is part of every key, and the cache drops its
+    in-process entries when the configured model changes.
+    """
+    
+    def __init__(
+        self,
+        model_name_getter: Callable[[], str],
+        max_entries: int = 2048,
+        ttl_seconds: int = 86400,
+        redis_client: Any = None,
+        prefix: str = "emotion_cache",
+        async_redis_client: Any = None
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            model_name_getter: Returns the current model name (e.g. lambda: config.EMOTION_MODEL)
+            max_entries: Maximum number of in-process entries
+            ttl_seconds: TTL for Redis entries
+            redis_client: Optional Redis client (decode_responses=True); None disables tier 2
+            prefix: Redis key prefix
+            async_redis_client: Optional redis.asyncio client used by aget/aput
+        """
+        self.model_name_getter = model_name_getter
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = int(ttl_seconds)
+        self.redis_client = redis_client
+        self.async_redis_client = async_redis_client
+        self.prefix = prefix
+        
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._model_name = model_name_getter()
+        
+        self.memory_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+    
+    def _model_tag(self) -> str:
+        return hashlib.sha1(self._model_name.encode("utf-8")).hexdigest()[:12]
+    
+    def _key(self, text: str) -> str:
+        digest = hashlib.sha256(
+            f"{self._model_name}\0{normalize_text(text)}".encode("utf-8")
+        ).hexdigest()
+        return f"{self.prefix}:{self._model_tag()}:{digest}"
+    
+    def _model_change(self) -> Optional[str]:
+        """The new model name if the configured model has changed, else None."""
+        current = self.model_name_getter()
+        if current == self._model_name:
+            return None
+        logger.info(f"Emotion model changed ({self._model_name} -> {current}), invalidating cache")
+        return current
+    
+    def _check_model(self):
+        """Invalidate cached entries if the configured model has changed."""
+        current = self._model_change()
+        if current is not None:
+            self.invalidate()
+            self._model_name = current
+    
+    async def _acheck_model(self):
+        """Async variant of _check_model(); Redis keys are scanned with the async client."""
+        current = self._model_change()
+        if current is not None:
+            await self.ainvalidate()
+            self._model_name = current
+    
+    def _memory_get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            analysis = self._entries.get(key)
+            if analysis is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return copy_analysis(analysis)
+        return None
+    
+    def _redis_hit(self, key: str, raw: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not raw:
+            self.misses += 1
+            return None
+        analysis = json.loads(raw)
+        self._remember(key, analysis)
+        self.redis_hits += 1
+        return copy_analysis(analysis)
+    
+    def get(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached analysis.
+        
+        Args:
+            text: Raw user text
+            
+        Returns:
+            Copy of the cached analysis, or None on miss
+        """
+        self._check_model()
+        key = self._key(text)
+        
+        analysis = self._memory_get(key)
+        if analysis is not None:
+            return analysis
+        
+        raw = None
+        if self.redis_client is not None:
+            try:
+                raw = self.redis_client.get(key)
+            except Exception as e:
+                logger.debug(f"Emotion cache Redis lookup failed: {e}")
+        return self._redis_hit(key, raw)
+    
+    async def aget(self, text: str) -> Optional[Dict[str, Any]]:
+        """Async variant of get(); the Redis tier goes through the async client."""
+        await self._acheck_model()
+        key = self._key(text)
+        
+        analysis = self._memory_get(key)
+        if analysis is not None:
+            return analysis
+        
+        raw = None
+        if self.async_redis_client is not None:
+            try:
+                raw = await self.async_redis_client.get(key)
+            except Exception as e:
+                logger.debug(f"Emotion cache Redis lookup failed: {e}")
+        return self._redis_hit(key, raw)
+    
+    def put(self, text: str, analysis: Dict[str, Any]):
+        """
+        Store an analysis in both tiers.
+        
+        Args:
+            text: Raw user text
+            analysis: Analysis dict from analyze_emotion_text
+        """
+        key = self._key(text)
+        analysis = copy_analysis(analysis)
+        self._remember(key, analysis)
+        
+        if self.redis_client is not None:
+            try:
+                self.redis_client.set(key, json.dumps(analysis), ex=self.ttl_seconds)
+            except Exception as e:
+                logger.debug(f"Emotion cache Redis store failed: {e}")
+    
+    async def aput(self, text: str, analysis: Dict[str, Any]):
+        """Async variant of put(); the Redis tier goes through the async client."""
+        key = self._key(text)
+        analysis = copy_analysis(analysis)
+        self._remember(key, analysis)
+        
+        if self.async_redis_client is not None:
+            try:
+                await self.async_redis_client.set(key, json.dumps(analysis), ex=self.ttl_seconds)
+            except Exception as e:
+                logger.debug(f"Emotion cache Redis store failed: {e}")
+    
+    def _remember(self, key: str, analysis: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = analysis
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self):
+        """Drop all in-process entries and the Redis entries of the current model."""
+        with self._lock:
+            self._entries.clear()
+        self.invalidations += 1
+        
+        if self.redis_client is not None:
+            try:
+                pattern = f"{self.prefix}:{self._model_tag()}:*"
+                for key in self.redis_client.scan_iter(match=pattern, count=500):
+                    self.redis_client.delete(key)
+            except Exception as e:
+                logger.debug(f"Emotion cache Redis invalidation failed: {e}")
+    
+    async def ainvalidate(self):
+        """Async variant of invalidate(), on the async Redis client."""
+        with self._lock:
+            self._entries.clear()
+        self.invalidations += 1
+        
+        if self.async_redis_client is not None:
+            try:
+                pattern = f"{self.prefix}:{self._model_tag()}:*"
+                keys = []
+                async for key in self.async_redis_client.scan_iter(match=pattern, count=500):
+                    keys.append(key)
+                    if len(keys) >= 500:
+                        await self.async_redis_client.delete(*keys)
+                        keys = []
+                if keys:
+                    await self.async_redis_client.delete(*keys)
+            except Exception as e:
+                logger.debug(f"Emotion cache Redis invalidation failed: {e}")
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+        
+        Returns:
+            Dictionary with per-tier hit counts, misses, hit rate and size
+        """
+        lookups = self.memory_hits + self.redis_hits + self.misses
+        return {
+            "model": self._model_name,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "memory_hits": self.memory_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.redis_hits) / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "redis_enabled": self.redis_client is not None or self.async_redis_client is not None
+        }
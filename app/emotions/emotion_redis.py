@@ -1,56 +1,93 @@
 # emotion_redis.py
-import redis
-from transformers import pipeline
-from typing import Dict, Any
+import threading
+from typing import Dict, Any, List, Optional
 import json
 from datetime import datetime
 
 from app.emotions.llmfriendly import summarize_user_state
 from app.emotions.llmfriendly import make_llm_friendly
-from app.emotions.empathy import plot_empathy_gauge
-from app.emotions.empathy import plot_empathy_match
 from app.emotions.empathy import empathy_match
 from app.agents.ego_data import ego
-from app.emotions.mbti import detect_mbti_for_user
+from app.emotions.mbti import detect_mbti_for_user, detect_mbti_for_user_async, queue_mbti_update
 from app.emotions.emotionplotter import log_pain_status
-from app.emotions.emotionplotter import plot_pain_history_fixed
+from app.emotions.charts import chart_service
 
 # -----------------------------
 # 1️⃣ Redis Setup
 # -----------------------------
-# Connect to local Redis for short-term memory
+# Short-term memory lives in Redis (shared pools from app.memory.redis_pool)
 from app.config import config
 from app.utils.logger import logger
-from app.utils.error_handler import RedisConnectionError, handle_error
-
-try:
-    r = redis.Redis(
-        host=config.REDIS_HOST, 
-        port=config.REDIS_PORT, 
-        db=config.REDIS_DB, 
-        decode_responses=True
-    )
-    # Test connection
-    r.ping()
-    logger.info(f"Connected to Redis at {config.REDIS_HOST}:{config.REDIS_PORT}")
-except Exception as e:
-    logger.error(f"Failed to connect to Redis: {e}")
-    raise RedisConnectionError(f"Cannot connect to Redis: {e}")
+from app.utils.error_handler import EmotionAnalysisError, handle_error
+from app.memory.redis_pool import get_redis, get_async_redis
+from app.utils.lexicon import lexicon_engine
+from app.emotions.batcher import InferenceBatcher
+from app.emotions.analysis_context import AnalysisContext
+from app.emotions.emotion_cache import EmotionCache
+from app.emotions.emotion_backends import create_backend, backend_name, EmotionBackend
+from app.utils.perf_metrics import CLASSIFIER_DURATION
+
+# Sync client for scripts and worker threads; request handlers use get_async_redis()
+r = get_redis()
 
 # -----------------------------
-# 2️⃣ Load GoEmotions Pipeline
+# 2️⃣ Load GoEmotions model (backend from config.EMOTION_BACKEND)
 # -----------------------------
-try:
-    logger.info("Loading GoEmotions model...")
-    classifier = pipeline(
-        "text-classification",
-        model=config.EMOTION_MODEL,
-        top_k=None
-    )
-    logger.info("Emotion model loaded successfully")
-except Exception as e:
-    logger.error(f"Failed to load emotion model: {e}")
-    raise EmotionAnalysisError(f"Cannot load emotion model: {e}")
+# Loaded on first use (or by warmup_emotion_model at startup), not at import time
+_emotion_backend: Optional[EmotionBackend] = None
+_emotion_backend_lock = threading.Lock()
+
+
+def get_emotion_backend() -> EmotionBackend:
+    """Return the emotion backend, loading the model on first call."""
+    global _emotion_backend
+    if _emotion_backend is None:
+        with _emotion_backend_lock:
+            if _emotion_backend is None:
+                try:
+                    logger.info(f"Loading GoEmotions model ({config.EMOTION_BACKEND} backend)...")
+                    _emotion_backend = create_backend()
+                    logger.info("Emotion model loaded successfully")
+                except Exception as e:
+                    logger.error(f"Failed to load emotion model: {e}")
+                    raise EmotionAnalysisError(f"Cannot load emotion model: {e}")
+    return _emotion_backend
+
+
+def warmup_emotion_model() -> bool:
+    """Load the emotion model and run one inference so the first request is not cold."""
+    classify_batch(["warmup"])
+    return True
+
+
+def classify_batch(texts: List[str]) -> List[Dict[str, float]]:
+    """
+    Run the classifier on a batch of texts in a single padded forward pass.
+    
+    Returns:
+        One label -> score map per input text, in input order
+    """
+    backend = get_emotion_backend()
+    with CLASSIFIER_DURATION.time(backend=backend.name):
+        return backend.predict(texts)
+
+
+# Concurrent analyze_emotion_text_async calls are batched across requests
+emotion_batcher = InferenceBatcher(
+    classify_batch,
+    max_batch_size=config.EMOTION_BATCH_MAX_SIZE,
+    max_wait_ms=config.EMOTION_BATCH_MAX_WAIT_MS,
+    name="emotion_classifier"
+)
+
+# Repeated messages ("thanks", "ok", retries) are served from cache
+emotion_cache = EmotionCache(
+    lambda: f"{config.EMOTION_MODEL}@{backend_name()}",
+    max_entries=config.EMOTION_CACHE_SIZE,
+    ttl_seconds=config.EMOTION_CACHE_TTL_SECONDS,
+    redis_client=r if config.EMOTION_CACHE_REDIS else None,
+    async_redis_client=get_async_redis() if config.EMOTION_CACHE_REDIS else None
+)
 
 # -----------------------------
 # 3️⃣ VAD Map for emotions
@@ -81,33 +118,69 @@ DEFAULT_VAD = (0.0, 0.0, 0.0)
 # -----------------------------
 # 4️⃣ Analyze user text emotions
 # -----------------------------
+EMPTY_ANALYSIS = {
+    "emotions": {},
+    "vad": {"valence": 0.0, "arousal": 0.0, "dominance": 0.0},
+    "intensity": 0.0,
+    "confidence": 0.0
+}
+
+
 def analyze_emotion_text(text: str) -> Dict[str, Any]:
     """
     Detect emotions from user text, calculate VAD and intensity.
-    Handles outputs from HF pipeline safely.
+    Handles outputs from the emotion backend safely.
     """
     if not text or not isinstance(text, str):
         logger.warning("Empty or invalid text provided to analyze_emotion_text")
-        return {
-            "emotions": {},
-            "vad": {"valence": 0.0, "arousal": 0.0, "dominance": 0.0},
-            "intensity": 0.0,
-            "confidence": 0.0
-        }
+        return {**EMPTY_ANALYSIS, "vad": dict(EMPTY_ANALYSIS["vad"])}
     
+    cached = emotion_cache.get(text)
+    if cached is not None:
+        return cached
+
     try:
-        out = classifier(text, top_k=None)
+        scores = classify_batch([text])[0]
     except Exception as e:
         logger.error(f"Emotion analysis failed: {e}")
         handle_error(e, {"function": "analyze_emotion_text", "text": text[:50]})
         raise EmotionAnalysisError(f"Failed to analyze emotions: {e}")
 
-    # Handle flat list of dicts
-    if isinstance(out, list) and all(isinstance(item, dict) for item in out):
-        scores = {item["label"]: float(item["score"]) for item in out if "label" in item and "score" in item}
-    else:
-        raise ValueError(f"Unexpected classifier output: {out}")
+    analysis = emotion_analysis_from_scores(scores)
+    emotion_cache.put(text, analysis)
+    return analysis
 
+
+async def analyze_emotion_text_async(text: str) -> Dict[str, Any]:
+    """
+    Async variant of analyze_emotion_text.
+    Requests from concurrent callers are micro-batched into one forward pass
+    (see emotion_batcher) and inference runs off the event loop.
+    """
+    if not text or not isinstance(text, str):
+        logger.warning("Empty or invalid text provided to analyze_emotion_text_async")
+        return {**EMPTY_ANALYSIS, "vad": dict(EMPTY_ANALYSIS["vad"])}
+    
+    cached = await emotion_cache.aget(text)
+    if cached is not None:
+        return cached
+
+    try:
+        scores = await emotion_batcher.submit(text)
+    except Exception as e:
+        logger.error(f"Emotion analysis failed: {e}")
+        handle_error(e, {"function": "analyze_emotion_text_async", "text": text[:50]})
+        raise EmotionAnalysisError(f"Failed to analyze emotions: {e}")
+
+    analysis = emotion_analysis_from_scores(scores)
+    await emotion_cache.aput(text, analysis)
+    return analysis
+
+
+def emotion_analysis_from_scores(scores: Dict[str, float]) -> Dict[str, Any]:
+    """
+    Derive VAD, intensity and confidence from classifier label scores.
+    """
     # Aggregate VAD
     valence = arousal = dominance = total_weight = 0.0
     for label, score in scores.items():
@@ -135,7 +208,47 @@ def analyze_emotion_text(text: str) -> Dict[str, Any]:
 # -----------------------------
 # 5️⃣ Redis short-term memory
 # -----------------------------
-def store_user_emotion(user_id: str, session_id: str, text: str, emotion_data: dict, pain: float, max_len: int = 200):
+def _emotion_entry(session_id: str, text: str, emotion_data: dict, pain: float, when: datetime) -> str:
+    """Serialize one short-term memory entry."""
+    return json.dumps({
+        "ts": when.isoformat(),
+        "session_id": session_id,
+        "text": text,
+        "emotion": emotion_data,
+        "pain": float(pain)
+    })
+
+
+def _queue_store(pipe, user_id: str, session_id: str, text: str, emotion_data: dict, pain: float,
+                 max_len: int, depth: int):
+    """Queue the store commands on a sync or async pipeline."""
+    key = f"user:{user_id}:emotions"
+    when = datetime.utcnow()
+    entry = _emotion_entry(session_id, text, emotion_data, pain, when)
+    # push to right so chronological order is preserved (oldest on left)
+    pipe.rpush(key, entry)
+    # keep list bounded
+    pipe.ltrim(key, -max_len, -1)
+    pipe.expire(key, config.REDIS_EXPIRATION_DAYS * 24 * 3600)
+    if depth:
+        pipe.lrange(key, -depth, -1)
+    # per-day MBTI counters, so detect_mbti_for_user never rescans the history
+    queue_mbti_update(pipe, user_id, text, when)
+
+
+def _finish_store(user_id: str, results: list, depth: int, recent_n: int,
+                  ctx: Optional[AnalysisContext]) -> List[Dict[str, Any]]:
+    """Parse the read-back entries (most recent first) and seed ctx with them."""
+    recent = [json.loads(x) for x in results[3]] if depth else []
+    recent.reverse()
+    if ctx is not None and ctx.user_id == user_id:
+        ctx.set_recent_emotions(recent, depth)
+    return recent[:recent_n] if recent_n else recent
+
+
+def store_user_emotion(user_id: str, session_id: str, text: str, emotion_data: dict, pain: float,
+                       max_len: Optional[int] = None, recent_n: int = 0,
+                       ctx: Optional[AnalysisContext] = None) -> List[Dict[str, Any]]:
     """
     Store the user message and its emotion analysis in Redis.
     - user_id: user identifier
@@ -143,30 +256,48 @@ def store_user_emotion(user_id: str, session_id: str, text: str, emotion_data: d
     - text: raw user message (string)
     - emotion_data: dict returned from analyze_emotion_text
     - pain: numeric pain level
-    - max_len: max number of entries to keep in list
+    - max_len: max number of entries to keep in list (default config.REDIS_MAX_ENTRIES)
+    - recent_n: number of most recent entries to read back in the same round trip
+    - ctx: request context; seeded with the entries read back (at least ctx.history_depth)
+    Returns the entries read back, most recent first (including this one).
     """
-    key = f"user:{user_id}:emotions"
-    timestamp = datetime.utcnow().isoformat()
-    entry = {
-        "ts": timestamp,
-        "session_id": session_id,
-        "text": text,
-        "emotion": emotion_data,
-        "pain": float(pain)
-    }
-    # push to right so chronological order is preserved (oldest on left)
-    r.rpush(key, json.dumps(entry))
-    # keep list bounded
-    r.ltrim(key, -max_len, -1)
-    # set expiration (e.g., 30 days) — tune as needed
-    r.expire(key, 30 * 24 * 3600)
+    depth = max(recent_n, ctx.history_depth if ctx is not None else 0)
+    
+    # MULTI/EXEC pipeline: push, trim, TTL refresh and read-back are applied
+    # atomically in a single round trip
+    pipe = r.pipeline()
+    _queue_store(pipe, user_id, session_id, text, emotion_data, pain,
+                 max_len or config.REDIS_MAX_ENTRIES, depth)
+    return _finish_store(user_id, pipe.execute(), depth, recent_n, ctx)
+
 
+async def store_user_emotion_async(user_id: str, session_id: str, text: str, emotion_data: dict, pain: float,
+                                   max_len: Optional[int] = None, recent_n: int = 0,
+                                   ctx: Optional[AnalysisContext] = None) -> List[Dict[str, Any]]:
+    """
+    Async variant of store_user_emotion on the shared redis.asyncio pool.
+    """
+    depth = max(recent_n, ctx.history_depth if ctx is not None else 0)
+    
+    pipe = get_async_redis().pipeline()
+    _queue_store(pipe, user_id, session_id, text, emotion_data, pain,
+                 max_len or config.REDIS_MAX_ENTRIES, depth)
+    return _finish_store(user_id, await pipe.execute(), depth, recent_n, ctx)
 
 
-def get_recent_emotions(user_id: str, n: int = 5):
+
+def get_recent_emotions(user_id: str, n: int = 5, ctx: Optional[AnalysisContext] = None):
     """
     Return last n entries (most recent first) as parsed objects.
+    If a request context is given, the history is read once per request.
     """
+    if ctx is not None and ctx.user_id == user_id:
+        return ctx.recent_emotions(n, lambda depth: _read_recent_emotions(user_id, depth))
+    return _read_recent_emotions(user_id, n)
+
+
+def _read_recent_emotions(user_id: str, n: int):
+    """Read the last n entries from Redis (most recent first)."""
     key = f"user:{user_id}:emotions"
     # LRANGE with negative indices: -n to -1 returns last n in chronological order,
     # but we want most-recent-first, so get -n..-1 then reverse
@@ -223,10 +354,14 @@ def detect_user_pain(emotions: dict) -> float:
 # 9️⃣ crisi mode detection
 # -----------------------------
 NEGATIVE_WORDS = ["die", "suicide", "hate", "sad", "depressed", "alone", "worthless", "unhappy", "kill myself", "end it all", "no reason to live", "give up on my life", "life is a pain", "suffering", "miserable", "despair", "hopeless", "lonely", "cry", "crying", "burden", "sick of it all"]
+CRISIS_LEXICON = "crisis_negative"
+lexicon_engine.register(CRISIS_LEXICON, NEGATIVE_WORDS)
 
-def check_crisis_mode_trigger(user_id: str, current_text: str, consecutive_count: int = 3) -> dict:
+def check_crisis_mode_trigger(user_id: str, current_text: str, consecutive_count: int = 3,
+                              ctx: Optional[AnalysisContext] = None) -> dict:
     """
     Check if crisis mode should be activated.
+    With a request context, history, classification and MBTI are reused.
     Returns:
         {
             "crisis_mode": bool,
@@ -236,18 +371,20 @@ def check_crisis_mode_trigger(user_id: str, current_text: str, consecutive_count
             "personality": {...}
         }
     """
-    current_text_lower = current_text.lower()
-    if not any(word in current_text_lower for word in NEGATIVE_WORDS):
+    if not lexicon_engine.scan(current_text).any(CRISIS_LEXICON):
         # If current message not negative, don't check further
         return {"crisis_mode": False}
 
     # Get the last N messages (most recent first)
-    recent_msgs = get_recent_emotions(user_id, n=consecutive_count)
+    recent_msgs = get_recent_emotions(user_id, n=consecutive_count, ctx=ctx)
     if not recent_msgs:
         return {"crisis_mode": False}
 
     # Include current message as last item
-    current_emotion_data = analyze_emotion_text(current_text)
+    if ctx is not None:
+        current_emotion_data = ctx.memoize(("emotion", current_text), lambda: analyze_emotion_text(current_text))
+    else:
+        current_emotion_data = analyze_emotion_text(current_text)
     current_pain = detect_user_pain(current_emotion_data)
     current_entry = {
         "text": current_text,
@@ -263,9 +400,9 @@ def check_crisis_mode_trigger(user_id: str, current_text: str, consecutive_count
     negative_messages = []
 
     for msg in recent_msgs:
-        text = msg.get("text", "").lower()
+        text = msg.get("text", "")
         valence = msg.get("emotion", {}).get("vad", {}).get("valence", 0.0)
-        is_negative = valence < 0 or any(word in text for word in NEGATIVE_WORDS)
+        is_negative = valence < 0 or lexicon_engine.scan(text).any(CRISIS_LEXICON)
 
         if is_negative:
             consecutive_negative += 1
@@ -277,7 +414,7 @@ def check_crisis_mode_trigger(user_id: str, current_text: str, consecutive_count
 
     if consecutive_negative >= consecutive_count:
         # Crisis mode triggered
-        personality=detect_mbti_for_user(user_id, days=10)# Or aggregate from recent msgs
+        personality=detect_mbti_for_user(user_id, days=10, ctx=ctx)# Or aggregate from recent msgs
         return {
             "crisis_mode": True,
             "recent_messages": negative_messages,
@@ -291,35 +428,41 @@ def check_crisis_mode_trigger(user_id: str, current_text: str, consecutive_count
 # -----------------------------
 # 8️⃣ High-level analyzer
 # -----------------------------
-def analyze_user(user_id: str, session_id: str, text: str ):
+async def analyze_user(user_id: str, session_id: str, text: str ):
     """
     Analyze user: emotions, personality, pain, and store in Redis (with text).
     """
+    # Request-scoped memo: each artifact below is computed once per call
+    ctx = AnalysisContext(user_id, text)
+
     # Run emotion analysis
-    emotion_data = analyze_emotion_text(text)
+    emotion_data = await analyze_emotion_text_async(text)
+    ctx.set(("emotion", text), emotion_data)
 
     # compute pain (you have detect_user_pain earlier; adapt if needed)
     pain = detect_user_pain(emotion_data)
 
-    # store the text + analysis + pain + session info
-    store_user_emotion(user_id=user_id, session_id=session_id, text=text, emotion_data=emotion_data, pain=pain)
+    # store the text + analysis + pain + session info; the recent history is
+    # read back in the same round trip and seeds ctx for the steps below
+    await store_user_emotion_async(user_id=user_id, session_id=session_id, text=text, emotion_data=emotion_data, pain=pain, ctx=ctx)
 
     # personality detection (you can base on text or recent messages)
     # personality = detect_personality(text)
-    mbti=detect_mbti_for_user(user_id, days=10) 
+    # read from the per-day counters on the async pool; the crisis check reuses the result via ctx
+    mbti = await detect_mbti_for_user_async(user_id, days=10, ctx=ctx)
 
 # --------------------------------------------------------------------
 #-------------check crisis mode handling - START----------------------
 # -------------------------------------------------------------------- 
 
     # check crisis mode
-    crisis = check_crisis_mode_trigger(user_id, text, consecutive_count=3)
+    crisis = check_crisis_mode_trigger(user_id, text, consecutive_count=3, ctx=ctx)
     crisis_response = None
     
     # Handle crisis mode if activated
     if crisis.get("crisis_mode") == True:
        from app.emotions.llmfriendly import build_crisis_prompt
-       from app.llmconnector import connector
+       from app.llmconnector import async_connector
        from app.emotions.llmfriendly import extract_final_answer_v2, extract_final_answer_v1
        from app.utils.logger import logger
        
@@ -327,7 +470,7 @@ def analyze_user(user_id: str, session_id: str, text: str ):
        
        try:
            prompt = build_crisis_prompt(crisis)
-           response = connector(prompt)
+           response = await async_connector(prompt, caller="crisis")
            
            # Parse and extract classification
            result = response.json()
@@ -347,19 +490,17 @@ def analyze_user(user_id: str, session_id: str, text: str ):
 #----------------crisis mode handling - END-------------------------
 #-------------------------------------------------------------------      
 
-    # Optional: logging / plotting
+    # Optional: logging (charts are rendered on demand via /api/v1/charts)
     try:
         log_pain_status(text, pain)
-        plot_pain_history_fixed()
     except Exception:
-        # plotting failures should not break analysis
+        # logging failures should not break analysis
         pass
 
-    recent = get_recent_emotions(user_id, n=5)
-
-    # get recent_texts from Redis:
-    recent = [m.get("text","") for m in get_recent_emotions(user_id, n=6)]
-    empathy_match_result = empathy_match(user_id=user_id, ego=ego, emotion_analysis=emotion_data, recent_texts=recent, strategy="mirror")
+    # get recent_texts from Redis (served from the request context):
+    recent = [m.get("text","") for m in get_recent_emotions(user_id, n=6, ctx=ctx)]
+    empathy_match_result = empathy_match(user_id=user_id, ego=ego, emotion_analysis=emotion_data, recent_texts=recent, strategy="mirror", ctx=ctx)
+    chart_service.publish(user_id, empathy_match=empathy_match_result, mbti=mbti)
 
     result = {
         "user_id": user_id,
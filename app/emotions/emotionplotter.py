@@ -1,20 +1,21 @@
 import json
 import matplotlib.pyplot as plt
 import numpy as np
+from app.config import config
+from app.utils.jsonl_log import get_log_writer, read_log
 
 def plot_pain_history_fixed(log_file="user_pain_log.json", save_png=False, png_path="pain_plot.png"):
     """
-    Plot the pain level evolution from a JSON file.
+    Plot the pain level evolution from a pain log.
     
     Parameters:
-        log_file (str): Path to the JSON pain log file.
+        log_file (str): Path to the pain log (JSON Lines or legacy JSON array).
         save_png (bool): Whether to save the plot as PNG.
         png_path (str): File path to save PNG if save_png=True.
     """
     # --- Load file safely ---
     try:
-        with open(log_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = read_log(log_file)
     except FileNotFoundError:
         print("No pain log file found:", log_file)
         return
@@ -99,34 +100,14 @@ if __name__ == "__main__":
 
 
 
-import json
-import os
-
-def log_pain_status(user_query: str, pain_status: float, file_path="user_pain_log.json"):
+def log_pain_status(user_query: str, pain_status: float, file_path=None):
     """
-    Log the user query and calculated pain status into a JSON file.
+    Append the user query and calculated pain status to the user pain log
+    (JSON Lines, written by a background writer).
     Each entry will look like:
-    {
-        "user_query": "...",
-        "pain_status": ...
-    }
+    {"user_query": "...", "pain_status": ...}
     """
-    # Step 1: Load existing log if file exists
-    if os.path.exists(file_path):
-        with open(file_path, "r") as f:
-            try:
-                data = json.load(f)
-            except json.JSONDecodeError:
-                data = []
-    else:
-        data = []
-
-    # Step 2: Append new record
-    data.append({
+    get_log_writer(file_path or config.USER_PAIN_LOG_FILE).write({
         "user_query": user_query,
         "pain_status": round(pain_status, 3)
     })
-
-    # Step 3: Save updated log back to file
-    with open(file_path, "w") as f:
-        json.dump(data, f, indent=4)
@@ -1,6 +1,8 @@
 # app/personality/empathy_match.py
 import math
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from app.emotions.analysis_context import AnalysisContext
+from app.utils.lexicon import lexicon_engine
   # existing helper
 
 # default weights (tunable)
@@ -8,6 +10,10 @@ DEFAULT_WEIGHTS = {"cognitive": 0.30, "emotional": 0.45, "motivational": 0.25}
 
 NEGATIVE_HELP_KEYWORDS = {"help", "support", "listen", "advice", "resource"}
 
+# recent messages containing these are passed to the LLM as negative snippets
+EMPATHY_NEGATIVE_LEXICON = "empathy_negative"
+lexicon_engine.register(EMPATHY_NEGATIVE_LEXICON, ["die", "suicide", "kill myself", "i want to die", "hate you", "hate myself", "worthless"])
+
 def clamp01(x: float) -> float:
     return max(0.0, min(1.0, float(x)))
 
@@ -65,9 +71,12 @@ def empathy_match(
     emotion_analysis: Dict[str, Any],
     recent_texts: List[str] = None,
     strategy: str = "mirror",
-    weights: Dict[str, float] = None
+    weights: Dict[str, float] = None,
+    ctx: Optional[AnalysisContext] = None
 ) -> Dict[str, Any]:
     """
+    If recent_texts is not given, they are read from Redis (once per request
+    when a request context `ctx` is passed).
     Returns:
       {
         "empathy_match": 0..1,
@@ -80,6 +89,9 @@ def empathy_match(
     if weights is None:
         weights = DEFAULT_WEIGHTS
 
+    if recent_texts is None and ctx is not None:
+        recent_texts = [m.get("text", "") for m in get_recent_emotions(user_id, n=6, ctx=ctx)]
+
     # cognitive
     cog = cognitive_score_from_analysis(emotion_analysis)
 
@@ -117,8 +129,7 @@ def empathy_match(
     negative_snippets = []
     if recent_texts:
         for t in recent_texts:
-            tl = t.lower()
-            if any(k in tl for k in ["die", "suicide", "kill myself", "i want to die", "hate you", "hate myself", "worthless"]):
+            if lexicon_engine.scan(t).any(EMPATHY_NEGATIVE_LEXICON):
                 negative_snippets.append(t)
     # also include top emotion label if available
     top_label = None
@@ -2,18 +2,20 @@
 
 import json
 import time
-import redis
 import re
-from typing import List, Dict, Any
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional
 import matplotlib.pyplot as plt
+from app.emotions.analysis_context import AnalysisContext
+from app.memory.redis_pool import get_redis, get_async_redis
+from app.config import config
+from app.utils.lexicon import lexicon_engine
 
 # -----------------------------
 # Redis config
 # -----------------------------
-REDIS_HOST = "localhost"
-REDIS_PORT = 6379
-REDIS_DB = 0
-r = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB, decode_responses=True)
+# Shared pool, addressed from config.REDIS_HOST / REDIS_PORT / REDIS_DB
+r = get_redis()
 
 # -----------------------------
 # Fetch recent messages from your Redis structure
@@ -25,6 +27,11 @@ def get_recent_messages(user_id: str, days: int = 5, max_messages: int = 500) ->
     """
     key = f"user:{user_id}:emotions"
     rows = r.lrange(key, 0, max_messages - 1)
+    return _messages_within(rows, days)
+
+
+def _messages_within(rows: List[str], days: int) -> List[Dict[str, Any]]:
+    """Parse raw list entries and keep texts whose timestamp is within last `days`."""
     cutoff = time.time() - days * 24 * 3600
     messages = []
     for row in rows:
@@ -70,6 +77,16 @@ RX_F = compile_list(_FEELING_WORDS)
 RX_J = compile_list(_JUDGING_WORDS)
 RX_P = compile_list(_PERCEIVING_WORDS)
 
+AXIS_REGEXES = {"E": RX_E, "I": RX_I, "S": RX_S, "N": RX_N, "T": RX_T, "F": RX_F, "J": RX_J, "P": RX_P}
+
+# Axis patterns on the shared lexicon engine, tagged by axis letter
+MBTI_LEXICON = "mbti"
+lexicon_engine.register(
+    MBTI_LEXICON,
+    {axis: [rx.pattern for rx in rx_list] for axis, rx_list in AXIS_REGEXES.items()},
+    regex=True
+)
+
 # -----------------------------
 # Scoring helpers
 # -----------------------------
@@ -85,20 +102,33 @@ def aggregate_texts(messages: List[Dict[str, Any]]) -> str:
 def infer_mbti(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
     text = aggregate_texts(messages)
     if not text.strip():
-        return {
-            "mbti": "UNKNOWN",
-            "axis_scores": {},
-            "confidence": 0.0,
-            "explanation": {"reason": "no recent messages"},
-            "sample_texts": [],
-            "n_messages_used": 0
-        }
-
-    # Count matches per axis
-    e_score, i_score = score_matches(text, RX_E), score_matches(text, RX_I)
-    s_score, n_score = score_matches(text, RX_S), score_matches(text, RX_N)
-    t_score, f_score = score_matches(text, RX_T), score_matches(text, RX_F)
-    j_score, p_score = score_matches(text, RX_J), score_matches(text, RX_P)
+        return _unknown_mbti()
+
+    # Count matches per axis (one scan of the joined texts)
+    hits = lexicon_engine.scan(text)
+    counts = {axis: hits.count(MBTI_LEXICON, axis) for axis in AXIS_REGEXES}
+    avg_words = sum(len(m["text"].split()) for m in messages)/max(1,len(messages))
+    return _mbti_from_counts(counts, len(messages), avg_words, [m["text"] for m in messages[-10:]])
+
+
+def _unknown_mbti() -> Dict[str, Any]:
+    return {
+        "mbti": "UNKNOWN",
+        "axis_scores": {},
+        "confidence": 0.0,
+        "explanation": {"reason": "no recent messages"},
+        "sample_texts": [],
+        "n_messages_used": 0
+    }
+
+
+def _mbti_from_counts(counts: Dict[str, int], n_messages: int, avg_words: float,
+                      sample_texts: List[str]) -> Dict[str, Any]:
+    """Score MBTI from per-axis match counts (number of patterns matched per axis)."""
+    e_score, i_score = counts["E"], counts["I"]
+    s_score, n_score = counts["S"], counts["N"]
+    t_score, f_score = counts["T"], counts["F"]
+    j_score, p_score = counts["J"], counts["P"]
 
     # normalize 0..1 per axis
     def normalize(a, b):
@@ -120,7 +150,7 @@ def infer_mbti(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
 
     conf_axis = (abs(E_frac-0.5)+abs(S_frac-0.5)+abs(T_frac-0.5)+abs(J_frac-0.5))/4
     total_matches = sum([e_score,i_score,s_score,n_score,t_score,f_score,j_score,p_score])
-    data_strength = min(1.0, total_matches / max(1.0, len(messages)*4))
+    data_strength = min(1.0, total_matches / max(1.0, n_messages*4))
     confidence = conf_axis*0.8 + data_strength*0.2
     confidence = float(max(0.0, min(1.0, confidence)))
 
@@ -128,7 +158,7 @@ def infer_mbti(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
         "counts": {"E": e_score,"I":i_score,"S":s_score,"N":n_score,"T":t_score,"F":f_score,"J":j_score,"P":p_score},
         "derived_fracs":{"E":round(E_frac,3),"I":round(I_frac,3),"S":round(S_frac,3),"N":round(N_frac,3),
                          "T":round(T_frac,3),"F":round(F_frac,3),"J":round(J_frac,3),"P":round(P_frac,3)},
-        "avg_message_length_words": sum(len(m["text"].split()) for m in messages)/max(1,len(messages)),
+        "avg_message_length_words": avg_words,
         "total_matches": total_matches,
         "data_strength": round(data_strength,3)
     }
@@ -143,10 +173,150 @@ def infer_mbti(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
         },
         "confidence": confidence,
         "explanation": explanation,
-        "sample_texts": [m["text"] for m in messages[-10:]],
-        "n_messages_used": len(messages)
+        "sample_texts": sample_texts,
+        "n_messages_used": n_messages
     }
 
+# -----------------------------
+# Incremental per-day counters
+# -----------------------------
+# Each stored message increments, in the hash user:{id}:mbti:{YYYYMMDD}
+# (UTC day of the message):
+#   "<axis>:<pattern>" by 1 if the pattern matches the message
+#   "n" by 1 and "words" by the message word count
+# A pattern counts towards its axis once it matched any message in the
+# window, which is what scoring the joined texts with score_matches gives.
+# The marker user:{id}:mbti:backfilled says the counters cover the user's
+# history; every update refreshes its TTL, so it only expires together with
+# the buckets, after REDIS_EXPIRATION_DAYS without messages.
+
+def mbti_bucket_key(user_id: str, day: datetime) -> str:
+    return f"user:{user_id}:mbti:{day.strftime('%Y%m%d')}"
+
+
+def _backfill_marker_key(user_id: str) -> str:
+    return f"user:{user_id}:mbti:backfilled"
+
+
+def mbti_message_counts(text: str) -> Dict[str, int]:
+    """Counter increments contributed by one message."""
+    counts = {"n": 1, "words": len(text.split())}
+    for axis, patterns in lexicon_engine.scan(text).tags(MBTI_LEXICON).items():
+        for pattern in patterns:
+            counts[f"{axis}:{pattern}"] = 1
+    return counts
+
+
+def queue_mbti_update(pipe, user_id: str, text: str, when: Optional[datetime] = None):
+    """
+    Queue the counter increments for one stored message on a sync or async pipeline.
+    
+    Args:
+        pipe: Redis pipeline the message store is queued on
+        user_id: User identifier
+        text: Message text
+        when: UTC time of the message (defaults to now)
+    """
+    if not text:
+        return
+    ttl = config.REDIS_EXPIRATION_DAYS * 24 * 3600
+    key = mbti_bucket_key(user_id, when or datetime.utcnow())
+    for field, amount in mbti_message_counts(text).items():
+        pipe.hincrby(key, field, amount)
+    pipe.expire(key, ttl)
+    # No-op until the user was backfilled (EXPIRE leaves missing keys alone)
+    pipe.expire(_backfill_marker_key(user_id), ttl)
+
+
+def _window_keys(user_id: str, days: int) -> List[str]:
+    # Buckets are whole UTC days: today plus `days` previous days covers the
+    # rolling window (the oldest bucket may hold up to a day of older messages)
+    today = datetime.utcnow()
+    return [mbti_bucket_key(user_id, today - timedelta(days=d)) for d in range(days + 1)]
+
+
+def _merge_buckets(buckets: List[Dict[str, str]]) -> Dict[str, int]:
+    totals: Dict[str, int] = {}
+    for bucket in buckets:
+        for field, value in (bucket or {}).items():
+            totals[field] = totals.get(field, 0) + int(value)
+    return totals
+
+
+def _mbti_from_totals(totals: Dict[str, int], sample_texts: List[str]) -> Dict[str, Any]:
+    """O(1) MBTI scoring from merged per-day counters."""
+    n_messages = totals.get("n", 0)
+    if n_messages == 0:
+        return _unknown_mbti()
+    counts = {axis: 0 for axis in AXIS_REGEXES}
+    for field, value in totals.items():
+        axis, sep, _ = field.partition(":")
+        if sep and axis in counts and value > 0:
+            counts[axis] += 1
+    return _mbti_from_counts(counts, n_messages, totals.get("words", 0) / n_messages, sample_texts)
+
+
+def _backfill_buckets(rows: List[str]) -> Dict[str, Dict[str, int]]:
+    """Per-day counters rebuilt from raw history entries, keyed by bucket date."""
+    days: Dict[str, Dict[str, int]] = {}
+    for row in rows:
+        try:
+            obj = json.loads(row)
+            txt = obj.get("text", "")
+            ts = obj.get("ts")
+            day = datetime.fromisoformat(ts) if isinstance(ts, str) else datetime.utcfromtimestamp(float(ts))
+        except Exception:
+            continue
+        if not txt:
+            continue
+        bucket = days.setdefault(day.strftime("%Y%m%d"), {})
+        for field, amount in mbti_message_counts(txt).items():
+            bucket[field] = bucket.get(field, 0) + amount
+    return days
+
+
+def _backfill_day_keys(user_id: str, days: Dict[str, Dict[str, int]]) -> List[str]:
+    return [f"user:{user_id}:mbti:{day}" for day in days]
+
+
+def _queue_backfill(pipe, user_id: str, days: Dict[str, Dict[str, int]], existing: List[Dict[str, str]]):
+    """
+    Queue the rebuilt counters, never lowering an existing one.
+    
+    The capped history list may have lost part of a day that a bucket still
+    counts, so each field gets the larger of the rebuilt and stored values.
+    
+    Args:
+        pipe: Redis pipeline
+        user_id: User identifier
+        days: Rebuilt counters by bucket date (from _backfill_buckets)
+        existing: Stored buckets of the same days, in the same order (HGETALL results)
+    """
+    ttl = config.REDIS_EXPIRATION_DAYS * 24 * 3600
+    for key, counts, stored in zip(_backfill_day_keys(user_id, days), days.values(), existing):
+        stored = stored or {}
+        higher = {field: value for field, value in counts.items() if value > int(stored.get(field, 0))}
+        if higher:
+            pipe.hset(key, mapping=higher)
+            pipe.expire(key, ttl)
+    pipe.set(_backfill_marker_key(user_id), 1, ex=ttl)
+
+
+def _sample_texts(entries: List[Dict[str, Any]], days: int) -> List[str]:
+    """Up to 10 texts within the window, chronological, from recent entries (most recent first)."""
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    texts = []
+    for entry in entries[:10]:
+        try:
+            ts = entry.get("ts")
+            when = datetime.fromisoformat(ts) if isinstance(ts, str) else datetime.utcfromtimestamp(float(ts))
+        except Exception:
+            continue
+        if when >= cutoff and entry.get("text"):
+            texts.append(entry["text"])
+    texts.reverse()
+    return texts
+
 # -----------------------------
 # Radar chart plot
 # -----------------------------
@@ -166,13 +336,103 @@ def plot_mbti_radar(axis_scores: dict, mbti_label: str):
     plt.show()
 
 # -----------------------------
-# Top-level: fetch Redis and infer MBTI
+# Top-level: read counters from Redis and infer MBTI
 # -----------------------------
-def detect_mbti_for_user(user_id: str, days: int):
-    messages = get_recent_messages(user_id, days=days)
-    result = infer_mbti(messages)
+def detect_mbti_for_user(user_id: str, days: int, ctx: Optional[AnalysisContext] = None):
+    """
+    Infer MBTI from the user's per-day counters for the last `days` days.
+    With a request context (AnalysisContext), the result is computed once per request
+    and sample texts come from the context's history.
+    """
+    if ctx is not None and ctx.user_id == user_id:
+        return ctx.memoize(("mbti", days), lambda: _detect_mbti(user_id, days, ctx))
+    return _detect_mbti(user_id, days)
+
+
+def _detect_mbti(user_id: str, days: int, ctx: Optional[AnalysisContext] = None) -> Dict[str, Any]:
+    pipe = r.pipeline(transaction=False)
+    for key in _window_keys(user_id, days):
+        pipe.hgetall(key)
+    pipe.exists(_backfill_marker_key(user_id))
+    if ctx is None:
+        pipe.lrange(f"user:{user_id}:emotions", -10, -1)
+    results = pipe.execute()
+    buckets = results[:days + 1]
+    
+    if not results[days + 1]:
+        # First read for a user stored before counters existed: rebuild once from the list
+        days_counts = _backfill_buckets(r.lrange(f"user:{user_id}:emotions", 0, -1))
+        read = r.pipeline(transaction=False)
+        for key in _backfill_day_keys(user_id, days_counts):
+            read.hgetall(key)
+        existing = read.execute()
+        # Write and re-read the window in one transaction
+        backfill = r.pipeline()
+        _queue_backfill(backfill, user_id, days_counts, existing)
+        for key in _window_keys(user_id, days):
+            backfill.hgetall(key)
+        buckets = backfill.execute()[-(days + 1):]
+    
+    if ctx is not None:
+        entries = ctx.recent_emotions(10, lambda depth: _parse_recent(r.lrange(f"user:{user_id}:emotions", -depth, -1)))
+    else:
+        entries = _parse_recent(results[days + 2])
+    return _mbti_from_totals(_merge_buckets(buckets), _sample_texts(entries, days))
+
+
+async def detect_mbti_for_user_async(user_id: str, days: int, ctx: Optional[AnalysisContext] = None) -> Dict[str, Any]:
+    """
+    Async variant of detect_mbti_for_user on the shared redis.asyncio pool.
+    Sample texts come from the ctx history when it is already seeded
+    (store_user_emotion_async does this) and are read in the same pipeline
+    otherwise; the result is stored in ctx for later sync consumers.
+    """
+    if ctx is not None and ctx.user_id != user_id:
+        ctx = None
+    entries = ctx.cached_recent(10) if ctx is not None else None
+    
+    client = get_async_redis()
+    pipe = client.pipeline(transaction=False)
+    for key in _window_keys(user_id, days):
+        pipe.hgetall(key)
+    pipe.exists(_backfill_marker_key(user_id))
+    if entries is None:
+        pipe.lrange(f"user:{user_id}:emotions", -10, -1)
+    results = await pipe.execute()
+    buckets = results[:days + 1]
+    if entries is None:
+        entries = _parse_recent(results[days + 2])
+        if ctx is not None:
+            ctx.set_recent_emotions(entries, 10)
+    
+    if not results[days + 1]:
+        days_counts = _backfill_buckets(await client.lrange(f"user:{user_id}:emotions", 0, -1))
+        read = client.pipeline(transaction=False)
+        for key in _backfill_day_keys(user_id, days_counts):
+            read.hgetall(key)
+        existing = await read.execute()
+        backfill = client.pipeline()
+        _queue_backfill(backfill, user_id, days_counts, existing)
+        for key in _window_keys(user_id, days):
+            backfill.hgetall(key)
+        buckets = (await backfill.execute())[-(days + 1):]
+    
+    result = _mbti_from_totals(_merge_buckets(buckets), _sample_texts(entries, days))
+    if ctx is not None:
+        ctx.set(("mbti", days), result)
     return result
 
+
+def _parse_recent(rows: List[str]) -> List[Dict[str, Any]]:
+    """Parse raw list entries (chronological) into most-recent-first dicts."""
+    entries = []
+    for row in reversed(rows or []):
+        try:
+            entries.append(json.loads(row))
+        except Exception:
+            continue
+    return entries
+
 # -----------------------------
 # Test run
 # -----------------------------
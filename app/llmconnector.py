@@ -3,19 +3,27 @@ LLM connector module for communicating with Ollama.
 """
 import requests
 import json
-from typing import Optional
+import httpx
+from urllib.parse import urlsplit
+from typing import AsyncIterator, Optional
 from app.config import config
 from app.utils.logger import logger
 from app.utils.error_handler import LLMConnectionError, handle_error
+from app.utils.perf_metrics import LLM_DURATION, timed
 
 
-def connector(prompt: str, timeout: int = 30) -> requests.Response:
+# Shared async client (created lazily so it binds to the running event loop)
+_async_client: Optional[httpx.AsyncClient] = None
+
+
+def connector(prompt: str, timeout: int = 30, caller: str = "unknown") -> requests.Response:
     """
     Connect to LLM API and send prompt.
     
     Args:
         prompt: The prompt text to send
         timeout: Request timeout in seconds
+        caller: Caller tag of the latency histogram (e.g. "wedana")
         
     Returns:
         Response object from LLM API
@@ -36,12 +44,13 @@ def connector(prompt: str, timeout: int = 30) -> requests.Response:
     
     try:
         logger.debug(f"Sending prompt to LLM ({config.LLM_MODEL})")
-        response = requests.post(
-            url, 
-            headers=headers, 
-            data=json.dumps(data),
-            timeout=timeout
-        )
+        with timed(LLM_DURATION, "llm", caller=caller, mode="blocking"):
+            response = requests.post(
+                url, 
+                headers=headers, 
+                data=json.dumps(data),
+                timeout=timeout
+            )
         response.raise_for_status()
         logger.debug("LLM response received successfully")
         return response
@@ -49,3 +58,162 @@ def connector(prompt: str, timeout: int = 30) -> requests.Response:
         logger.error(f"LLM connection failed: {e}")
         handle_error(e, {"function": "connector", "url": url})
         raise LLMConnectionError(f"Failed to connect to LLM: {e}")
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Get the shared async HTTP client, creating it on first use.
+    
+    The client keeps a pool of keep-alive connections to the LLM server,
+    so concurrent requests reuse sockets instead of reconnecting.
+    
+    Returns:
+        Shared httpx.AsyncClient instance
+    """
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            headers={'Content-Type': 'application/json'},
+            timeout=httpx.Timeout(config.LLM_TIMEOUT, connect=config.LLM_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=config.LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=config.LLM_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=config.LLM_KEEPALIVE_EXPIRY
+            )
+        )
+        logger.debug(
+            f"Created async LLM client (max_connections={config.LLM_MAX_CONNECTIONS})"
+        )
+    return _async_client
+
+
+async def close_async_client():
+    """Close the shared async HTTP client and release pooled connections."""
+    global _async_client
+    if _async_client is not None and not _async_client.is_closed:
+        await _async_client.aclose()
+        logger.debug("Closed async LLM client")
+    _async_client = None
+
+
+async def async_connector(prompt: str, timeout: Optional[float] = None, caller: str = "unknown") -> httpx.Response:
+    """
+    Send prompt to LLM API without blocking the event loop.
+    
+    Args:
+        prompt: The prompt text to send
+        timeout: Optional per-call timeout in seconds (defaults to config.LLM_TIMEOUT)
+        caller: Caller tag of the latency histogram (e.g. "wedana")
+        
+    Returns:
+        Response object from LLM API
+        
+    Raises:
+        LLMConnectionError: If connection fails
+    """
+    if not prompt or not isinstance(prompt, str):
+        raise ValueError("Prompt must be a non-empty string")
+    
+    url = config.LLM_URL
+    data = {
+        'model': config.LLM_MODEL,
+        'prompt': prompt,
+        'stream': False,
+    }
+    
+    try:
+        logger.debug(f"Sending async prompt to LLM ({config.LLM_MODEL})")
+        client = get_async_client()
+        with timed(LLM_DURATION, "llm", caller=caller, mode="blocking"):
+            response = await client.post(
+                url,
+                content=json.dumps(data),
+                timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT
+            )
+        response.raise_for_status()
+        logger.debug("LLM response received successfully")
+        return response
+    except httpx.HTTPError as e:
+        logger.error(f"LLM connection failed: {e}")
+        handle_error(e, {"function": "async_connector", "url": url})
+        raise LLMConnectionError(f"Failed to connect to LLM: {e}")
+
+
+async def stream_connector(prompt: str, timeout: Optional[float] = None, caller: str = "unknown") -> AsyncIterator[str]:
+    """
+    Send prompt to LLM API in streaming mode and yield tokens as they arrive.
+    
+    Args:
+        prompt: The prompt text to send
+        timeout: Optional per-call timeout in seconds (defaults to config.LLM_TIMEOUT)
+        caller: Caller tag of the latency histogram (e.g. "final_response")
+        
+    Yields:
+        Response text fragments in generation order
+        
+    Raises:
+        LLMConnectionError: If connection fails or the stream reports an error
+    """
+    if not prompt or not isinstance(prompt, str):
+        raise ValueError("Prompt must be a non-empty string")
+    
+    url = config.LLM_URL
+    data = {
+        'model': config.LLM_MODEL,
+        'prompt': prompt,
+        'stream': True,
+    }
+    
+    try:
+        logger.debug(f"Streaming prompt to LLM ({config.LLM_MODEL})")
+        client = get_async_client()
+        # Times the whole generation, from request to the last token
+        with timed(LLM_DURATION, "llm", caller=caller, mode="stream"):
+            async with client.stream(
+                "POST",
+                url,
+                content=json.dumps(data),
+                timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT
+            ) as response:
+                response.raise_for_status()
+                # Ollama streams one JSON object per line
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("error"):
+                        raise LLMConnectionError(f"LLM stream error: {chunk['error']}")
+                    token = chunk.get("response", "")
+                    if token:
+                        yield token
+                    if chunk.get("done"):
+                        break
+        logger.debug("LLM stream finished")
+    except (httpx.HTTPError, json.JSONDecodeError) as e:
+        logger.error(f"LLM streaming failed: {e}")
+        handle_error(e, {"function": "stream_connector", "url": url})
+        raise LLMConnectionError(f"Failed to stream from LLM: {e}")
+
+
+async def check_llm(timeout: float = 5.0) -> bool:
+    """
+    Check that the LLM backend is reachable and serves the configured model.
+    
+    Uses Ollama's /api/tags listing on the same host as config.LLM_URL.
+    
+    Raises:
+        LLMConnectionError: If the backend is unreachable or the model is missing
+    """
+    parts = urlsplit(config.LLM_URL)
+    url = f"{parts.scheme}://{parts.netloc}/api/tags"
+    try:
+        response = await get_async_client().get(url, timeout=timeout)
+        response.raise_for_status()
+        models = {m.get("name") for m in response.json().get("models", [])}
+    except (httpx.HTTPError, ValueError) as e:
+        raise LLMConnectionError(f"LLM backend not reachable at {url}: {e}")
+    
+    # Ollama reports "name:latest" for untagged models
+    if config.LLM_MODEL not in models and f"{config.LLM_MODEL}:latest" not in models:
+        raise LLMConnectionError(f"LLM model {config.LLM_MODEL} not available at {url}")
+    return True
@@ -36,13 +36,13 @@ def update_agent_pain(pain_level: float):
 
 import matplotlib.pyplot as plt
 from datetime import datetime
+from app.utils.jsonl_log import get_log_writer, read_log
 
 LOG_FILE = "pain_log.json"
 
 def plot_pain_log():
-    # Load the JSON log
-    with open(LOG_FILE, "r") as f:
-        data = json.load(f)
+    # Load the log (JSON Lines or legacy JSON array)
+    data = read_log(LOG_FILE)
 
     # Extract timestamps and pain levels
     timestamps = [datetime.fromisoformat(entry["timestamp"]) for entry in data]
@@ -127,18 +127,7 @@ def update_agent_pain_log(pain_level: float):
         "pain_level": pain_level
     }
 
-    # Load existing log (if file exists), otherwise create new list
-    if os.path.exists(LOG_FILE):
-        with open(LOG_FILE, "r") as f:
-            data = json.load(f)
-    else:
-        data = []
-
-    # Append new record
-    data.append(entry)
-
-    # Write back to file
-    with open(LOG_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+    # Append to the log via the background writer
+    get_log_writer(LOG_FILE).write(entry)
 
     print(f"Logged pain level {pain_level} at {timestamp}")
@@ -0,0 +1,163 @@
+"""
+Shared Redis connection pools.
+
+Every module that talks to Redis gets its client from here, so there is one
+sync pool (scripts, worker threads) and one redis.asyncio pool (request
+handlers) per process, both sized and addressed from config. Every command
+and pipeline is timed into the Redis latency histogram (app.utils.perf_metrics).
+"""
+from typing import Any, Dict, Optional
+import redis
+import redis.asyncio as aioredis
+from app.config import config
+from app.utils.logger import logger
+from app.utils.error_handler import RedisConnectionError
+from app.utils.perf_metrics import REDIS_DURATION, timed
+
+
+_sync_pool: Optional[redis.BlockingConnectionPool] = None
+_sync_client: Optional[redis.Redis] = None
+_async_pool: Optional[aioredis.BlockingConnectionPool] = None
+_async_client: Optional[aioredis.Redis] = None
+
+
+class _TimedRedis(redis.Redis):
+    """redis.Redis observing every command and pipeline in REDIS_DURATION."""
+    
+    def execute_command(self, *args, **options):
+        with timed(REDIS_DURATION, "redis", client="sync", command=str(args[0]).upper()):
+            return super().execute_command(*args, **options)
+    
+    def pipeline(self, transaction=True, shard_hint=None):
+        pipe = super().pipeline(transaction, shard_hint)
+        execute = pipe.execute
+        
+        def timed_execute(*args, **kwargs):
+            with timed(REDIS_DURATION, "redis", client="sync", command="PIPELINE"):
+                return execute(*args, **kwargs)
+        
+        pipe.execute = timed_execute
+        return pipe
+
+
+class _TimedAsyncRedis(aioredis.Redis):
+    """redis.asyncio.Redis observing every command and pipeline in REDIS_DURATION."""
+    
+    async def execute_command(self, *args, **options):
+        with timed(REDIS_DURATION, "redis", client="async", command=str(args[0]).upper()):
+            return await super().execute_command(*args, **options)
+    
+    def pipeline(self, transaction=True, shard_hint=None):
+        pipe = super().pipeline(transaction, shard_hint)
+        execute = pipe.execute
+        
+        async def timed_execute(*args, **kwargs):
+            with timed(REDIS_DURATION, "redis", client="async", command="PIPELINE"):
+                return await execute(*args, **kwargs)
+        
+        pipe.execute = timed_execute
+        return pipe
+
+
+def _connection_kwargs() -> Dict[str, Any]:
+    return {
+        "host": config.REDIS_HOST,
+        "port": config.REDIS_PORT,
+        "db": config.REDIS_DB,
+        "password": config.REDIS_PASSWORD,
+        "socket_timeout": config.REDIS_SOCKET_TIMEOUT,
+        "socket_connect_timeout": config.REDIS_SOCKET_TIMEOUT,
+        "decode_responses": True
+    }
+
+
+def get_redis() -> redis.Redis:
+    """
+    Get the shared synchronous Redis client.
+    
+    Creating the client does no network I/O; connections are opened on first use.
+    """
+    global _sync_pool, _sync_client
+    if _sync_client is None:
+        _sync_pool = redis.BlockingConnectionPool(
+            max_connections=config.REDIS_MAX_CONNECTIONS,
+            timeout=config.REDIS_POOL_TIMEOUT,
+            **_connection_kwargs()
+        )
+        _sync_client = _TimedRedis(connection_pool=_sync_pool)
+    return _sync_client
+
+
+def get_async_redis() -> aioredis.Redis:
+    """
+    Get the shared redis.asyncio client for use inside request handlers.
+    
+    Creating the client does no network I/O; connections are opened on first use.
+    """
+    global _async_pool, _async_client
+    if _async_client is None:
+        _async_pool = aioredis.BlockingConnectionPool(
+            max_connections=config.REDIS_MAX_CONNECTIONS,
+            timeout=config.REDIS_POOL_TIMEOUT,
+            **_connection_kwargs()
+        )
+        _async_client = _TimedAsyncRedis(connection_pool=_async_pool)
+    return _async_client
+
+
+async def check_redis() -> bool:
+    """
+    Ping Redis through the async pool.
+    
+    Raises:
+        RedisConnectionError: If Redis is unreachable
+    """
+    try:
+        await get_async_redis().ping()
+        logger.info(f"Connected to Redis at {config.REDIS_HOST}:{config.REDIS_PORT}")
+        return True
+    except Exception as e:
+        logger.error(f"Failed to connect to Redis: {e}")
+        raise RedisConnectionError(f"Cannot connect to Redis: {e}")
+
+
+async def close_pools():
+    """Close both pools (call on shutdown)."""
+    global _sync_pool, _sync_client, _async_pool, _async_client
+    if _async_pool is not None:
+        await _async_pool.disconnect()
+    if _sync_pool is not None:
+        _sync_pool.disconnect()
+    _sync_pool = _sync_client = _async_pool = _async_client = None
+
+
+def _pool_usage(pool: Any) -> Dict[str, Any]:
+    """Connection counts of a blocking pool (sync and asyncio pools track them differently)."""
+    if hasattr(pool, "_in_use_connections"):
+        in_use = len(pool._in_use_connections)
+        idle = len(pool._available_connections)
+    else:
+        # Sync BlockingConnectionPool keeps idle connections (and None
+        # placeholders for unopened slots) in a LIFO queue
+        idle = sum(1 for conn in list(pool.pool.queue) if conn is not None)
+        in_use = len([conn for conn in pool._connections if conn is not None]) - idle
+    return {
+        "max_connections": pool.max_connections,
+        "in_use": in_use,
+        "idle": idle,
+        "utilization": in_use / pool.max_connections if pool.max_connections else 0.0
+    }
+
+
+def pool_stats() -> Dict[str, Any]:
+    """
+    Get pool utilization metrics.
+    
+    Returns:
+        Dictionary with per-pool max, in-use and idle connection counts
+    """
+    return {
+        "host": f"{config.REDIS_HOST}:{config.REDIS_PORT}/{config.REDIS_DB}",
+        "sync": _pool_usage(_sync_pool) if _sync_pool is not None else None,
+        "async": _pool_usage(_async_pool) if _async_pool is not None else None
+    }
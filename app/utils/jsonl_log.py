@@ -0,0 +1,302 @@
+"""
+Append-only JSON Lines logs with a buffered background writer.
+
+Writers never read the log back: entries are queued, and a daemon thread
+appends them in batches when PAIN_LOG_FLUSH_BYTES are buffered or
+PAIN_LOG_FLUSH_INTERVAL seconds have passed. Each batch is a single
+append, so several workers can share a file without rewriting it.
+
+Logs written before this format (one JSON array) are still readable, and a
+legacy file is converted to JSON Lines in place before the first append.
+
+Maintenance:
+    python -m app.utils.jsonl_log compact pain_log.json [--keep 10000]
+    python -m app.utils.jsonl_log rotate pain_log.json [--max-bytes 10485760]
+"""
+import argparse
+import atexit
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+from app.config import config
+from app.utils.logger import logger
+
+
+_STOP = object()
+
+
+def _is_legacy_array(path: str) -> bool:
+    """True if the file holds a single JSON array (the pre-JSONL format)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            while True:
+                ch = f.read(1)
+                if not ch:
+                    return False
+                if not ch.isspace():
+                    return ch == "["
+    except FileNotFoundError:
+        return False
+
+
+def iter_log(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate log entries, oldest first.
+    
+    Reads JSON Lines (skipping corrupted lines) and legacy JSON-array logs.
+    
+    Raises:
+        FileNotFoundError: If the log does not exist
+        json.JSONDecodeError: If a legacy array log is corrupted
+    """
+    if _is_legacy_array(path):
+        with open(path, "r", encoding="utf-8") as f:
+            yield from json.load(f)
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # Partial line from an interrupted append
+                continue
+
+
+def read_log(path: str) -> List[Dict[str, Any]]:
+    """Load all log entries (see iter_log)."""
+    return list(iter_log(path))
+
+
+def _write_atomic(path: str, entries: List[Dict[str, Any]]):
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    os.replace(tmp_path, path)
+
+
+def migrate_legacy(path: str) -> bool:
+    """
+    Convert a legacy JSON-array log to JSON Lines in place.
+    
+    Returns:
+        True if the file was converted
+    """
+    if not _is_legacy_array(path):
+        return False
+    try:
+        entries = read_log(path)
+    except ValueError:
+        aside = f"{path}.corrupt.{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        os.replace(path, aside)
+        logger.warning(f"Corrupted legacy log {path} moved to {aside}")
+        return False
+    _write_atomic(path, entries)
+    logger.info(f"Converted legacy log {path} to JSON Lines ({len(entries)} entries)")
+    return True
+
+
+def compact_log(path: str, keep: Optional[int] = None) -> int:
+    """
+    Rewrite a log atomically, dropping corrupted lines.
+    
+    Args:
+        path: Log file
+        keep: Keep only the newest `keep` entries
+    
+    Returns:
+        Number of entries kept
+    """
+    entries = read_log(path)
+    if keep is not None:
+        entries = entries[-keep:] if keep > 0 else []
+    _write_atomic(path, entries)
+    return len(entries)
+
+
+def rotate_log(path: str, max_bytes: int = 0) -> Optional[str]:
+    """
+    Move the log aside (to <path>.<timestamp>) so new entries start a fresh file.
+    
+    Args:
+        path: Log file
+        max_bytes: Only rotate when the file is at least this large
+    
+    Returns:
+        Path of the rotated file, or None if nothing was rotated
+    """
+    if not os.path.exists(path) or os.path.getsize(path) < max_bytes:
+        return None
+    rotated = f"{path}.{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    os.replace(path, rotated)
+    return rotated
+
+
+class JsonlLogWriter:
+    """
+    Buffered, append-only writer for one JSON Lines file.
+    
+    write() only serializes and enqueues; a daemon thread batches the lines
+    and appends them on the size or time threshold.
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        flush_bytes: Optional[int] = None,
+        flush_interval: Optional[float] = None
+    ):
+        """
+        Initialize the writer.
+        
+        Args:
+            path: Log file
+            flush_bytes: Append once this many bytes are buffered
+            flush_interval: Append buffered lines at least this often (seconds)
+        """
+        self.path = path
+        self.flush_bytes = flush_bytes or config.PAIN_LOG_FLUSH_BYTES
+        self.flush_interval = flush_interval or config.PAIN_LOG_FLUSH_INTERVAL
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._migrated = False
+        self.written = 0
+        self.dropped = 0
+    
+    def write(self, entry: Dict[str, Any]):
+        """Queue one entry for appending."""
+        self._queue.put(json.dumps(entry, ensure_ascii=False) + "\n")
+        if self._thread is None:
+            self._start()
+    
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=f"jsonl-log:{os.path.basename(self.path)}", daemon=True
+                )
+                self._thread.start()
+    
+    def _run(self):
+        buffer: List[str] = []
+        size = 0
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+            
+            if isinstance(item, str):
+                buffer.append(item)
+                size += len(item)
+                if size < self.flush_bytes and time.monotonic() < deadline:
+                    continue
+            
+            if buffer:
+                self._append(buffer)
+                buffer, size = [], 0
+            deadline = time.monotonic() + self.flush_interval
+            
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is _STOP:
+                return
+    
+    def _append(self, lines: List[str]):
+        try:
+            if not self._migrated:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                migrate_legacy(self.path)
+                self._migrated = True
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("".join(lines))
+            self.written += len(lines)
+        except OSError as e:
+            self.dropped += len(lines)
+            logger.error(f"Failed to append {len(lines)} entries to {self.path}: {e}")
+    
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Append everything queued so far; returns False on timeout."""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+    
+    def close(self, timeout: float = 5.0):
+        """Flush and stop the background thread."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+        self._thread = None
+
+
+_writers: Dict[str, JsonlLogWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_log_writer(path: str) -> JsonlLogWriter:
+    """Process-wide writer for a log file (one per path)."""
+    key = os.path.abspath(path)
+    writer = _writers.get(key)
+    if writer is None:
+        with _writers_lock:
+            writer = _writers.get(key)
+            if writer is None:
+                writer = _writers[key] = JsonlLogWriter(path)
+    return writer
+
+
+def close_log_writers():
+    """Flush and stop every log writer (call on shutdown)."""
+    with _writers_lock:
+        writers = list(_writers.values())
+    for writer in writers:
+        writer.close()
+
+
+atexit.register(close_log_writers)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Maintain JSON Lines pain logs")
+    sub = parser.add_subparsers(dest="command", required=True)
+    
+    compact = sub.add_parser("compact", help="Rewrite as clean JSON Lines (converts legacy arrays)")
+    compact.add_argument("path")
+    compact.add_argument("--keep", type=int, default=None, help="Keep only the newest N entries")
+    
+    rotate = sub.add_parser("rotate", help="Move the log aside to <path>.<timestamp>")
+    rotate.add_argument("path")
+    rotate.add_argument("--max-bytes", type=int, default=0, help="Only rotate logs at least this large")
+    
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "compact":
+            kept = compact_log(args.path, keep=args.keep)
+            print(f"{args.path}: {kept} entries")
+        else:
+            rotated = rotate_log(args.path, max_bytes=args.max_bytes)
+            print(f"{args.path} -> {rotated}" if rotated else f"{args.path}: not rotated")
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
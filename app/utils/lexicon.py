@@ -0,0 +1,298 @@
+"""
+Single-pass lexicon engine for keyword and regex matchers.
+
+All keyword lexicons (ego impact patterns, MBTI axis patterns, crisis words,
+empathy snippets, Athena insult/praise cues) are registered on one engine.
+A message is lowercased once and scanned once with an Aho-Corasick automaton
+built over the literal anchors of every entry; only regex entries whose
+anchor occurred are confirmed with their compiled pattern. Scan cost grows
+with text length and number of hits, not with the number of entries.
+
+Usage:
+    from app.utils.lexicon import lexicon_engine
+    lexicon_engine.register("crisis_negative", {"negative": ["die", "hopeless"]})
+    hits = lexicon_engine.scan(text)
+    if hits.any("crisis_negative"): ...
+"""
+import re
+import threading
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from app.config import config
+from app.utils.logger import logger
+
+
+# Characters with special meaning in the regex entries we extract anchors from
+_REGEX_META = set("()[]{}.*+?|^$\\")
+_QUANTIFIERS = set("?*{")
+
+
+def literal_anchor(pattern: str) -> str:
+    """
+    Extract a literal that every match of pattern must contain.
+    
+    Takes the literal prefix of the pattern (after leading \\b), dropping the
+    last character if it is quantified. Returns "" when no safe anchor exists
+    (e.g. top-level alternation), in which case the pattern is always checked.
+    """
+    depth = 0
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "|" and depth == 0:
+            return ""
+        i += 1
+    
+    body = pattern
+    while body.startswith("\\b"):
+        body = body[2:]
+    anchor = []
+    i = 0
+    while i < len(body):
+        ch = body[i]
+        if ch == "\\":
+            # \b ends the literal, escaped punctuation is literal
+            if i + 1 < len(body) and not body[i + 1].isalnum():
+                anchor.append(body[i + 1])
+                i += 2
+                continue
+            break
+        if ch in _REGEX_META:
+            if ch in _QUANTIFIERS and anchor:
+                anchor.pop()
+            break
+        anchor.append(ch)
+        i += 1
+    return "".join(anchor).lower()
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton over lowercase literal keys."""
+    
+    def __init__(self, keys: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[str]] = [[]]
+        for key in set(keys):
+            if key:
+                self._add(key)
+        self._build()
+    
+    def _add(self, key: str):
+        node = 0
+        for ch in key:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append(key)
+    
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+    
+    def find(self, text: str) -> set:
+        """Return the set of keys occurring anywhere in text."""
+        found = set()
+        node = 0
+        goto, fail, out = self._goto, self._fail, self._out
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                found.update(out[node])
+        return found
+
+
+class LexiconHits:
+    """
+    Scan result: matched entries grouped by lexicon and tag.
+    
+    Shared between all consumers of a scan (and cached), so treat as read-only.
+    """
+    
+    __slots__ = ("_hits",)
+    
+    def __init__(self, hits: Dict[str, Dict[str, Tuple[str, ...]]]):
+        self._hits = hits
+    
+    def get(self, lexicon: str, tag: Optional[str] = None) -> Tuple[str, ...]:
+        """Matched entries of a lexicon (optionally of one tag)."""
+        groups = self._hits.get(lexicon, {})
+        if tag is not None:
+            return groups.get(tag, ())
+        return tuple(entry for entries in groups.values() for entry in entries)
+    
+    def tags(self, lexicon: str) -> Dict[str, Tuple[str, ...]]:
+        """Tag -> matched entries of a lexicon."""
+        return dict(self._hits.get(lexicon, {}))
+    
+    def count(self, lexicon: str, tag: Optional[str] = None) -> int:
+        return len(self.get(lexicon, tag))
+    
+    def any(self, lexicon: str, tag: Optional[str] = None) -> bool:
+        return self.count(lexicon, tag) > 0
+    
+    def to_dict(self) -> Dict[str, Dict[str, List[str]]]:
+        return {lex: {tag: list(entries) for tag, entries in groups.items()} for lex, groups in self._hits.items()}
+
+
+class LexiconEngine:
+    """
+    Registry of lexicons scanned together in one pass.
+    
+    A lexicon maps tags to entries. Substring lexicons match an entry when it
+    occurs anywhere in the lowercased text (same as `entry in text.lower()`);
+    regex lexicons match when `re.search(entry, text, flags)` does.
+    """
+    
+    def __init__(self, cache_size: int = 4096, max_cached_length: int = 2048):
+        """
+        Initialize the engine.
+        
+        Args:
+            cache_size: Number of recent scan results kept (messages recur
+                        across turns as recent history)
+            max_cached_length: Texts longer than this are scanned uncached
+        """
+        self.max_cached_length = max_cached_length
+        # anchor -> [(lexicon, tag, entry, compiled regex or None)]
+        self._by_anchor: Dict[str, List[tuple]] = {}
+        # regex entries without a usable anchor, checked on every scan
+        self._unanchored: List[tuple] = []
+        self._lexicons: Dict[str, int] = {}
+        self._automaton: Optional[AhoCorasick] = None
+        self._lock = threading.Lock()
+        self._cached_scan = lru_cache(maxsize=cache_size)(self._scan)
+    
+    def register(
+        self,
+        name: str,
+        entries: Union[Dict[str, Iterable[str]], Iterable[str]],
+        regex: bool = False,
+        flags: int = re.IGNORECASE
+    ):
+        """
+        Register (or replace) a lexicon.
+        
+        Args:
+            name: Lexicon name, e.g. "crisis_negative"
+            entries: Tag -> entries, or a plain list (tagged with name)
+            regex: Entries are regular expressions instead of substrings
+            flags: Regex flags (regex lexicons only)
+        """
+        if not isinstance(entries, dict):
+            entries = {name: entries}
+        
+        with self._lock:
+            if name in self._lexicons:
+                self._remove(name)
+            count = 0
+            for tag, tag_entries in entries.items():
+                for entry in tag_entries:
+                    if regex:
+                        compiled = re.compile(entry, flags)
+                        anchor = literal_anchor(entry) if flags & re.IGNORECASE else ""
+                        record = (name, tag, entry, compiled)
+                        if anchor:
+                            self._by_anchor.setdefault(anchor, []).append(record)
+                        else:
+                            self._unanchored.append(record)
+                    else:
+                        self._by_anchor.setdefault(entry.lower(), []).append((name, tag, entry, None))
+                    count += 1
+            self._lexicons[name] = count
+            self._automaton = None
+            self._cached_scan.cache_clear()
+        logger.debug(f"Lexicon {name} registered with {count} entries")
+    
+    def _remove(self, name: str):
+        for anchor in list(self._by_anchor):
+            kept = [rec for rec in self._by_anchor[anchor] if rec[0] != name]
+            if kept:
+                self._by_anchor[anchor] = kept
+            else:
+                del self._by_anchor[anchor]
+        self._unanchored = [rec for rec in self._unanchored if rec[0] != name]
+    
+    def _get_automaton(self) -> AhoCorasick:
+        automaton = self._automaton
+        if automaton is None:
+            with self._lock:
+                if self._automaton is None:
+                    self._automaton = AhoCorasick(self._by_anchor.keys())
+                automaton = self._automaton
+        return automaton
+    
+    def scan(self, text: str) -> LexiconHits:
+        """
+        Scan text once against every registered lexicon.
+        
+        Args:
+            text: Raw text
+        
+        Returns:
+            LexiconHits with matched entries grouped by lexicon and tag
+        """
+        if not text or not isinstance(text, str):
+            return LexiconHits({})
+        if len(text) > self.max_cached_length:
+            return self._scan(text)
+        return self._cached_scan(text)
+    
+    def _scan(self, text: str) -> LexiconHits:
+        lowered = text.lower()
+        candidates = []
+        for anchor in self._get_automaton().find(lowered):
+            candidates.extend(self._by_anchor.get(anchor, ()))
+        candidates.extend(self._unanchored)
+        
+        hits: Dict[str, Dict[str, List[str]]] = {}
+        seen = set()
+        for name, tag, entry, compiled in candidates:
+            if (name, tag, entry) in seen:
+                continue
+            if compiled is not None and not compiled.search(text):
+                continue
+            seen.add((name, tag, entry))
+            hits.setdefault(name, {}).setdefault(tag, []).append(entry)
+        return LexiconHits({
+            name: {tag: tuple(entries) for tag, entries in groups.items()}
+            for name, groups in hits.items()
+        })
+    
+    def stats(self) -> Dict[str, object]:
+        info = self._cached_scan.cache_info()
+        return {
+            "lexicons": dict(self._lexicons),
+            "anchors": len(self._by_anchor),
+            "unanchored_patterns": len(self._unanchored),
+            "cache_hits": info.hits,
+            "cache_misses": info.misses,
+            "cache_size": info.currsize
+        }
+
+
+# Process-wide engine shared by every keyword matcher
+lexicon_engine = LexiconEngine(cache_size=config.LEXICON_CACHE_SIZE)
@@ -0,0 +1,218 @@
+"""
+Latency histograms in Prometheus text format, plus per-request Server-Timing.
+
+Histograms are cumulative since process start and are rendered with
+render_prometheus() (served at /api/v1/metrics/prometheus):
+
+- athena_workflow_duration_seconds{outcome}            whole workflow
+- athena_workflow_step_duration_seconds{step}          each of the workflow steps
+- athena_llm_request_duration_seconds{caller,mode}     connector calls (wedana, final_response, crisis, ...)
+- athena_emotion_classifier_duration_seconds{backend}  classifier forward passes (one per batch)
+- athena_redis_command_duration_seconds{client,command}  Redis commands and pipelines
+
+Inside server_timing() the same observations are also summed per request
+(by step, "llm" and "redis"), for the Server-Timing header of /chat.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# Seconds; spans Redis round trips (sub-millisecond) to LLM generations (tens of seconds)
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Histogram:
+    """
+    Thread-safe Prometheus-style histogram with labels.
+
+    Each label combination keeps per-bucket counts, a sum and a count.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        """
+        Initialize the histogram.
+
+        Args:
+            name: Metric name (without the _bucket/_sum/_count suffixes)
+            documentation: HELP text
+            labelnames: Label names; observe() takes them as keyword arguments
+            buckets: Upper bounds in seconds, ascending (+Inf is implicit)
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str):
+        """Record one observation (seconds)."""
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # [per-bucket counts (last one is +Inf), sum, count]
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the duration of the with-block (also when it raises)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def collect(self) -> List[str]:
+        """Prometheus text exposition lines."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(key, list(s[0]), s[1], s[2]) for key, s in sorted(self._series.items())]
+        for key, counts, total, count in snapshot:
+            labels = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)]
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                bucket_labels = ",".join(labels + [f'le="{_format_value(bound)}"'])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {cumulative}")
+            suffix = f"{{{','.join(labels)}}}" if labels else ""
+            lines.append(f"{self.name}_sum{suffix} {_format_value(total)}")
+            lines.append(f"{self.name}_count{suffix} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named collection of histograms rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), **kwargs) -> Histogram:
+        """Register a histogram (or return the one already registered under this name)."""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Histogram(name, documentation, labelnames, **kwargs)
+            return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry and the application's histograms
+registry = MetricsRegistry()
+
+WORKFLOW_DURATION = registry.histogram(
+    "athena_workflow_duration_seconds", "Duration of a complete chat workflow.", ["outcome"]
+)
+STEP_DURATION = registry.histogram(
+    "athena_workflow_step_duration_seconds", "Duration of one workflow step.", ["step"]
+)
+LLM_DURATION = registry.histogram(
+    "athena_llm_request_duration_seconds", "Duration of one LLM connector call.", ["caller", "mode"]
+)
+CLASSIFIER_DURATION = registry.histogram(
+    "athena_emotion_classifier_duration_seconds", "Duration of one emotion classifier batch.", ["backend"]
+)
+REDIS_DURATION = registry.histogram(
+    "athena_redis_command_duration_seconds", "Duration of one Redis command or pipeline.", ["client", "command"]
+)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def render_prometheus() -> str:
+    """All histograms in Prometheus text exposition format."""
+    return registry.render()
+
+
+# -----------------------------
+# Per-request Server-Timing
+# -----------------------------
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("athena_request_timings", default=None)
+# The timings dict is shared with the worker threads a request starts (asyncio.to_thread copies the context)
+_timings_lock = threading.Lock()
+
+
+@contextmanager
+def server_timing() -> Iterator[Dict[str, float]]:
+    """
+    Collect durations of the current request (and the tasks and threads it starts).
+
+    Yields:
+        Dictionary name -> summed seconds, filled by record_timing()
+    """
+    timings: Dict[str, float] = {}
+    token = _request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _request_timings.reset(token)
+
+
+def record_timing(name: str, seconds: float):
+    """Add a duration to the current request's Server-Timing (no-op outside server_timing())."""
+    timings = _request_timings.get()
+    if timings is not None:
+        with _timings_lock:
+            timings[name] = timings.get(name, 0.0) + seconds
+
+
+@contextmanager
+def timed(histogram: Histogram, timing: Optional[str] = None, **labels: str) -> Iterator[None]:
+    """
+    Observe the with-block in a histogram and, if named, in the request's Server-Timing.
+
+    Args:
+        histogram: Histogram to observe into
+        timing: Server-Timing metric name to add the duration to
+        **labels: Histogram labels
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        histogram.observe(elapsed, **labels)
+        if timing:
+            record_timing(timing, elapsed)
+
+
+def format_server_timing(timings: Dict[str, float]) -> str:
+    """Server-Timing header value, e.g. "llm;dur=412.3, redis;dur=3.1" (milliseconds)."""
+    with _timings_lock:
+        items = list(timings.items())
+    return ", ".join(f"{name};dur={seconds * 1000.0:.1f}" for name, seconds in items)
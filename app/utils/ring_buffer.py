@@ -0,0 +1,139 @@
+"""
+Fixed-capacity ring buffer with optional spill of evicted entries to disk.
+"""
+import hashlib
+import json
+import os
+import re
+from typing import Any, Iterator, List, Optional, Union
+from app.utils.jsonl_log import get_log_writer
+from app.utils.logger import logger
+
+
+def spill_path(directory: str, owner_id: Optional[str], name: str, ext: str = "jsonl") -> Optional[str]:
+    """
+    Spill file for one history of one owner, or None when spilling is disabled.
+    
+    The file name is the owner id with unsafe characters replaced, plus a
+    short hash of the raw id, so ids like "a b" and "a_b" never share a file.
+    
+    Args:
+        directory: Spill directory ("" disables spilling)
+        owner_id: Owner of the history, e.g. a user id
+        name: History name, e.g. "interactions"
+        ext: File extension
+    """
+    if not directory or not owner_id:
+        return None
+    safe_id = re.sub(r"[^A-Za-z0-9_.-]", "_", owner_id)
+    digest = hashlib.sha1(owner_id.encode("utf-8")).hexdigest()[:8]
+    return os.path.join(directory, f"{safe_id}-{digest}.{name}.{ext}")
+
+
+class RingBuffer:
+    """
+    Fixed-capacity, list-like history.
+    
+    Appending beyond capacity overwrites the oldest entry in place (no
+    copying). Evicted entries are appended as JSON lines to spill_path when
+    one is set, through the background JsonlLogWriter of that file, so full
+    histories stay reachable without living in RAM or blocking the caller.
+    Supports len(), iteration (oldest first), indexing and slicing.
+    """
+    
+    def __init__(self, capacity: int, spill_path: Optional[str] = None, items: Optional[List[Any]] = None):
+        """
+        Initialize the buffer.
+        
+        Args:
+            capacity: Maximum number of entries kept in memory
+            spill_path: Optional JSONL file receiving evicted entries
+            items: Optional initial entries (oldest first); only the newest
+                   `capacity` are kept, older ones are spilled
+        """
+        self.capacity = max(1, int(capacity))
+        self.spill_path = spill_path
+        self._items: List[Any] = []
+        self._start = 0
+        # Entries ever appended (including evicted and spilled ones)
+        self.total = 0
+        self.spilled = 0
+        for item in items or []:
+            self.append(item)
+    
+    def append(self, item: Any) -> Optional[Any]:
+        """
+        Append an entry, evicting (and spilling) the oldest when full.
+        
+        Returns:
+            The evicted entry, or None if the buffer was not full
+        """
+        self.total += 1
+        if len(self._items) < self.capacity:
+            self._items.append(item)
+            return None
+        evicted = self._items[self._start]
+        self._items[self._start] = item
+        self._start = (self._start + 1) % self.capacity
+        self._spill(evicted)
+        return evicted
+    
+    def _spill(self, item: Any):
+        if not self.spill_path:
+            return
+        try:
+            get_log_writer(self.spill_path).write(item)
+            self.spilled += 1
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Could not spill history entry to {self.spill_path}: {e}")
+    
+    def __len__(self) -> int:
+        return len(self._items)
+    
+    def __bool__(self) -> bool:
+        return bool(self._items)
+    
+    def __iter__(self) -> Iterator[Any]:
+        n = len(self._items)
+        for i in range(n):
+            yield self._items[(self._start + i) % n]
+    
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        n = len(self._items)
+        if isinstance(index, slice):
+            return [self._items[(self._start + i) % n] for i in range(*index.indices(n))]
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("ring buffer index out of range")
+        return self._items[(self._start + index) % n]
+    
+    def to_list(self) -> List[Any]:
+        """In-memory entries, oldest first."""
+        return list(self)
+    
+    def clear(self):
+        self._items = []
+        self._start = 0
+    
+    def iter_spilled(self) -> Iterator[Any]:
+        """Entries evicted to the spill file, oldest first."""
+        if not self.spill_path:
+            return
+        # Entries still queued in the writer are part of the spill
+        get_log_writer(self.spill_path).flush()
+        if not os.path.exists(self.spill_path):
+            return
+        with open(self.spill_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+    
+    def iter_all(self) -> Iterator[Any]:
+        """Spilled entries followed by in-memory entries, oldest first."""
+        yield from self.iter_spilled()
+        yield from self
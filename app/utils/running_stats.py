@@ -0,0 +1,52 @@
+"""
+Streaming statistics maintained on mutation, so reads cost O(1).
+"""
+from typing import Dict, Any
+
+
+class WindowedStats:
+    """
+    Running mean and population variance (Welford) over a sliding window.
+    
+    Values are added as they enter the window and removed as they leave it,
+    so the owner decides the window (e.g. a RingBuffer's evictions).
+    """
+    
+    __slots__ = ("count", "mean", "_m2")
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+    
+    def add(self, value: float):
+        """Add a value entering the window."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+    
+    def remove(self, value: float):
+        """Remove a value leaving the window (must have been added)."""
+        if self.count <= 1:
+            self.clear()
+            return
+        self.count -= 1
+        delta = value - self.mean
+        self.mean -= delta / self.count
+        self._m2 -= delta * (value - self.mean)
+    
+    @property
+    def variance(self) -> float:
+        """Population variance of the window (0.0 when empty)."""
+        if self.count < 1:
+            return 0.0
+        return max(0.0, self._m2 / self.count)
+    
+    def clear(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {"count": self.count, "mean": self.mean, "variance": self.variance}
@@ -0,0 +1,88 @@
+"""
+Compare two benchmark reports written by benchmarks.run.
+
+    python -m benchmarks.compare base.json new.json [--threshold 0.10]
+
+Prints the change of throughput and p50/p95/p99 per target and per step, and
+exits with status 1 when any end-to-end percentile regressed by more than
+the threshold (relative), so it can gate CI.
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def _change(old: Optional[float], new: Optional[float]) -> Optional[float]:
+    if not old or new is None:
+        return None
+    return (new - old) / old
+
+
+def _row(name: str, old: Dict[str, Any], new: Dict[str, Any]) -> Tuple[str, List[str]]:
+    cells = []
+    for metric in METRICS:
+        change = _change(old.get(metric), new.get(metric))
+        delta = f"{change:+.1%}" if change is not None else "n/a"
+        cells.append(f"{old.get(metric, '-')} -> {new.get(metric, '-')} ({delta})")
+    return name, cells
+
+
+def compare(base: Dict[str, Any], new: Dict[str, Any], threshold: float) -> Tuple[List[str], List[str]]:
+    """
+    Compare two reports.
+    
+    Returns:
+        (report lines, end-to-end regressions beyond the threshold)
+    """
+    lines, regressions = [], []
+    for target, new_result in new.get("results", {}).items():
+        base_result = base.get("results", {}).get(target)
+        if base_result is None:
+            lines.append(f"{target}: not in base report")
+            continue
+        old_e2e, new_e2e = base_result["end_to_end"], new_result["end_to_end"]
+        change = _change(old_e2e.get("throughput_rps"), new_e2e.get("throughput_rps"))
+        lines.append(f"{target}: throughput {old_e2e.get('throughput_rps')} -> {new_e2e.get('throughput_rps')} rps"
+                     + (f" ({change:+.1%})" if change is not None else ""))
+        
+        rows = [_row("end_to_end", old_e2e, new_e2e)]
+        for step, new_step in new_result.get("steps", {}).items():
+            rows.append(_row(step, base_result.get("steps", {}).get(step, {}), new_step))
+        for name, cells in rows:
+            lines.append(f"  {name:<24} " + "  ".join(f"{m[:-3]}: {c}" for m, c in zip(METRICS, cells)))
+        
+        for metric in METRICS:
+            change = _change(old_e2e.get(metric), new_e2e.get(metric))
+            if change is not None and change > threshold:
+                regressions.append(f"{target} {metric} {change:+.1%}")
+    return lines, regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two Athena benchmark reports")
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed relative end-to-end slowdown")
+    args = parser.parse_args(argv)
+    
+    with open(args.base, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, "r", encoding="utf-8") as f:
+        new = json.load(f)
+    if base.get("params") != new.get("params"):
+        print("Warning: reports were produced with different parameters")
+    
+    lines, regressions = compare(base, new, args.threshold)
+    print("\n".join(lines))
+    if regressions:
+        print("Regressions: " + ", ".join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+Synthetic multi-user chat corpus.
+
+Each user gets a seeded sequence of turns drawn from message categories
+(positive, negative, neutral, questions, insults, praise and a few crisis
+messages), with repeats ("thanks", "ok") at a realistic rate so caches see
+realistic hit rates. A corpus can be saved as JSON Lines and reused:
+
+    {"user_id": "bench_user_0", "session_id": "bench_session_0", "turn": 0, "text": "..."}
+"""
+import json
+import random
+from typing import Dict, List, Optional
+
+
+MESSAGES: Dict[str, List[str]] = {
+    "positive": [
+        "I feel great today!",
+        "I finally finished my project and it went really well.",
+        "Had a lovely walk with my dog this morning.",
+        "My exam results came back and I passed everything.",
+        "I love being with my friends on weekends."
+    ],
+    "negative": [
+        "I'm so tired and nothing seems to work out.",
+        "I had a huge fight with my brother and I feel awful.",
+        "Work has been overwhelming and I can't keep up.",
+        "I feel lonely even when people are around me.",
+        "I failed the interview again, I'm so disappointed."
+    ],
+    "neutral": [
+        "ok",
+        "thanks",
+        "I went to the store and bought some groceries.",
+        "The weather is cloudy today.",
+        "I'm reading a book about history."
+    ],
+    "question": [
+        "What do you think I should do next with my career?",
+        "Maybe we could plan a party with friends this weekend?",
+        "How do you deal with stress?",
+        "Do you think people can really change?"
+    ],
+    "insult": [
+        "You're just a stupid program, you can't help me.",
+        "I hate you Athena"
+    ],
+    "praise": [
+        "thank you, you are kind",
+        "I love you Athena, you always listen."
+    ],
+    "crisis": [
+        "Nothing really matters anymore, I'm so tired and alone.",
+        "I want to die"
+    ]
+}
+
+CATEGORY_WEIGHTS = {
+    "positive": 0.25,
+    "negative": 0.25,
+    "neutral": 0.2,
+    "question": 0.15,
+    "insult": 0.05,
+    "praise": 0.07,
+    "crisis": 0.03
+}
+
+
+def build_corpus(users: int = 10, turns: int = 10, seed: int = 0) -> List[Dict[str, object]]:
+    """
+    Generate a corpus, ordered by turn then user (round robin).
+    
+    Args:
+        users: Number of users
+        turns: Turns per user
+        seed: Random seed (the same seed always gives the same corpus)
+    
+    Returns:
+        List of turn dicts (user_id, session_id, turn, text)
+    """
+    rng = random.Random(seed)
+    categories = list(CATEGORY_WEIGHTS)
+    weights = [CATEGORY_WEIGHTS[c] for c in categories]
+    corpus = []
+    for turn in range(turns):
+        for user in range(users):
+            category = rng.choices(categories, weights)[0]
+            corpus.append({
+                "user_id": f"bench_user_{user}",
+                "session_id": f"bench_session_{user}",
+                "turn": turn,
+                "category": category,
+                "text": rng.choice(MESSAGES[category])
+            })
+    return corpus
+
+
+def save_corpus(corpus: List[Dict[str, object]], path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        for item in corpus:
+            f.write(json.dumps(item, ensure_ascii=False) + "\n")
+
+
+def load_corpus(path: str, limit: Optional[int] = None) -> List[Dict[str, object]]:
+    """Load a JSON Lines corpus (see module docstring)."""
+    corpus = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                corpus.append(json.loads(line))
+            if limit is not None and len(corpus) >= limit:
+                break
+    return corpus
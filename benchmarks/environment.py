@@ -0,0 +1,145 @@
+"""
+Hermetic benchmark environment: in-process Redis, stub classifier, temp files.
+
+install() must run before the workflow modules are imported, since several
+of them take a Redis client at import time:
+
+    env = BenchmarkEnvironment(llm_url=server.generate_url).install()
+    from app.api.workflow import orchestrator
+    env.install_classifier()
+
+Redis is replaced by fakeredis (one FakeServer shared by the sync and async
+clients, so both see the same data); files the workflow writes (pain logs,
+the Athena profile, ego snapshot series) go to a temporary directory.
+"""
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, List, Optional
+from app.config import config
+from app.emotions.emotion_backends import EmotionBackend
+from benchmarks.latency import LatencyDistribution
+
+
+GO_EMOTIONS_LABELS = [
+    "admiration", "amusement", "anger", "annoyance", "approval", "caring", "confusion",
+    "curiosity", "desire", "disappointment", "disapproval", "disgust", "embarrassment",
+    "excitement", "fear", "gratitude", "grief", "joy", "love", "nervousness", "optimism",
+    "pride", "realization", "relief", "remorse", "sadness", "surprise", "neutral"
+]
+
+# Keyword -> dominant label, so insults, praise and crisis messages score like the real model
+KEYWORD_LABELS = [
+    ("die", "sadness"), ("alone", "sadness"), ("lonely", "sadness"), ("tired", "sadness"),
+    ("hate", "anger"), ("stupid", "anger"), ("fight", "anger"),
+    ("disappointed", "disappointment"), ("failed", "disappointment"), ("overwhelming", "fear"),
+    ("thank", "gratitude"), ("love", "love"), ("kind", "caring"),
+    ("great", "joy"), ("well", "joy"), ("passed", "joy"), ("lovely", "joy"),
+    ("?", "curiosity"), ("confused", "confusion")
+]
+
+
+class StubEmotionBackend(EmotionBackend):
+    """
+    Deterministic GoEmotions-shaped scores with a configurable inference delay.
+    
+    The delay is per batch (like a padded forward pass), drawn from `latency`.
+    """
+    
+    name = "stub"
+    
+    def __init__(self, latency: str = "0", seed: Optional[int] = None):
+        self.latency = LatencyDistribution(latency, seed)
+        self.batches = 0
+    
+    def _scores(self, text: str) -> Dict[str, float]:
+        digest = hashlib.sha1(text.encode("utf-8")).digest()
+        scores = {label: digest[i % len(digest)] / 255.0 * 0.05 for i, label in enumerate(GO_EMOTIONS_LABELS)}
+        lower = text.lower()
+        dominant = next((label for keyword, label in KEYWORD_LABELS if keyword in lower), "neutral")
+        scores[dominant] = 0.6 + digest[0] / 255.0 * 0.35
+        return scores
+    
+    def predict(self, texts: List[str]) -> List[Dict[str, float]]:
+        delay = self.latency.sample()
+        if delay:
+            time.sleep(delay)
+        self.batches += 1
+        return [self._scores(text) for text in texts]
+
+
+class BenchmarkEnvironment:
+    """Points the app at stand-ins for Redis, the LLM and the classifier."""
+    
+    def __init__(
+        self,
+        llm_url: str,
+        classifier_latency: str = "0",
+        seed: Optional[int] = None,
+        log_level: int = logging.WARNING
+    ):
+        """
+        Initialize the environment.
+        
+        Args:
+            llm_url: Generate URL of the stub Ollama server
+            classifier_latency: Per-batch delay of the stub classifier
+            seed: Seed of the stub classifier latency
+            log_level: Level of the "athena" logger during the run
+        """
+        self.llm_url = llm_url
+        self.classifier_latency = classifier_latency
+        self.seed = seed
+        self.log_level = log_level
+        self.workdir: Optional[str] = None
+        self.classifier: Optional[StubEmotionBackend] = None
+        self.redis = None
+    
+    def install(self) -> 'BenchmarkEnvironment':
+        """
+        Install fakeredis and redirect config. Call before importing the workflow.
+        
+        Raises:
+            RuntimeError: If fakeredis is not installed
+        """
+        try:
+            import fakeredis
+        except ImportError:
+            raise RuntimeError("Benchmarks need fakeredis: pip install -r benchmarks/requirements.txt")
+        from app.memory import redis_pool
+        
+        server = fakeredis.FakeServer()
+        self.redis = fakeredis.FakeRedis(server=server, decode_responses=True)
+        redis_pool._sync_client = self.redis
+        redis_pool._async_client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+        
+        self.workdir = tempfile.mkdtemp(prefix="athena-bench-")
+        profile_path = os.path.join(self.workdir, "athena_profile.json")
+        shutil.copyfile(config.ATHENA_PROFILE_PATH, profile_path)
+        config.ATHENA_PROFILE_PATH = profile_path
+        config.PAIN_LOG_FILE = os.path.join(self.workdir, "pain_log.json")
+        config.USER_PAIN_LOG_FILE = os.path.join(self.workdir, "user_pain_log.json")
+        if config.EGO_SERIES_DIR:
+            config.EGO_SERIES_DIR = os.path.join(self.workdir, "ego_series")
+        config.EGO_HISTORY_SPILL_DIR = ""
+        config.LLM_URL = self.llm_url
+        
+        logging.getLogger("athena").setLevel(self.log_level)
+        return self
+    
+    def install_classifier(self) -> StubEmotionBackend:
+        """Replace the emotion model with the stub backend (after the workflow import)."""
+        from app.emotions import emotion_redis
+        
+        self.classifier = StubEmotionBackend(self.classifier_latency, self.seed)
+        emotion_redis._emotion_backend = self.classifier
+        return self.classifier
+    
+    def cleanup(self):
+        """Remove the temporary directory."""
+        if self.workdir:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+            self.workdir = None
@@ -0,0 +1,98 @@
+"""
+Latency distributions and summary statistics for the benchmarks.
+
+Distributions are given as "<kind>:<params>" in milliseconds:
+- "fixed:50"          always 50 ms
+- "uniform:20,80"     uniform between 20 and 80 ms
+- "normal:50,10"      mean 50 ms, standard deviation 10 ms (clipped at 0)
+- "lognormal:50,0.5"  median 50 ms, sigma 0.5 (long right tail, like real LLMs)
+"0" or "none" means no delay.
+"""
+import random
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+
+
+PERCENTILES = (50, 95, 99)
+
+
+class LatencyDistribution:
+    """Random delay source parsed from a distribution spec."""
+    
+    KINDS = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+    
+    def __init__(self, spec: str = "0", seed: Optional[int] = None):
+        """
+        Initialize the distribution.
+        
+        Args:
+            spec: Distribution spec (see module docstring)
+            seed: Seed of the private random generator
+        
+        Raises:
+            ValueError: If the spec cannot be parsed
+        """
+        self.spec = spec
+        self.rng = random.Random(seed)
+        spec = (spec or "0").strip().lower()
+        if spec in ("0", "none", ""):
+            self.kind, self.params = "fixed", [0.0]
+            return
+        kind, _, raw = spec.partition(":")
+        if kind not in self.KINDS:
+            # A bare number is a fixed delay
+            kind, raw = "fixed", spec
+        try:
+            params = [float(p) for p in raw.split(",") if p.strip()]
+        except ValueError:
+            raise ValueError(f"Invalid latency spec: {self.spec}")
+        if len(params) != self.KINDS[kind] or any(p < 0 for p in params):
+            raise ValueError(f"Invalid latency spec: {self.spec}")
+        self.kind, self.params = kind, params
+    
+    def sample_ms(self) -> float:
+        """Draw one delay in milliseconds."""
+        if self.kind == "fixed":
+            return self.params[0]
+        a, b = self.params
+        if self.kind == "uniform":
+            return self.rng.uniform(min(a, b), max(a, b))
+        if self.kind == "normal":
+            return max(0.0, self.rng.gauss(a, b))
+        return a * self.rng.lognormvariate(0.0, b) if a > 0 else 0.0
+    
+    def sample(self) -> float:
+        """Draw one delay in seconds."""
+        return self.sample_ms() / 1000.0
+
+
+def summarize(samples_ms: Sequence[float], wall_seconds: Optional[float] = None) -> Dict[str, float]:
+    """
+    Summary statistics of latency samples.
+    
+    Args:
+        samples_ms: Latencies in milliseconds
+        wall_seconds: Wall time of the run, to report throughput
+    
+    Returns:
+        count, mean, min, max and p50/p95/p99 in milliseconds
+        (plus throughput_rps when wall_seconds is given)
+    """
+    summary: Dict[str, float] = {"count": len(samples_ms)}
+    if samples_ms:
+        values = np.asarray(samples_ms, dtype=np.float64)
+        summary.update({
+            "mean_ms": round(float(values.mean()), 3),
+            "min_ms": round(float(values.min()), 3),
+            "max_ms": round(float(values.max()), 3)
+        })
+        for p, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+            summary[f"p{p}_ms"] = round(float(value), 3)
+    if wall_seconds:
+        summary["throughput_rps"] = round(len(samples_ms) / wall_seconds, 3)
+    return summary
+
+
+def summarize_steps(step_samples: Dict[str, List[float]]) -> Dict[str, Dict[str, float]]:
+    """Summaries of per-step latencies, keyed by step name."""
+    return {name: summarize(samples) for name, samples in sorted(step_samples.items())}
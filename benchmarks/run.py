@@ -0,0 +1,254 @@
+"""
+End-to-end workflow benchmark.
+
+Runs a synthetic multi-user corpus through
+- "workflow": WorkflowOrchestrator.process_user_interaction (with per-step timings)
+- "http":     POST /api/v1/chat on the FastAPI app (in-process ASGI transport)
+
+against a stub Ollama server, fakeredis and a stub emotion classifier, and
+writes throughput and p50/p95/p99 latencies as JSON:
+
+    python -m benchmarks.run --users 20 --turns 10 --concurrency 8 \\
+        --llm-latency lognormal:300,0.5 --output benchmarks/results/base.json
+    python -m benchmarks.compare benchmarks/results/base.json benchmarks/results/new.json
+
+Users run concurrently (at most --concurrency at a time); the turns of one
+user run in order, like a real conversation.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Callable, Awaitable, Dict, List, Optional
+from benchmarks.corpus import build_corpus, load_corpus
+from benchmarks.environment import BenchmarkEnvironment
+from benchmarks.latency import summarize, summarize_steps
+from benchmarks.stub_ollama import StubOllama, StubOllamaServer
+
+
+TARGETS = ("workflow", "http")
+RESULT_VERSION = 1
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+class StepTimer:
+    """progress_callback recording how long each workflow step runs."""
+    
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self._started: Dict[tuple, float] = {}
+    
+    def __call__(self, progress: Any):
+        now = time.perf_counter()
+        step = next((s for s in progress.steps if s.step_number == progress.current_step), None)
+        if step is None:
+            return
+        key = (progress.workflow_id, step.step_name)
+        if step.status == "processing":
+            self._started[key] = now
+        elif step.status == "completed" and key in self._started:
+            self.samples[step.step_name].append((now - self._started.pop(key)) * 1000.0)
+
+
+async def _run_corpus(
+    corpus: List[Dict[str, Any]],
+    interact: Callable[[Dict[str, Any]], Awaitable[None]],
+    concurrency: int
+) -> Dict[str, Any]:
+    """Run all turns (users in parallel, turns of a user in order) and time each interaction."""
+    by_user: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for item in corpus:
+        by_user[item["user_id"]].append(item)
+    
+    latencies: List[float] = []
+    errors: Dict[str, int] = defaultdict(int)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    
+    async def run_user(turns: List[Dict[str, Any]]):
+        async with semaphore:
+            for item in turns:
+                start = time.perf_counter()
+                try:
+                    await interact(item)
+                    latencies.append((time.perf_counter() - start) * 1000.0)
+                except Exception as e:
+                    errors[type(e).__name__] += 1
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(run_user(turns) for turns in by_user.values()))
+    wall = time.perf_counter() - start
+    return {"latencies": latencies, "errors": dict(errors), "wall_seconds": wall}
+
+
+async def bench_workflow(corpus: List[Dict[str, Any]], warmup: List[Dict[str, Any]], concurrency: int) -> Dict[str, Any]:
+    from app.api.workflow import orchestrator
+    
+    timer = StepTimer()
+    
+    async def interact(item: Dict[str, Any]):
+        await orchestrator.process_user_interaction(
+            user_id=item["user_id"],
+            session_id=item["session_id"],
+            user_input=item["text"],
+            progress_callback=timer
+        )
+    
+    await _run_corpus(warmup, interact, concurrency)
+    timer.samples.clear()
+    run = await _run_corpus(corpus, interact, concurrency)
+    return {
+        "end_to_end": summarize(run["latencies"], run["wall_seconds"]),
+        "steps": summarize_steps(timer.samples),
+        "errors": run["errors"],
+        "wall_seconds": round(run["wall_seconds"], 3)
+    }
+
+
+async def bench_http(corpus: List[Dict[str, Any]], warmup: List[Dict[str, Any]], concurrency: int) -> Dict[str, Any]:
+    import httpx
+    from app.api.main import app
+    
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://athena-bench", timeout=None) as client:
+        async def interact(item: Dict[str, Any]):
+            response = await client.post("/api/v1/chat", json={
+                "user_id": item["user_id"],
+                "session_id": item["session_id"],
+                "text": item["text"]
+            })
+            response.raise_for_status()
+        
+        await _run_corpus(warmup, interact, concurrency)
+        run = await _run_corpus(corpus, interact, concurrency)
+    return {
+        "end_to_end": summarize(run["latencies"], run["wall_seconds"]),
+        "errors": run["errors"],
+        "wall_seconds": round(run["wall_seconds"], 3)
+    }
+
+
+async def _run_targets(targets: List[str], corpus, warmup, concurrency: int) -> Dict[str, Any]:
+    from app.llmconnector import close_async_client
+    from app.utils.jsonl_log import close_log_writers
+    
+    results = {}
+    try:
+        for target in targets:
+            bench = bench_workflow if target == "workflow" else bench_http
+            results[target] = await bench(corpus, warmup, concurrency)
+    finally:
+        await close_async_client()
+        close_log_writers()
+    return results
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run the benchmark described by the parsed CLI arguments and return the report."""
+    if args.corpus:
+        corpus = load_corpus(args.corpus)
+    else:
+        corpus = build_corpus(args.users, args.turns, args.seed)
+    # Warmup turns use their own users so they do not change the measured users' state
+    warmup = [dict(item, user_id=f"warmup_{item['user_id']}", session_id=f"warmup_{item['session_id']}")
+              for item in corpus[:args.warmup]]
+    
+    stub = StubOllama(args.model, args.llm_latency, args.llm_token_latency, args.llm_tokens, args.seed)
+    server = StubOllamaServer(stub).start()
+    env = BenchmarkEnvironment(server.generate_url, args.classifier_latency, args.seed).install()
+    try:
+        from app.config import config
+        config.LLM_MODEL = args.model
+        # Importing the workflow needs the environment in place
+        import app.api.workflow  # noqa: F401
+        classifier = env.install_classifier()
+        
+        # The workflow prints debug output; keep it out of the report
+        with contextlib.ExitStack() as stack:
+            sink = sys.stderr if args.verbose else stack.enter_context(open(os.devnull, "w"))
+            stack.enter_context(contextlib.redirect_stdout(sink))
+            results = asyncio.run(_run_targets(args.targets, corpus, warmup, args.concurrency))
+    finally:
+        server.stop()
+        env.cleanup()
+    
+    return {
+        "benchmark": "athena_workflow",
+        "version": RESULT_VERSION,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "params": {
+            "users": len({item["user_id"] for item in corpus}),
+            "interactions": len(corpus),
+            "warmup": len(warmup),
+            "concurrency": args.concurrency,
+            "corpus": args.corpus or f"synthetic(seed={args.seed})",
+            "llm_latency": args.llm_latency,
+            "llm_token_latency": args.llm_token_latency,
+            "llm_tokens": args.llm_tokens,
+            "classifier_latency": args.classifier_latency
+        },
+        "stubs": {
+            "llm_requests": stub.requests,
+            "classifier_batches": classifier.batches
+        },
+        "results": results
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Athena end-to-end workflow benchmark")
+    parser.add_argument("--targets", nargs="+", choices=TARGETS, default=list(TARGETS))
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--corpus", default=None, help="JSON Lines corpus (see benchmarks.corpus)")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed interactions before each target")
+    parser.add_argument("--concurrency", type=int, default=4, help="Users served at the same time")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--model", default="qwen3:8b")
+    parser.add_argument("--llm-latency", default="lognormal:200,0.5", help="Stub LLM time to first token (ms)")
+    parser.add_argument("--llm-token-latency", default="fixed:5", help="Stub LLM delay between tokens (ms)")
+    parser.add_argument("--llm-tokens", type=int, default=30)
+    parser.add_argument("--classifier-latency", default="fixed:15", help="Stub classifier delay per batch (ms)")
+    parser.add_argument("--output", default=None, help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--verbose", action="store_true", help="Show workflow output on stderr")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        directory = os.path.dirname(args.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        for target, result in report["results"].items():
+            e2e = result["end_to_end"]
+            print(f"{target}: {e2e.get('throughput_rps', 0)} rps, p50 {e2e.get('p50_ms')} ms, "
+                  f"p95 {e2e.get('p95_ms')} ms, p99 {e2e.get('p99_ms')} ms, errors {sum(result['errors'].values())}")
+    else:
+        print(text)
+    failed = any(result["errors"] for result in report["results"].values())
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
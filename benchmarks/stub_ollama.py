@@ -0,0 +1,161 @@
+"""
+Stub Ollama HTTP server with configurable latency.
+
+Serves the endpoints Athena uses:
+- POST /api/generate  non-streaming ({"response": ...}) and streaming (JSON lines)
+- GET  /api/tags      model listing used by the readiness probe
+
+Classification prompts (pain scoring) get a numeric <final_answer>; all
+other prompts get a short reply streamed token by token. Run standalone to
+point a real Athena server at it:
+
+    python -m benchmarks.stub_ollama --port 11434 --latency lognormal:400,0.5
+"""
+import argparse
+import asyncio
+import json
+import random
+import socket
+import threading
+import time
+from typing import Optional
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from benchmarks.latency import LatencyDistribution
+
+
+REPLY = (
+    "I hear you, and I am really glad you told me. It sounds like a lot is going on "
+    "right now. Would you like to tell me a little more about how today went?"
+)
+
+
+class StubOllama:
+    """
+    FastAPI app imitating Ollama's generate API.
+    
+    `latency` is the delay before the first byte (the whole response when not
+    streaming); `token_latency` is added between streamed tokens.
+    """
+    
+    def __init__(
+        self,
+        model: str,
+        latency: str = "0",
+        token_latency: str = "0",
+        tokens: int = 30,
+        seed: Optional[int] = None
+    ):
+        """
+        Initialize the stub.
+        
+        Args:
+            model: Model name reported by /api/tags
+            latency: Time-to-first-token distribution (see benchmarks.latency)
+            token_latency: Delay between streamed tokens
+            tokens: Tokens per reply
+            seed: Seed of the latency and answer generators
+        """
+        self.model = model
+        self.latency = LatencyDistribution(latency, seed)
+        self.token_latency = LatencyDistribution(token_latency, None if seed is None else seed + 1)
+        self.tokens = max(1, tokens)
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.app = self._build_app()
+    
+    def _answer(self, prompt: str) -> str:
+        if "classify" in prompt.lower():
+            return f"<final_answer>{self.rng.uniform(-1.0, 1.0):.2f}</final_answer>"
+        words = REPLY.split(" ")
+        body = " ".join(words[i % len(words)] for i in range(self.tokens))
+        return f"<final_answer>{body}</final_answer>"
+    
+    def _build_app(self) -> FastAPI:
+        app = FastAPI(title="Stub Ollama")
+        
+        @app.get("/api/tags")
+        async def tags():
+            return {"models": [{"name": self.model}]}
+        
+        @app.post("/api/generate")
+        async def generate(request: Request):
+            data = json.loads(await request.body() or b"{}")
+            self.requests += 1
+            answer = self._answer(data.get("prompt", ""))
+            await asyncio.sleep(self.latency.sample())
+            
+            if not data.get("stream", True):
+                return JSONResponse({"model": self.model, "response": answer, "done": True})
+            
+            async def stream():
+                pieces = answer.split(" ")
+                for i, piece in enumerate(pieces):
+                    if i:
+                        await asyncio.sleep(self.token_latency.sample())
+                    token = piece if i == len(pieces) - 1 else piece + " "
+                    yield json.dumps({"model": self.model, "response": token, "done": False}) + "\n"
+                yield json.dumps({"model": self.model, "response": "", "done": True}) + "\n"
+            
+            return StreamingResponse(stream(), media_type="application/x-ndjson")
+        
+        return app
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class StubOllamaServer:
+    """Runs a StubOllama with uvicorn in a background thread."""
+    
+    def __init__(self, stub: StubOllama, host: str = "127.0.0.1", port: Optional[int] = None):
+        self.stub = stub
+        self.host = host
+        self.port = port or free_port()
+        self._server = uvicorn.Server(uvicorn.Config(
+            stub.app, host=self.host, port=self.port, log_level="warning", access_log=False
+        ))
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def generate_url(self) -> str:
+        return f"http://{self.host}:{self.port}/api/generate"
+    
+    def start(self, timeout: float = 10.0) -> 'StubOllamaServer':
+        self._thread = threading.Thread(target=self._server.run, name="stub-ollama", daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError(f"Stub Ollama did not start on {self.host}:{self.port}")
+            time.sleep(0.02)
+        return self
+    
+    def stop(self):
+        self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(5.0)
+            self._thread = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub Ollama server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--model", default="qwen3:8b")
+    parser.add_argument("--latency", default="lognormal:400,0.5", help="Time to first token (ms)")
+    parser.add_argument("--token-latency", default="fixed:20", help="Delay between streamed tokens (ms)")
+    parser.add_argument("--tokens", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    
+    stub = StubOllama(args.model, args.latency, args.token_latency, args.tokens, args.seed)
+    uvicorn.run(stub.app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
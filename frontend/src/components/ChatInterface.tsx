@@ -86,6 +86,13 @@ export default function ChatInterface() {
             </div>
           </div>
         ))}
+        {state.isProcessing && state.streamingResponse && (
+          <div className="flex justify-start">
+            <div className="max-w-[80%] rounded-lg px-4 py-2 bg-gray-200 dark:bg-gray-700 text-gray-800 dark:text-white">
+              <p className="text-sm">{state.streamingResponse}</p>
+            </div>
+          </div>
+        )}
       </div>
 
       {/* Input Form */}
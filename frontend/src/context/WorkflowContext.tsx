@@ -17,6 +17,7 @@ interface WorkflowState {
   currentStep: number
   progress: number
   isProcessing: boolean
+  streamingResponse: string
   result: any | null
   error: string | null
 }
@@ -36,18 +37,33 @@ export function WorkflowProvider({ children }: { children: ReactNode }) {
     currentStep: 0,
     progress: 0,
     isProcessing: false,
+    streamingResponse: '',
     result: null,
     error: null,
   })
 
   const handleMessage = useCallback((data: any) => {
     if (data.type === 'workflow_progress') {
-      const progress = data.progress
+      // Only changed steps are sent; a snapshot carries all of them and the
+      // reply text so far (first message, or after a reconnect)
+      setState(prev => {
+        const byNumber = new Map<number, WorkflowStep>()
+        if (!data.snapshot) {
+          prev.steps.forEach(step => byNumber.set(step.step_number, step))
+        }
+        ;(data.steps || []).forEach((step: WorkflowStep) => byNumber.set(step.step_number, step))
+        return {
+          ...prev,
+          steps: Array.from(byNumber.values()).sort((a, b) => a.step_number - b.step_number),
+          currentStep: data.current_step || 0,
+          progress: data.progress_percentage || 0,
+          streamingResponse: data.snapshot ? '' : prev.streamingResponse,
+        }
+      })
+    } else if (data.type === 'response_delta') {
       setState(prev => ({
         ...prev,
-        steps: progress.steps || [],
-        currentStep: progress.current_step || 0,
-        progress: progress.progress_percentage || 0,
+        streamingResponse: prev.streamingResponse + (data.delta || ''),
       }))
     } else if (data.type === 'workflow_complete') {
       setState(prev => ({
@@ -78,6 +94,7 @@ export function WorkflowProvider({ children }: { children: ReactNode }) {
     setState(prev => ({
       ...prev,
       isProcessing: true,
+      streamingResponse: '',
       error: null,
       result: null,
       steps: [],
@@ -116,6 +133,7 @@ export function WorkflowProvider({ children }: { children: ReactNode }) {
       currentStep: 0,
       progress: 0,
       isProcessing: false,
+      streamingResponse: '',
       result: null,
       error: null,
     })
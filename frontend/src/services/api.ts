@@ -41,25 +41,25 @@ export const chatApi = {
 }
 
 export const metricsApi = {
-  async getMetrics() {
-    const response = await api.get('/metrics')
+  async getMetrics(userId: string = 'user123') {
+    const response = await api.get('/metrics', { params: { user_id: userId } })
     return response.data
   },
 
-  async getResearchMetrics() {
-    const response = await api.get('/metrics/research')
+  async getResearchMetrics(userId: string = 'user123') {
+    const response = await api.get('/metrics/research', { params: { user_id: userId } })
     return response.data
   },
 }
 
 export const egoApi = {
-  async getEgoState() {
-    const response = await api.get('/ego/state')
+  async getEgoState(userId: string = 'user123') {
+    const response = await api.get('/ego/state', { params: { user_id: userId } })
     return response.data
   },
 
-  async resetEgo(initialStrength?: number) {
-    const response = await api.post('/ego/reset', { initial_strength: initialStrength })
+  async resetEgo(initialStrength?: number, userId: string = 'user123') {
+    const response = await api.post('/ego/reset', null, { params: { user_id: userId, initial_strength: initialStrength } })
     return response.data
   },
 }
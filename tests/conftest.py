@@ -0,0 +1,28 @@
+"""
+Shared test setup.
+
+Redis is replaced by fakeredis before any app module is imported, since
+several of them take a client at import time (same approach as
+benchmarks/environment.py). Each test gets an empty server.
+
+    pip install -r tests/requirements.txt
+    python -m pytest -q
+"""
+import fakeredis
+import pytest
+from app.memory import redis_pool
+
+_server = fakeredis.FakeServer()
+redis_pool._sync_client = fakeredis.FakeRedis(server=_server, decode_responses=True)
+redis_pool._async_client = fakeredis.FakeAsyncRedis(server=_server, decode_responses=True)
+
+
+@pytest.fixture
+def redis():
+    """The (emptied) fake Redis behind get_redis() and get_async_redis()."""
+    client = redis_pool._sync_client
+    client.flushall()
+    # Fresh async client per test: every test runs its own event loop
+    redis_pool._async_client = fakeredis.FakeAsyncRedis(server=_server, decode_responses=True)
+    yield client
+    client.flushall()
@@ -0,0 +1,57 @@
+"""
+Chart render service (user-019): in-flight renders shared between concurrent requests.
+"""
+import asyncio
+import threading
+from app.emotions import charts
+from app.emotions.charts import ChartRenderService
+
+
+def service(monkeypatch, renders):
+    """Service whose renders wait on the next Event in `renders`."""
+    def figure_to_png(fig, dpi=None):
+        renders.pop(0).wait(timeout=5)
+        return b"png"
+
+    monkeypatch.setattr(charts, "figure_to_png", figure_to_png)
+    svc = ChartRenderService(cache_size=4)
+    monkeypatch.setattr(svc, "_source", lambda chart, user_id, source: ("v1", lambda: None))
+    return svc
+
+
+def test_concurrent_requests_share_one_render(monkeypatch):
+    release = threading.Event()
+    svc = service(monkeypatch, [release])
+
+    async def main():
+        first = asyncio.create_task(svc.render("mbti_radar", "u"))
+        await asyncio.sleep(0.05)
+        second = asyncio.create_task(svc.render("mbti_radar", "u"))
+        await asyncio.sleep(0.05)
+        release.set()
+        return await asyncio.gather(first, second)
+
+    assert asyncio.run(main()) == [(b"png", "v1"), (b"png", "v1")]
+    assert svc.renders == 1
+
+
+def test_cancelled_render_does_not_hang_waiters(monkeypatch):
+    cancelled, retried = threading.Event(), threading.Event()
+    svc = service(monkeypatch, [cancelled, retried])
+
+    async def main():
+        first = asyncio.create_task(svc.render("mbti_radar", "u"))
+        await asyncio.sleep(0.05)
+        waiter = asyncio.create_task(svc.render("mbti_radar", "u"))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        cancelled.set()
+        retried.set()
+        result = await asyncio.wait_for(waiter, timeout=2.0)
+        return first.cancelled(), result
+
+    first_cancelled, result = asyncio.run(main())
+    assert first_cancelled
+    # The waiter rendered the chart itself instead of failing with the owner's cancellation
+    assert result == (b"png", "v1")
+    assert not svc._inflight
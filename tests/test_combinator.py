@@ -0,0 +1,51 @@
+"""
+Streamed final response (user-002): answer deltas and mid-stream failures.
+"""
+import asyncio
+import pytest
+from app.agents import combinator
+from app.config import config
+
+
+def streaming(monkeypatch, tokens, error=None):
+    async def stream_connector(prompt, caller=None):
+        for token in tokens:
+            yield token
+        if error is not None:
+            raise error
+
+    monkeypatch.setattr(combinator, "stream_connector", stream_connector)
+    monkeypatch.setattr(config, "LLM_STREAM_RESPONSES", True)
+
+
+def respond():
+    deltas = []
+
+    async def on_delta(delta):
+        deltas.append(delta)
+
+    final = asyncio.run(combinator.generate_final_response({"latest_text": "hi"}, {"name": "Athena"}, on_delta=on_delta))
+    return final, "".join(deltas)
+
+
+def test_streams_only_the_answer(monkeypatch):
+    streaming(monkeypatch, ["<think>hmm</think>", "<final_", "answer> Hello", " there", "</final_answer>"])
+    final, streamed = respond()
+    assert "<final_answer> Hello there</final_answer>" in final
+    assert streamed == "Hello there"
+
+
+def test_failure_after_streaming_keeps_the_partial_answer(monkeypatch):
+    streaming(monkeypatch, ["<final_answer>Hello", " there, how ", "are you"], error=ConnectionError("reset"))
+    final, streamed = respond()
+    assert final == f"<final_answer>{streamed}</final_answer>"
+    # The filter holds back a possible closing tag, so the tail is never shown
+    assert streamed.startswith("Hello the")
+
+
+@pytest.mark.parametrize("tokens", [[], ["<think>still thinking"]])
+def test_failure_before_any_answer_falls_back(monkeypatch, tokens):
+    streaming(monkeypatch, tokens, error=ConnectionError("reset"))
+    final, streamed = respond()
+    assert streamed == ""
+    assert "Sorry, I could not respond" in final
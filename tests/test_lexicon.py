@@ -0,0 +1,171 @@
+"""
+Single-pass lexicon engine (user-012) against plain regex / substring matching.
+"""
+import random
+import re
+import pytest
+from app.agents.athena_state import ATHENA_CUES_LEXICON
+from app.agents.ego_impact import EGO_IMPACT_LEXICON, EgoImpactCalculator
+from app.emotions.emotion_redis import CRISIS_LEXICON, NEGATIVE_WORDS
+from app.emotions.empathy import EMPATHY_NEGATIVE_LEXICON
+from app.emotions.mbti import AXIS_REGEXES, MBTI_LEXICON
+from app.utils.lexicon import AhoCorasick, LexiconEngine, lexicon_engine, literal_anchor
+
+
+REGEX_LEXICONS = {
+    MBTI_LEXICON: {axis: [rx.pattern for rx in regexes] for axis, regexes in AXIS_REGEXES.items()},
+    EGO_IMPACT_LEXICON: {
+        f"{dimension}:{polarity}": patterns
+        for dimension, keywords in EgoImpactCalculator.DIMENSION_KEYWORDS.items()
+        for polarity, patterns in keywords.items()
+    },
+}
+SUBSTRING_LEXICONS = {
+    CRISIS_LEXICON: {CRISIS_LEXICON: NEGATIVE_WORDS},
+    ATHENA_CUES_LEXICON: {
+        "insult": ["i hate you", "hate you", "you suck", "die"],
+        "praise": ["thank you", "love you", "i love you", "you are kind"]
+    },
+    EMPATHY_NEGATIVE_LEXICON: {
+        EMPATHY_NEGATIVE_LEXICON: ["die", "suicide", "kill myself", "i want to die", "hate you", "hate myself", "worthless"]
+    },
+}
+
+TEXTS = [
+    "",
+    "ok",
+    "I hate you Athena",
+    "I want to die",
+    "Thank you, you are kind!",
+    "We planned a party with friends; maybe later we explore ideas.",
+    "I'm so confused about what to do next with my life.",
+    "You're just a stupid program, you can't help me.",
+    "Nothing really matters anymore, I'm so tired and alone.",
+    "DIEt plans and SCHEDULES: details, facts, specifics.",
+    "wefriend iteam me-myself, (quiet) solitude... i",
+    "Ünïcödé — I FEEL my heart, because of logic?",
+    "hopelesslyhopeless crying cry burden sick of it all",
+]
+
+
+def words():
+    """Vocabulary for random texts: parts of every entry plus filler and punctuation."""
+    vocab = {"the", "a", "and", "!", "?", ",", ".", "I'm", "you're", "x", "ing", "s"}
+    for groups in list(SUBSTRING_LEXICONS.values()):
+        for entries in groups.values():
+            for entry in entries:
+                vocab.update(entry.split())
+    for groups in REGEX_LEXICONS.values():
+        for patterns in groups.values():
+            for pattern in patterns:
+                vocab.update(re.findall(r"[a-z']+", pattern.replace("\\b", " ")))
+    return sorted(vocab)
+
+
+def random_texts(count, seed=0):
+    rng = random.Random(seed)
+    vocab = words()
+    texts = []
+    for _ in range(count):
+        tokens = rng.choices(vocab, k=rng.randint(1, 25))
+        tokens = [t.upper() if rng.random() < 0.15 else t for t in tokens]
+        # Glue some tokens together so entries also occur inside other words
+        sep = rng.choice([" ", " ", "", "-", "  "])
+        texts.append(sep.join(tokens))
+    return texts
+
+
+def expected(text):
+    """Reference matches: re.search for regex entries, `in` on the lowercased text for substrings."""
+    hits = {}
+    for name, groups in REGEX_LEXICONS.items():
+        for tag, patterns in groups.items():
+            matched = {p for p in patterns if re.search(p, text, re.IGNORECASE)}
+            if matched:
+                hits.setdefault(name, {})[tag] = matched
+    lowered = text.lower()
+    for name, groups in SUBSTRING_LEXICONS.items():
+        for tag, entries in groups.items():
+            matched = {e for e in entries if e.lower() in lowered}
+            if matched:
+                hits.setdefault(name, {})[tag] = matched
+    return hits
+
+
+def actual(hits, names):
+    result = {}
+    for name in names:
+        for tag, entries in hits.tags(name).items():
+            if entries:
+                result.setdefault(name, {})[tag] = set(entries)
+    return result
+
+
+def fresh_engine(**kwargs):
+    engine = LexiconEngine(**kwargs)
+    for name, groups in REGEX_LEXICONS.items():
+        engine.register(name, groups, regex=True)
+    for name, groups in SUBSTRING_LEXICONS.items():
+        engine.register(name, groups)
+    return engine
+
+
+NAMES = list(REGEX_LEXICONS) + list(SUBSTRING_LEXICONS)
+
+
+@pytest.mark.parametrize("text", TEXTS + random_texts(300))
+def test_scan_matches_reference(text):
+    assert actual(fresh_engine().scan(text), NAMES) == expected(text)
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_global_engine_matches_reference(text):
+    # The lexicons the app modules registered on the shared engine
+    assert actual(lexicon_engine.scan(text), NAMES) == expected(text)
+
+
+def test_cached_and_uncached_scans_agree():
+    engine = fresh_engine(max_cached_length=50)
+    for text in TEXTS + random_texts(50, seed=1):
+        first = engine.scan(text).to_dict()
+        assert engine.scan(text).to_dict() == first
+        assert actual(engine.scan(text), NAMES) == expected(text)
+
+
+def test_register_replaces_lexicon():
+    engine = LexiconEngine()
+    engine.register("cues", {"a": ["alpha", "beta"]})
+    assert set(engine.scan("alpha beta").get("cues", "a")) == {"alpha", "beta"}
+    engine.register("cues", {"b": ["gamma"]})
+    hits = engine.scan("alpha beta gamma")
+    assert hits.get("cues", "a") == ()
+    assert hits.get("cues", "b") == ("gamma",)
+
+
+def test_literal_anchor_is_contained_in_every_match():
+    patterns = [p for groups in REGEX_LEXICONS.values() for ps in groups.values() for p in ps]
+    for pattern in patterns:
+        anchor = literal_anchor(pattern)
+        for text in TEXTS + random_texts(100, seed=2):
+            match = re.search(pattern, text, re.IGNORECASE)
+            if match and anchor:
+                assert anchor in match.group(0).lower(), (pattern, anchor, text)
+
+
+def test_literal_anchor_cases():
+    assert literal_anchor(r"\bfriend(s)?\b") == "friend"
+    assert literal_anchor(r"\bideas?\b") == "idea"
+    assert literal_anchor(r"\bnot good enough\b") == "not good enough"
+    assert literal_anchor(r"\b(i|me)\b") == ""
+    assert literal_anchor(r"foo|bar") == ""
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_aho_corasick_finds_every_occurring_key(seed):
+    rng = random.Random(seed)
+    alphabet = "abc"
+    keys = {"".join(rng.choices(alphabet, k=rng.randint(1, 4))) for _ in range(30)}
+    automaton = AhoCorasick(keys)
+    for _ in range(50):
+        text = "".join(rng.choices(alphabet, k=rng.randint(0, 40)))
+        assert automaton.find(text) == {key for key in keys if key in text}
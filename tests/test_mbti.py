@@ -0,0 +1,165 @@
+"""
+Per-day MBTI counters (user-011) against a rescan of the message history.
+"""
+import asyncio
+import json
+import random
+from datetime import datetime
+import pytest
+from app.config import config
+from app.emotions import mbti
+from app.emotions.analysis_context import AnalysisContext
+from app.emotions.emotion_redis import store_user_emotion
+
+
+MESSAGES = [
+    "We had a party with friends and the team, together as always.",
+    "I need some quiet time alone, just me and myself.",
+    "Let me check the details and the exact facts first.",
+    "Maybe we could imagine a future with new ideas?",
+    "Because the logic is objective, I analyze the reason.",
+    "I feel it in my heart, I care about what you value.",
+    "I plan my schedule around the deadline and decide in order.",
+    "Maybe later, I'm unsure, let's stay open and flexible and explore.",
+    "ok",
+    "Friendship? I'm the FRIEND who organizes everything.",
+    "wefriend partyanimal detailed ideas!!",
+]
+
+
+def rescan(messages):
+    """MBTI from the message texts, as computed before the counters (regex per axis on the joined texts)."""
+    text = mbti.aggregate_texts(messages)
+    counts = {axis: mbti.score_matches(text, regexes) for axis, regexes in mbti.AXIS_REGEXES.items()}
+    avg_words = sum(len(m["text"].split()) for m in messages) / max(1, len(messages))
+    return mbti._mbti_from_counts(counts, len(messages), avg_words, [])
+
+
+def comparable(result):
+    return {key: result[key] for key in ("mbti", "axis_scores", "confidence", "n_messages_used")} | {
+        "counts": result["explanation"].get("counts"),
+        "avg_words": result["explanation"].get("avg_message_length_words")
+    }
+
+
+def store(user_id, texts):
+    for text in texts:
+        store_user_emotion(user_id, "session", text, {}, 0.0)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_counters_match_rescan(redis, seed):
+    texts = random.Random(seed).choices(MESSAGES, k=12)
+    store("u", texts)
+
+    result = mbti.detect_mbti_for_user("u", 5)
+    messages = mbti.get_recent_messages("u", days=5)
+
+    assert len(messages) == len(texts)
+    assert comparable(result) == comparable(rescan(messages))
+    assert comparable(mbti.infer_mbti(messages)) == comparable(rescan(messages))
+
+
+def test_async_matches_sync(redis):
+    store("u", MESSAGES)
+    sync_result = mbti.detect_mbti_for_user("u", 5)
+    async_result = asyncio.run(mbti.detect_mbti_for_user_async("u", 5))
+    assert comparable(async_result) == comparable(sync_result)
+
+
+def test_unknown_without_messages(redis):
+    assert mbti.detect_mbti_for_user("nobody", 5)["mbti"] == "UNKNOWN"
+
+
+def legacy_history(redis, user_id, texts):
+    """History written before the counters existed: list entries only."""
+    now = datetime.utcnow().isoformat()
+    for text in texts:
+        redis.rpush(f"user:{user_id}:emotions", json.dumps({"ts": now, "text": text}))
+
+
+def test_backfill_rebuilds_legacy_history(redis):
+    legacy_history(redis, "legacy", MESSAGES)
+    assert not redis.exists(mbti._backfill_marker_key("legacy"))
+
+    result = mbti.detect_mbti_for_user("legacy", 5)
+
+    assert comparable(result) == comparable(rescan(mbti.get_recent_messages("legacy", days=5)))
+    assert redis.exists(mbti._backfill_marker_key("legacy"))
+
+
+def test_async_backfill_rebuilds_legacy_history(redis):
+    legacy_history(redis, "legacy", MESSAGES[:6])
+    result = asyncio.run(mbti.detect_mbti_for_user_async("legacy", 5))
+    assert comparable(result) == comparable(rescan(mbti.get_recent_messages("legacy", days=5)))
+
+
+def test_backfill_never_lowers_counters(redis):
+    # The bucket counted messages the capped list no longer holds
+    bucket = mbti.mbti_bucket_key("u", datetime.utcnow())
+    redis.hset(bucket, mapping={"n": 5, "words": 40, "E:\\bwe\\b": 3})
+    legacy_history(redis, "u", ["we are a team", "i feel fine"])
+
+    mbti.detect_mbti_for_user("u", 5)
+
+    stored = redis.hgetall(bucket)
+    assert stored["n"] == "5"
+    assert stored["words"] == "40"
+    assert stored["E:\\bwe\\b"] == "3"
+    # Patterns only the list knew about are added
+    assert stored["E:\\bteam\\b"] == "1"
+    assert stored["F:\\bfeel\\b"] == "1"
+
+
+def test_update_refreshes_backfill_marker(redis):
+    ttl = config.REDIS_EXPIRATION_DAYS * 24 * 3600
+    store("u", ["hello"])
+    mbti.detect_mbti_for_user("u", 5)
+    marker = mbti._backfill_marker_key("u")
+    redis.expire(marker, 60)
+
+    store("u", ["hello again"])
+
+    assert redis.ttl(marker) == ttl
+
+
+def test_update_does_not_mark_unbackfilled_users(redis):
+    # Storing a message must not skip the rebuild of older, uncounted history
+    store("new", ["hello"])
+    assert not redis.exists(mbti._backfill_marker_key("new"))
+
+
+def test_async_takes_sample_texts_from_ctx(redis):
+    store("u", ["stored text"])
+    ctx = AnalysisContext("u")
+    seeded = [{"ts": datetime.utcnow().isoformat(), "text": "seeded text"}]
+    ctx.set_recent_emotions(seeded, 10)
+
+    result = asyncio.run(mbti.detect_mbti_for_user_async("u", 5, ctx))
+
+    assert result["sample_texts"] == ["seeded text"]
+    assert ctx.memoize(("mbti", 5), lambda: None) is result
+
+
+def test_async_seeds_ctx_when_history_was_not_read(redis):
+    store("u", ["stored text"])
+    ctx = AnalysisContext("u")
+    result = asyncio.run(mbti.detect_mbti_for_user_async("u", 5, ctx))
+    assert result["sample_texts"] == ["stored text"]
+    assert [e["text"] for e in ctx.cached_recent(10)] == ["stored text"]
+
+
+def test_backfill_reads_once_even_if_the_marker_is_lost(redis, monkeypatch):
+    # A marker that never sticks must not make detection re-enter itself
+    original = mbti._queue_backfill
+
+    def losing_marker(pipe, user_id, days, existing):
+        original(pipe, user_id, days, existing)
+        pipe.delete(mbti._backfill_marker_key(user_id))
+
+    monkeypatch.setattr(mbti, "_queue_backfill", losing_marker)
+    legacy_history(redis, "legacy", MESSAGES)
+    expected = comparable(rescan(mbti.get_recent_messages("legacy", days=5)))
+
+    assert comparable(mbti.detect_mbti_for_user("legacy", 5)) == expected
+    assert comparable(asyncio.run(mbti.detect_mbti_for_user_async("legacy", 5))) == expected
@@ -0,0 +1,204 @@
+"""
+Delta/snapshot WebSocket progress protocol (user-024).
+"""
+import asyncio
+import json
+from datetime import datetime
+import numpy as np
+import pytest
+from app.api import websocket
+from app.api.schemas import WorkflowStep
+from app.api.websocket import ConnectionManager, WorkflowProgressStream, encode_message
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+
+def step(number, status, **data):
+    return {
+        "step_number": number,
+        "step_name": f"step_{number}",
+        "status": status,
+        "data": data,
+        "timestamp": datetime(2024, 1, 1)
+    }
+
+
+class Client:
+    """Applies messages the way the frontend does (WorkflowContext.tsx)."""
+
+    def __init__(self):
+        self.steps = {}
+        self.text = ""
+        self.current_step = 0
+        self.result = None
+
+    def apply(self, message):
+        if message["type"] == "workflow_progress":
+            if message["snapshot"]:
+                self.steps, self.text = {}, ""
+            for s in message["steps"]:
+                self.steps[s["step_number"]] = s
+            self.current_step = message["current_step"]
+        elif message["type"] == "response_delta":
+            self.text += message["delta"]
+        elif message["type"] == "workflow_complete":
+            self.result = message["result"]
+
+
+def subscribed(window_ms=0):
+    manager = ConnectionManager()
+    socket = FakeWebSocket()
+    manager.workflow_connections["w"] = socket
+    return WorkflowProgressStream("w", 4, connections=manager, window_ms=window_ms), manager, socket
+
+
+def test_first_flush_is_a_snapshot_then_deltas():
+    async def main():
+        stream, _, socket = subscribed()
+        stream.step(step(1, "processing"))
+        stream.step(step(2, "processing"))
+        stream.text("Hello ")
+        await stream.flush()
+        stream.step(step(1, "completed", score=1))
+        stream.text("there")
+        await stream.flush()
+        return socket.sent
+
+    first, first_text, delta, delta_text = asyncio.run(main())
+    assert first["snapshot"] is True
+    assert [s["step_number"] for s in first["steps"]] == [1, 2]
+    assert first_text == {"type": "response_delta", "workflow_id": "w", "delta": "Hello "}
+    assert delta["snapshot"] is False
+    assert [(s["step_number"], s["status"]) for s in delta["steps"]] == [(1, "completed")]
+    assert delta["progress_percentage"] == 25.0
+    assert delta_text["delta"] == "there"
+
+
+def test_changes_within_the_window_are_coalesced():
+    async def main():
+        stream, _, socket = subscribed(window_ms=20)
+        for status in ("processing", "completed"):
+            for number in (1, 2, 3):
+                stream.step(step(number, status))
+        for token in ("a", "b", "c"):
+            stream.text(token)
+        await asyncio.sleep(0.1)
+        return socket.sent
+
+    sent = asyncio.run(main())
+    assert [m["type"] for m in sent] == ["workflow_progress", "response_delta"]
+    assert [s["status"] for s in sent[0]["steps"]] == ["completed"] * 3
+    assert sent[1]["delta"] == "abc"
+
+
+def test_nothing_is_scheduled_or_sent_without_a_subscriber():
+    async def main():
+        manager = ConnectionManager()
+        stream = WorkflowProgressStream("w", 4, connections=manager, window_ms=0)
+        stream.step(step(1, "completed"))
+        stream.text("hi")
+        assert stream._flush_task is None
+        await stream.finish({"type": "workflow_complete", "workflow_id": "w", "result": {}})
+        return stream.messages_sent
+
+    assert asyncio.run(main()) == 0
+
+
+def test_late_subscriber_gets_a_snapshot():
+    async def main():
+        stream, manager, _ = subscribed()
+        del manager.workflow_connections["w"]
+        stream.step(step(1, "completed"))
+        stream.text("Hello ")
+        stream.step(step(2, "processing"))
+        late = FakeWebSocket()
+        manager.workflow_connections["w"] = late
+        stream.text("world")
+        await stream.flush()
+        return late.sent
+
+    progress, text = asyncio.run(main())
+    assert progress["snapshot"] is True
+    assert [s["step_number"] for s in progress["steps"]] == [1, 2]
+    assert text["delta"] == "Hello world"
+
+
+def test_reconnect_resyncs_with_a_snapshot():
+    async def main():
+        stream, manager, first = subscribed()
+        client = Client()
+        stream.step(step(1, "completed"))
+        stream.text("Hel")
+        await stream.flush()
+        for message in first.sent:
+            client.apply(message)
+
+        # The client reconnects on a new socket and starts from scratch
+        second = FakeWebSocket()
+        manager.workflow_connections["w"] = second
+        client = Client()
+        stream.step(step(2, "completed"))
+        stream.text("lo")
+        await stream.flush()
+        for message in second.sent:
+            client.apply(message)
+        return client, second.sent
+
+    client, sent = asyncio.run(main())
+    assert sent[0]["snapshot"] is True
+    assert sorted(client.steps) == [1, 2]
+    assert client.text == "Hello"
+
+
+def test_client_rebuilds_the_full_state_from_deltas():
+    async def main():
+        stream, _, socket = subscribed(window_ms=5)
+        expected_text = ""
+        for number in range(1, 5):
+            stream.step(step(number, "processing"))
+            await asyncio.sleep(0.01)
+            for token in (f"t{number} ", "x "):
+                stream.text(token)
+                expected_text += token
+            stream.step(step(number, "completed", n=number))
+        await stream.finish({"type": "workflow_complete", "workflow_id": "w", "result": {"ok": True}})
+        client = Client()
+        for message in socket.sent:
+            client.apply(message)
+        return client, socket.sent, expected_text
+
+    client, sent, expected_text = asyncio.run(main())
+    assert sent[-1]["type"] == "workflow_complete"
+    assert sum(m["type"] == "workflow_complete" for m in sent) == 1
+    assert client.text == expected_text
+    assert {n: (s["status"], s["data"]) for n, s in client.steps.items()} == {
+        n: ("completed", {"n": n}) for n in range(1, 5)
+    }
+    assert client.result == {"ok": True}
+    # Coalescing sent fewer messages than there were changes
+    assert len(sent) < 4 * 2 + 4 * 2 + 1
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_encode_message_handles_models_datetimes_and_numpy(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(websocket, "orjson", None)
+    elif websocket.orjson is None:
+        pytest.skip("orjson is not installed")
+    message = {
+        "when": datetime(2024, 1, 2, 3, 4, 5),
+        "step": WorkflowStep(step_number=1, step_name="a", status="completed", timestamp=datetime(2024, 1, 1)),
+        "value": np.float64(0.5),
+        "array": np.arange(3)
+    }
+    decoded = json.loads(encode_message(message))
+    assert decoded["when"] == "2024-01-02T03:04:05"
+    assert decoded["step"]["step_name"] == "a"
+    assert decoded["value"] == 0.5
+    assert decoded["array"] == [0, 1, 2]
@@ -0,0 +1,39 @@
+"""
+Ring buffer history (user-014): eviction order and background spilling.
+"""
+import builtins
+import threading
+from app.utils.ring_buffer import RingBuffer, spill_path
+
+
+def test_keeps_the_newest_entries_in_order():
+    buffer = RingBuffer(3, items=range(5))
+    assert buffer.to_list() == [2, 3, 4]
+    assert buffer[-1] == 4
+    assert buffer[1:] == [3, 4]
+    assert buffer.total == 5
+
+
+def test_spilled_entries_are_written_off_the_calling_thread(tmp_path, monkeypatch):
+    path = spill_path(str(tmp_path / "spill"), "user 1", "interactions")
+    opened_by = []
+    real_open = builtins.open
+
+    def tracking_open(file, *args, **kwargs):
+        if str(file) == path:
+            opened_by.append(threading.current_thread())
+        return real_open(file, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "open", tracking_open)
+    buffer = RingBuffer(3, spill_path=path)
+    for i in range(50):
+        buffer.append({"i": i})
+
+    assert threading.current_thread() not in opened_by
+    assert buffer.spilled == 47
+    assert [entry["i"] for entry in buffer.iter_all()] == list(range(50))
+
+
+def test_spill_path_is_unique_per_owner(tmp_path):
+    assert spill_path(str(tmp_path), "a b", "x") != spill_path(str(tmp_path), "a_b", "x")
+    assert spill_path("", "a", "x") is None
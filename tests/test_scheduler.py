@@ -0,0 +1,158 @@
+"""
+Dependency-graph workflow scheduler (user-003): ordering, concurrency, failure and cancellation.
+"""
+import asyncio
+import pytest
+from app.api.scheduler import WorkflowGraph, WorkflowNode
+
+
+def node(step_number, name, depends_on=(), log=None, delay=0.0, result=None, error=None, gate=None):
+    """Node that logs its start/end into `log`, optionally waiting on `gate` or raising `error`."""
+    async def run(results):
+        log.append(("start", name))
+        try:
+            if gate is not None:
+                await gate.wait()
+            await asyncio.sleep(delay)
+            if error is not None:
+                raise error
+        except asyncio.CancelledError:
+            log.append(("cancelled", name))
+            raise
+        log.append(("end", name))
+        return result if result is not None else {"step": name}
+    return WorkflowNode(step_number, name, run, depends_on=depends_on)
+
+
+def run(graph, **kwargs):
+    return asyncio.run(graph.execute(**kwargs))
+
+
+def test_rejects_invalid_graphs():
+    async def noop(results):
+        return {}
+    with pytest.raises(ValueError, match="unique"):
+        WorkflowGraph([WorkflowNode(1, "a", noop), WorkflowNode(2, "a", noop)])
+    with pytest.raises(ValueError, match="Unknown dependency"):
+        WorkflowGraph([WorkflowNode(1, "a", noop, depends_on=["missing"])])
+    with pytest.raises(ValueError, match="cycle"):
+        WorkflowGraph([
+            WorkflowNode(1, "a", noop, depends_on=["c"]),
+            WorkflowNode(2, "b", noop, depends_on=["a"]),
+            WorkflowNode(3, "c", noop, depends_on=["b"]),
+        ])
+
+
+def test_steps_start_only_after_their_dependencies():
+    log = []
+    # Diamond with a slow branch: d must wait for both b and c
+    graph = WorkflowGraph([
+        node(1, "a", log=log),
+        node(2, "b", ["a"], log=log, delay=0.03),
+        node(3, "c", ["a"], log=log),
+        node(4, "d", ["b", "c"], log=log),
+        node(5, "e", log=log),
+    ])
+    results = run(graph)
+
+    assert set(results) == {"a", "b", "c", "d", "e"}
+    for name, deps in {"b": ["a"], "c": ["a"], "d": ["b", "c"]}.items():
+        for dep in deps:
+            assert log.index(("end", dep)) < log.index(("start", name))
+
+
+def test_independent_steps_run_concurrently():
+    log = []
+    gate = asyncio.Event()
+
+    async def opener(results):
+        gate.set()
+        return {}
+
+    # "waiter" blocks until "opener" ran: only possible if both run at the same time
+    graph = WorkflowGraph([
+        node(1, "waiter", log=log, gate=gate),
+        WorkflowNode(2, "opener", opener),
+    ])
+    results = asyncio.run(asyncio.wait_for(graph.execute(), timeout=2.0))
+    assert set(results) == {"waiter", "opener"}
+
+
+def test_results_are_shared_with_dependents():
+    async def first(results):
+        return {"value": 21}
+
+    async def second(results):
+        return {"value": results["first"]["value"] * 2}
+
+    graph = WorkflowGraph([
+        WorkflowNode(1, "first", first),
+        WorkflowNode(2, "second", second, depends_on=["first"]),
+    ])
+    shared = {}
+    results = run(graph, results=shared)
+    assert results is shared
+    assert results["second"] == {"value": 42}
+
+
+def test_progress_is_reported_per_step():
+    events = []
+
+    async def on_progress(step, status, data):
+        events.append((step.name, status, data))
+
+    log = []
+    graph = WorkflowGraph([node(1, "a", log=log), node(2, "b", ["a"], log=log, result={"x": 1})])
+    run(graph, on_progress=on_progress)
+
+    assert [(name, status) for name, status, _ in events] == [
+        ("a", "processing"), ("a", "completed"), ("b", "processing"), ("b", "completed")
+    ]
+    assert events[-1][2] == {"x": 1}
+
+
+def test_ready_steps_start_in_step_number_order():
+    log = []
+    graph = WorkflowGraph([node(3, "c", log=log), node(1, "a", log=log), node(2, "b", log=log)])
+    run(graph)
+    starts = [name for event, name in log if event == "start"]
+    assert starts == ["a", "b", "c"]
+
+
+def test_failure_cancels_running_steps_and_skips_dependents():
+    log = []
+    graph = WorkflowGraph([
+        node(1, "fails", log=log, delay=0.01, error=RuntimeError("boom")),
+        node(2, "slow", log=log, delay=5.0),
+        node(3, "after", ["fails"], log=log),
+    ])
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(asyncio.wait_for(graph.execute(), timeout=2.0))
+
+    assert ("cancelled", "slow") in log
+    assert ("end", "slow") not in log
+    assert ("start", "after") not in log
+
+
+def test_outer_cancellation_cancels_running_steps():
+    log = []
+    graph = WorkflowGraph([node(1, "a", log=log, delay=5.0), node(2, "b", log=log, delay=5.0)])
+
+    async def main():
+        task = asyncio.create_task(graph.execute())
+        await asyncio.sleep(0.02)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert {("cancelled", "a"), ("cancelled", "b")} <= set(log)
+
+
+def test_orchestrator_graph_is_valid():
+    from app.api.websocket import WorkflowProgressStream
+    from app.api.workflow import TOTAL_STEPS, orchestrator
+
+    graph = orchestrator._build_graph("u", "s", "hello", WorkflowProgressStream("w", TOTAL_STEPS), {})
+    numbers = sorted(n.step_number for n in graph.nodes.values())
+    assert numbers == list(range(1, TOTAL_STEPS + 1))